@@ -1,109 +1,368 @@
+import random
+from array import array
+
+from board import (DICE_COUNT, EVENT_BOUNCE, EVENT_LADDER, EVENT_PENALTY, EVENT_SNAKE, EVENT_STAY, EVENT_WIN,
+                   LAST_SQUARE, compile_board, square_typecode)
+from move_log import Move, MoveLog
+
+# Intervalo (em jogadas) entre snapshots do estado, usados para desfazer/refazer
+SNAPSHOT_INTERVAL = 32
+_MASK64 = (1 << 64) - 1
+# Dados sorteados por palavra de 64 bits (6**12 < 2**32: o viés do módulo é desprezível)
+_DICE_PER_WORD = 12
+
+
+def _mix64(value):
+    """Função de mistura splitmix64: gera 64 bits pseudoaleatórios de um contador."""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+# Layout clássico do tabuleiro de 100 casas
+# Cobras (chave: cabeça, valor: cauda)
+CLASSIC_SNAKES = {
+    16: 6,
+    46: 25,
+    49: 11,
+    62: 19,
+    64: 60,
+    74: 53,
+    89: 68,
+    92: 88,
+    95: 75,
+    99: 80
+}
+# Escadas (chave: base, valor: topo)
+CLASSIC_LADDERS = {
+    2: 38,
+    7: 14,
+    8: 31,
+    15: 26,
+    21: 42,
+    28: 84,
+    36: 44,
+    51: 67,
+    71: 91,
+    78: 98,
+    87: 94
+}
+
+
+def _snake_part(head, tail):
+    """Parte da mensagem de uma cobra."""
+    return ("snake", f"Opaa mermão! Cobra lazarenta te pegou na casa {head}! Desceu até a casa {tail}! 🐍")
+
+
+def _ladder_part(base, top):
+    """Parte da mensagem de uma escada."""
+    return ("ladder", f"Boa malandrão! Achou uma escadinha top na casa {base}! Subiu direto pra casa {top}! 🪜")
+
+
+class MoveResult(Move):
+    """
+    Resultado de uma jogada: dados, casas de origem e destino, código do evento,
+    dados iguais, vencedor e o próximo jogador.
+
+    A mensagem em português só é montada quando pedida (`str(result)` ou `parts()`),
+    então simulações e a interface não pagam pela formatação.
+    """
+
+    __slots__ = ("target", "double", "winner", "next_player", "board")
+
+    def __init__(self, player, dice, from_position, to_position, event, target, double, winner, next_player,
+                 board):
+        # Atribuições diretas (sem chamar Move.__init__): o objeto é criado a cada jogada
+        self.player = player
+        self.dice = dice
+        self.from_position = from_position
+        self.to_position = to_position
+        self.event = event
+        # Casa alcançada pelos dados, antes de ricochete, cobra e escada
+        self.target = target
+        self.double = double
+        # Índice do vencedor (None se a jogada não terminou a partida)
+        self.winner = winner
+        self.next_player = next_player
+        self.board = board
+
+    def parts(self):
+        """Partes da mensagem como pares (tipo, texto)."""
+        player_num = self.player + 1
+        dice = self.dice
+        target = self.target
+        board = self.board
+        parts = [("roll", f"Jogador {player_num} rolou {'+'.join(map(str, dice))}={sum(dice)}")]
+        if self.event & EVENT_PENALTY:
+            return parts + [
+                ("move", f"na casa {self.from_position}"),
+                ("penalty", f"🚫 {board.rules.max_doubles}ª DUPLA SEGUIDA! "
+                            f"Jogador {player_num} volta para a casa 0!"),
+                ("turn", f"Agora é a vez do Jogador {self.next_player + 1}! 🎲"),
+            ]
+        if self.event & EVENT_STAY:
+            parts += [
+                ("move", f"e ficou na casa {self.from_position}"),
+                ("stay", f"CHEGADA EXATA! Precisava de {board.size - self.from_position} "
+                         f"para chegar na casa {board.size}."),
+            ]
+        else:
+            parts.append(("move", f"e andou de {self.from_position} para {target}"))
+        if self.event & EVENT_BOUNCE:
+            bounce_back = target - board.size
+            parts.append(("bounce", f"RICOCHETE! Passou do {board.size} por {bounce_back} casas e voltou de "
+                                    f"{board.size} para {board.size - bounce_back}!"))
+        if board.rules.chained:
+            # Em cadeia: uma parte por cobra ou escada, na ordem, a partir da casa alcançada
+            if self.event & EVENT_STAY:
+                square = self.from_position
+            elif self.event & EVENT_BOUNCE:
+                square = 2 * board.size - target
+            else:
+                square = target
+            while square in board.snakes or square in board.ladders:
+                if square in board.snakes:
+                    parts.append(_snake_part(square, board.snakes[square]))
+                    square = board.snakes[square]
+                else:
+                    parts.append(_ladder_part(square, board.ladders[square]))
+                    square = board.ladders[square]
+        else:
+            if self.event & EVENT_SNAKE:
+                head = board.snake_heads[target]
+                parts.append(_snake_part(head, board.snakes[head]))
+            if self.event & EVENT_LADDER:
+                base = board.ladder_bases[target]
+                parts.append(_ladder_part(base, board.ladders[base]))
+        if self.winner is not None:
+            parts.append(("win", f"🏆 VENCEDOR! Jogador {player_num} chegou na casa {board.size}!"))
+        elif self.double:
+            parts.append(("double", f"🎯 DADOS IGUAIS! Jogador {player_num} joga novamente!"))
+        else:
+            parts.append(("turn", f"Agora é a vez do Jogador {self.next_player + 1}! 🎲"))
+        return parts
+
+    def __str__(self):
+        return " | ".join(text for _, text in self.parts())
+
+    def __repr__(self):
+        return (
+            f"MoveResult(player={self.player}, dice={self.dice}, from_position={self.from_position}, "
+            f"to_position={self.to_position}, event={self.event}, double={self.double}, winner={self.winner})"
+        )
+
+
+# Tabuleiros do layout padrão por (casa final, dados, regras): um jogo novo não recalcula a chave do layout
+_default_boards = {}
+# Snapshot do estado inicial, compartilhado pelos jogos com o mesmo número de jogadores e tipo das casas
+_initial_snapshots = {}
+
+
+def _initial_snapshot(players, typecode):
+    snapshot = _initial_snapshots.get((players, typecode))
+    if snapshot is None:
+        counters = MoveLog(players).counters()
+        snapshot = _initial_snapshots[players, typecode] = (array(typecode, [0]) * players, 0, 0, False, counters)
+    return snapshot
+
+
 class SnakesLadders:
     """
     Classe com a lógica do jogo.
     
     Essa classe cuida da posição dos jogadores, gerencia os turnos, define as regras e condições de vitória.
+    O layout (cobras, escadas, dados e regras) fica no tabuleiro compilado, imutável e
+    compartilhado entre todos os jogos iguais; cada jogo guarda só o próprio estado.
     """
+
+    __slots__ = ("board", "players", "player_positions", "current_player", "doubles_streak", "game_over",
+                 "move_history", "seed", "snapshots")
     
-    def __init__(self):
-        """Inicializa o jogo."""
-        # Inicializa as posições dos jogadores
-        self.player_positions = [0, 0]
+    def __init__(self, seed=None, players=2, size=LAST_SQUARE, dice=DICE_COUNT, snakes=None, ladders=None,
+                 rules=None):
+        """
+        Inicializa o jogo (com `seed`, os dados de cada jogada são determinísticos).
+
+        `players`, `size` e `dice` configuram o número de jogadores, a casa final e
+        o número de dados; sem `snakes`/`ladders`, o tabuleiro de 100 casas usa o
+        layout clássico e os demais começam sem cobras nem escadas. `rules` escolhe
+        a variante de regras (`board.Rules`; ver também `board.VARIANTS`).
+        """
+        # Tabela de transições compilada (compartilhada entre jogos com o mesmo layout)
+        if snakes is None and ladders is None:
+            board = _default_boards.get((size, dice, rules))
+            if board is None:
+                classic = size == LAST_SQUARE
+                board = compile_board(CLASSIC_SNAKES if classic else {}, CLASSIC_LADDERS if classic else {},
+                                      size, dice, rules)
+                _default_boards[size, dice, rules] = board
+        else:
+            # Cobras (chave: cabeça, valor: cauda) e escadas (chave: base, valor: topo)
+            if size == LAST_SQUARE:
+                snakes = CLASSIC_SNAKES if snakes is None else snakes
+                ladders = CLASSIC_LADDERS if ladders is None else ladders
+            board = compile_board(snakes or {}, ladders or {}, size, dice, rules)
+        self.board = board
+        self.players = players
+        # Posições dos jogadores (um array compacto, mesmo com centenas de jogadores)
+        self.player_positions = array(square_typecode(size), [0]) * players
+        # Histórico de movimentos para replay/desfazer (colunas compactas, ver move_log.py)
+        self.move_history = MoveLog(players, dice, size)
+        self.snapshots = []
+        self._start(seed)
+
+    def _start(self, seed):
+        """Estado inicial da partida (as posições e o histórico já devem estar zerados)."""
         # Jogador 1 começa (índice 0)
         self.current_player = 0
+        # Jogadas seguidas com dados iguais no turno atual
+        self.doubles_streak = 0
         # Jogo não está finalizado inicialmente
         self.game_over = False
-        # Histórico de movimentos para replay/desfazer
-        self.move_history = []
-        # Define as cobras (chave: cabeça, valor: cauda)
-        self.snakes = {
-            16: 6,
-            46: 25,
-            49: 11,
-            62: 19,
-            64: 60,
-            74: 53,
-            89: 68,
-            92: 88,
-            95: 75,
-            99: 80
-        }
-        # Define as escadas (chave: base, valor: topo)
-        self.ladders = {
-            2: 38,
-            7: 14,
-            8: 31,
-            15: 26,
-            21: 42,
-            28: 84,
-            36: 44,
-            51: 67,
-            71: 91,
-            78: 98,
-            87: 94
-        }
+        # Semente da partida: os dados da jogada k dependem apenas de (seed, k)
+        self.seed = random.getrandbits(64) if seed is None else seed & _MASK64
+        # Snapshots a cada SNAPSHOT_INTERVAL jogadas (o primeiro é o estado inicial, compartilhado)
+        self.snapshots[:] = [_initial_snapshot(self.players, self.player_positions.typecode)]
+
+    @property
+    def snakes(self):
+        """Cobras do tabuleiro (chave: cabeça, valor: cauda), somente leitura."""
+        return self.board.snakes
+
+    @property
+    def ladders(self):
+        """Escadas do tabuleiro (chave: base, valor: topo), somente leitura."""
+        return self.board.ladders
     
-    def play(self, die1, die2):
-        """Processa o turno do jogador com os dados rolados."""
+    def play(self, *dice):
+        """
+        Processa o turno do jogador com os dados rolados (um valor por dado).
+
+        Retorna um `MoveResult` (a mensagem sai de `str(result)`), ou None se o
+        jogo já terminou. Levanta ValueError se o número de dados não é o do
+        tabuleiro ou se algum valor está fora de 1 a 6 (nada é gravado).
+        """
         if self.game_over:
-            return "Jogo finalizado!"
-        
-        player_num = self.current_player + 1
-        move = die1 + die2
-        old_position = self.player_positions[self.current_player]
-        new_position = old_position + move
-        
-        # Cria mensagem detalhada do movimento
-        message_parts = [
-            f"Jogador {player_num} rolou {die1}+{die2}={move}",
-            f"e andou de {old_position} para {new_position}"
-        ]
-        
-        # Trata ricochete
-        if new_position > 100:
-            bounce_back = new_position - 100
-            new_position = 100 - bounce_back
-            message_parts.append(
-                f"RICOCHETE! Passou do 100 por {bounce_back} casas e voltou de 100 para {new_position}!"
-            )
-        
-        # Verifica cobras
-        if new_position in self.snakes:
-            old_snake_pos = new_position
-            new_position = self.snakes[new_position]
-            message_parts.append(
-                f"Opaa mermão! Cobra lazarenta te pegou na casa {old_snake_pos}! Desceu até a casa {new_position}! 🐍"
-            )
+            return None
         
-        # Verifica escadas
-        if new_position in self.ladders:
-            old_ladder_pos = new_position
-            new_position = self.ladders[new_position]
-            message_parts.append(
-                f"Boa malandrão! Achou uma escadinha top na casa {old_ladder_pos}! Subiu direto pra casa {new_position}! 🪜"
-            )
+        player = self.current_player
+        board = self.board
+        # Soma e dados iguais tabelados por jogada válida; as demais são conferidas
+        roll = board.rolls.get(dice)
+        total, double = board.check_roll(dice) if roll is None else roll
+        old_position = self.player_positions[player]
+        target = old_position + total
+        new_position = board.destinations[target]
+        event = board.events[target]
+        if event & EVENT_STAY:
+            new_position = old_position
+        if double and self.doubles_streak + 1 == board.rules.max_doubles:
+            # Penalidade: a última dupla permitida não anda e manda o jogador para o início
+            new_position = 0
+            event = EVENT_PENALTY
         
-        # Atualiza posição
-        self.player_positions[self.current_player] = new_position
+        # Atualiza posição e registra a jogada no histórico
+        self.player_positions[player] = new_position
+        length = self.move_history.append(player, dice, old_position, new_position, event, double)
         
-        # Verifica vitória
-        if new_position == 100:
+        winner = None
+        if event & EVENT_WIN:
+            # Vitória
             self.game_over = True
-            message_parts.append(f"🏆 VENCEDOR! Jogador {player_num} chegou na casa 100!")
-            return " | ".join(message_parts)
-        
-        # Próximo turno
-        if die1 != die2:
-            next_player = 2 if self.current_player == 0 else 1
-            message_parts.append(f"Agora é a vez do Jogador {next_player}! 🎲")
-            self.current_player = 1 - self.current_player
+            winner = player
+        elif double and event != EVENT_PENALTY:
+            # Dados iguais: o jogador joga novamente
+            self.doubles_streak += 1
         else:
-            message_parts.append(f"🎯 DADOS IGUAIS! Jogador {player_num} joga novamente!")
+            # Próximo turno
+            self.current_player = (player + 1) % self.players
+            self.doubles_streak = 0
         
-        return " | ".join(message_parts)
+        # Snapshot do estado a cada SNAPSHOT_INTERVAL jogadas (o de índice k é o estado
+        # após k * SNAPSHOT_INTERVAL jogadas); depois de desfazer, os snapshots das
+        # jogadas substituídas por esta são descartados. Nas demais jogadas, só a comparação
+        snapshots = self.snapshots
+        due = length // SNAPSHOT_INTERVAL + 1
+        if len(snapshots) != due:
+            if length % SNAPSHOT_INTERVAL == 0:
+                del snapshots[due - 1:]
+                snapshots.append(self._snapshot())
+            else:
+                del snapshots[due:]
+        return MoveResult(player, dice, old_position, new_position, event, target, double, winner,
+                          self.current_player, board)
+    
+    def roll_dice(self):
+        """Rola os dados da próxima jogada a partir da semente da partida."""
+        dice_count = self.board.dice
+        word = _mix64(self.seed ^ _mix64(len(self.move_history)))
+        dice = []
+        # Cada bloco de até _DICE_PER_WORD dados usa uma palavra de 64 bits; cada dado é
+        # um dígito na base 6 do valor sorteado (o primeiro é o mais significativo)
+        for chunk, first in enumerate(range(0, dice_count, _DICE_PER_WORD)):
+            count = min(_DICE_PER_WORD, dice_count - first)
+            value = (_mix64(word + chunk) if chunk else word) % 6 ** count
+            faces = []
+            for _ in range(count):
+                value, face = divmod(value, 6)
+                faces.append(face + 1)
+            dice.extend(reversed(faces))
+        return tuple(dice)
+    
+    def _snapshot(self):
+        """Estado atual da partida, para restaurar ao navegar pelo histórico."""
+        return (self.player_positions[:], self.current_player, self.doubles_streak, self.game_over,
+                self.move_history.counters())
+    
+    def seek(self, turn):
+        """
+        Leva a partida ao estado após a jogada `turn` (0 é o início).
+
+        Restaura o snapshot anterior mais próximo e reaplica no máximo
+        SNAPSHOT_INTERVAL jogadas do histórico; jogadas desfeitas podem ser refeitas.
+        """
+        history = self.move_history
+        turn = max(0, min(turn, history.recorded))
+        index = min(turn // SNAPSHOT_INTERVAL, len(self.snapshots) - 1)
+        positions, current_player, doubles_streak, game_over, counters = self.snapshots[index]
+        self.player_positions = positions[:]
+        self.current_player = current_player
+        self.doubles_streak = doubles_streak
+        self.game_over = game_over
+        for move in range(index * SNAPSHOT_INTERVAL, turn):
+            player = history.players[move]
+            event = history.events[move]
+            self.player_positions[player] = history.to_positions[move]
+            if event & EVENT_WIN:
+                self.game_over = True
+            elif history.is_double(move) and event != EVENT_PENALTY:
+                self.current_player = player
+                self.doubles_streak += 1
+            else:
+                self.current_player = (player + 1) % self.players
+                self.doubles_streak = 0
+        history.seek(turn, counters, index * SNAPSHOT_INTERVAL)
+        return turn
+    
+    def undo(self):
+        """Desfaz a última jogada. Retorna False se não houver o que desfazer."""
+        turn = len(self.move_history)
+        if turn == 0:
+            return False
+        self.seek(turn - 1)
+        return True
+    
+    def redo(self):
+        """Refaz a próxima jogada desfeita. Retorna False se não houver o que refazer."""
+        turn = len(self.move_history)
+        if turn == self.move_history.recorded:
+            return False
+        self.seek(turn + 1)
+        return True
     
     def get_player_positions(self):
-        """Retorna as posições atuais dos dois jogadores."""
+        """Retorna as posições atuais dos jogadores."""
         return self.player_positions
     
     def get_current_player(self):
@@ -115,37 +374,30 @@ class SnakesLadders:
         return self.game_over
     
     def reset_game(self):
-        """Reinicia o jogo para seu estado inicial."""
-        self.__init__()
+        """
+        Reinicia o jogo para seu estado inicial (mesmos jogadores, tabuleiro, dados e regras).
+
+        Reaproveita o objeto, o tabuleiro e as colunas do histórico; só a semente é nova.
+        """
+        positions = self.player_positions
+        positions[:] = _initial_snapshot(self.players, positions.typecode)[0]
+        self.move_history.clear()
+        self._start(None)
+        
+    def simulate_batch(self, n_games, seed=None):
+        """Simula `n_games` partidas completas deste tabuleiro de uma só vez (ver simulation.py)."""
+        from simulation import simulate_batch
+        return simulate_batch(self.board, n_games, seed, players=self.players)
+    
+    def analyze(self):
+        """Retorna a análise exata (cadeia de Markov) deste tabuleiro (ver analysis.py)."""
+        from analysis import analyze_board
+        return analyze_board(self.board)
         
     def get_move_history(self):
         """Retorna o histórico de movimentos do jogo."""
         return self.move_history
     
     def get_game_stats(self):
-        """Retorna estatísticas do jogo atual."""
-        if not self.move_history:
-            return {"turnos": 0, "movimentos": {0: 0, 1: 0}, "cobras": {0: 0, 1: 0}, "escadas": {0: 0, 1: 0}}
-        
-        stats = {
-            "turnos": len(self.move_history),
-            "movimentos": {0: 0, 1: 0},  # Contagem de movimentos por jogador
-            "cobras": {0: 0, 1: 0},  # Contagem de cobras atingidas por jogador
-            "escadas": {0: 0, 1: 0},  # Contagem de escadas subidas por jogador
-            "duplas": {0: 0, 1: 0},  # Contagem de duplas roladas por jogador
-        }
-        
-        for move in self.move_history:
-            player = move["player"]
-            stats["movimentos"][player] += 1
-            
-            # Conta cobras, escadas e duplas
-            if move["special"] == "snake":
-                stats["cobras"][player] += 1
-            elif move["special"] == "ladder":
-                stats["escadas"][player] += 1
-                
-            if move["dice"][0] == move["dice"][1]:
-                stats["duplas"][player] += 1
-                
-        return stats
\ No newline at end of file
+        """Retorna estatísticas do jogo atual (contadores mantidos a cada jogada)."""
+        return self.move_history.stats()
@@ -1,18 +1,26 @@
+import atexit
 import dash
-from dash import dcc, html, Input, Output, State, ctx
+from dash import dcc, html, Input, Output, State, ClientsideFunction, ctx, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import numpy as np
-from base64 import b64encode
 import os
-import random
 import time
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from SnakesLadders import SnakesLadders
+import metrics
+from board import LAST_SQUARE
+from game_archive import ArchiveWriter
+from game_assets import PLAYER_COUNT, board_geometry, build_assets, build_board_variants, pick_board_variant
+from session_store import GameStore
+import spectator
+from state_codec import decode_game, encode_game
 from styles import CUSTOM_STYLES
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
-app.server
+server = app.server
 
 # Adiciona CSS personalizado
 app.index_string = '''
@@ -37,401 +45,615 @@ app.index_string = '''
 </html>
 '''
 
-# Cria uma instância do jogo
-game = SnakesLadders()
+# Modo sem estado: a partida vive codificada no navegador (dcc.Store "game-store"),
+# e qualquer worker pode atender qualquer requisição
+STATELESS = os.environ.get("SNAKES_STATELESS", "0") == "1"
+# Modo de renderização: "server" (saídas completas) ou "client" (só o delta da jogada)
+CLIENT_RENDER = os.environ.get("SNAKES_RENDER", "server") == "client"
+# Auto-play: jogadas por tique do dcc.Interval e intervalo entre os tiques (ms)
+AUTOPLAY_TURNS = int(os.environ.get("SNAKES_AUTOPLAY_TURNS", 5))
+AUTOPLAY_INTERVAL = int(os.environ.get("SNAKES_AUTOPLAY_INTERVAL", 2500))
 
-# Função para gerar imagens de dados
-def create_dice_image(value):
-    """Cria uma imagem de um dado com o valor fornecido."""
-    img = Image.new('RGBA', (100, 100), (255, 255, 255, 255))
-    draw = ImageDraw.Draw(img)
-    
-    # Desenha o contorno do dado
-    draw.rectangle([(5, 5), (95, 95)], outline=(0, 0, 0), width=2)
-    
-    # Desenha os pontos baseados no valor
-    if value in [1, 3, 5]:
-        # Ponto central
-        draw.ellipse([(45, 45), (55, 55)], fill=(0, 0, 0))
-    
-    if value in [2, 3, 4, 5, 6]:
-        # Ponto superior-esquerdo
-        draw.ellipse([(20, 20), (30, 30)], fill=(0, 0, 0))
-        # Ponto inferior-direito
-        draw.ellipse([(70, 70), (80, 80)], fill=(0, 0, 0))
-    
-    if value in [4, 5, 6]:
-        # Ponto superior-direito
-        draw.ellipse([(70, 20), (80, 30)], fill=(0, 0, 0))
-        # Ponto inferior-esquerdo
-        draw.ellipse([(20, 70), (30, 80)], fill=(0, 0, 0))
-    
-    if value == 6:
-        # Ponto meio-esquerdo
-        draw.ellipse([(20, 45), (30, 55)], fill=(0, 0, 0))
-        # Ponto meio-direito
-        draw.ellipse([(70, 45), (80, 55)], fill=(0, 0, 0))
-    
-    # Converte para base64 para exibição no Dash
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    return f"data:image/png;base64,{b64encode(buffer.getvalue()).decode()}"
-
-# Tokens dos jogadores
-def create_player_token(player_num):
-    """Cria uma imagem de token do jogador."""
-    size = 50  # Tamanho aumentado para melhor visibilidade
-    colors = [(255, 0, 0, 230), (0, 0, 255, 230)]  # Vermelho e Azul com alta opacidade
-    
-    img = Image.new('RGBA', (size, size), (255, 255, 255, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Desenha círculo com borda branca
-    draw.ellipse([(0, 0), (size, size)], fill=colors[player_num], 
-                outline=(255, 255, 255), width=2)
-    
-    # Adiciona número do jogador
-    try:
-        font = ImageFont.truetype("arial.ttf", 25)
-    except IOError:
-        font = ImageFont.load_default()
-    
-    # Centraliza o texto
-    text = str(player_num + 1)
-    text_bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = text_bbox[2] - text_bbox[0]
-    text_height = text_bbox[3] - text_bbox[1]
-    
-    x = (size - text_width) // 2
-    y = (size - text_height) // 2
-    
-    # Adiciona sombra para melhor legibilidade
-    draw.text((x+1, y+1), text, fill=(0, 0, 0, 128), font=font)
-    draw.text((x, y), text, fill=(255, 255, 255), font=font)
-    
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    return f"data:image/png;base64,{b64encode(buffer.getvalue()).decode()}"
-
-# Layout para a aplicação Dash
-app.layout = dbc.Container([
-    # Cabeçalho
-    dbc.Row([
-        dbc.Col([
-            html.H1("Cobras e Escadas", className="text-center mb-4"),
-            html.Div(id="game-message", className="alert alert-info text-center"),
-        ], width=12)
-    ], className="mb-4"),
+# Partidas por sessão do navegador (cada aba tem seu próprio jogo)
+games = GameStore(
+    SnakesLadders,
+    max_games=int(os.environ.get("SNAKES_MAX_GAMES", 10000)),
+    ttl=float(os.environ.get("SNAKES_SESSION_TTL", 3600)),
+)
+# Modo sem estado: o estado do cliente só é aceito na configuração e nas regras
+# desta partida modelo e com no máximo SNAKES_MAX_STATE_MOVES jogadas no histórico refeito
+STATE_MODEL = SnakesLadders(seed=0)
+MAX_STATE_MOVES = int(os.environ.get("SNAKES_MAX_STATE_MOVES", 2000))
+# Com SNAKES_PRELOAD=1 (ex.: gunicorn --preload), carrega o solver e a tabela de
+# chances de vitória antes de criar os workers; sem ela, a carga (NumPy e a
+# tabela do disco) fica para o primeiro callback e o worker sobe mais rápido
+PRELOAD = os.environ.get("SNAKES_PRELOAD", "0") == "1"
+
+def win_chances(game):
+    """Chances de vitória no estado atual (o solver só é importado no primeiro uso)."""
+    from solver import win_probabilities
+    return win_probabilities(game.board, game.get_player_positions(), game.get_current_player(),
+                             game.doubles_streak)
+
+if PRELOAD:
+    from solver import win_table
+    win_table(SnakesLadders().board)
+
+# Com SNAKES_ARCHIVE_DIR, toda jogada é gravada no arquivo binário desse diretório
+# (em lotes, por uma thread; ver game_archive.py)
+ARCHIVE = None
+if os.environ.get("SNAKES_ARCHIVE_DIR"):
+    ARCHIVE = ArchiveWriter(os.environ["SNAKES_ARCHIVE_DIR"])
+    atexit.register(ARCHIVE.close)
+
+@contextmanager
+def open_game(session_id, encoded_state):
+    """Entrega a partida da requisição: do estado codificado ou da sessão no servidor."""
+    if STATELESS:
+        try:
+            game = decode_game(encoded_state, STATE_MODEL, MAX_STATE_MOVES) if encoded_state else None
+        except ValueError:
+            # Estado inválido ou forjado no navegador: começa uma partida nova
+            game = None
+        yield game or SnakesLadders()
+    else:
+        with games.session(session_id) as game:
+            yield game
+
+# Imagens de dados e tokens pré-renderizadas como arquivos estáticos (reaproveitadas
+# do disco quando o manifesto está atualizado, sem importar o PIL)
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+ASSET_PATHS = build_assets(ASSETS_DIR)
+# Variantes do tabuleiro em várias larguras, com as dimensões medidas de cada uma
+BOARD_VARIANTS = build_board_variants(ASSETS_DIR)
+# Tabelas casa -> pixel de cada variante no tabuleiro padrão, prontas antes da primeira jogada
+for variant in BOARD_VARIANTS:
+    board_geometry(variant["width"], variant["height"], LAST_SQUARE)
+# Os arquivos gerados têm a versão na URL, então o navegador pode mantê-los em cache
+server.config["SEND_FILE_MAX_AGE_DEFAULT"] = 86400
+
+# Métricas do Prometheus em /metrics: callbacks, PIL e partidas vivas (ver metrics.py)
+metrics.REGISTRY.register(metrics.Gauge(
+    "snakes_sessions", "Sessões com partida em memória neste processo.", lambda: len(games)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "snakes_games_in_progress", "Partidas em memória ainda não finalizadas.",
+    lambda: sum(not game.is_game_over() for game in games.games())))
+metrics.install(app)
+
+# Sessões pelo id do canal dos espectadores (só no modo com estado, em que o processo
+# conhece as partidas), para mandar o estado atual a quem abre o link
+WATCHED_SESSIONS = OrderedDict()
+WATCHED_SESSIONS_LOCK = threading.Lock()
+
+def watched_state(channel_id):
+    """Estado atual da partida do canal, ou None se a sessão não está neste processo."""
+    session_id = WATCHED_SESSIONS.get(channel_id)
+    if session_id is None:
+        return None
+    with games.existing(session_id) as game:
+        return None if game is None else spectator_state(game)
+
+# Transmissão para espectadores em /watch/<id> (SSE; ver spectator.py)
+HUB = spectator.SpectatorHub(snapshot=None if STATELESS else watched_state)
+
+def asset_url(path):
+    """URL de uma imagem gerada; data URIs (pasta de assets somente leitura) passam direto."""
+    return path if path.startswith("data:") else app.get_asset_url(path)
+
+def dice_url(value):
+    """URL estática da imagem do dado."""
+    return asset_url(ASSET_PATHS[f"dice-{value}"])
+
+def token_url(player_num):
+    """URL estática da imagem do token do jogador."""
+    return asset_url(ASSET_PATHS[f"token-{player_num}"])
+
+def board_dimensions(variant):
+    """
+    Dimensões medidas da variante e o tamanho do token nela.
+
+    Na renderização no navegador vai junto a tabela "cells" de `board_geometry`
+    (posição do token em cada casa), que o clientside.js só consulta.
+    """
+    token_size, cells = board_geometry(variant["width"], variant["height"], LAST_SQUARE)
+    dims = {"width": variant["width"], "height": variant["height"], "token": token_size}
+    if CLIENT_RENDER:
+        dims["cells"] = cells
+    return dims
+
+# Página do espectador com a maior variante do tabuleiro
+spectator.install(
+    app, HUB, asset_url(BOARD_VARIANTS[-1]["path"]), board_dimensions(BOARD_VARIANTS[-1]),
+    board_geometry(BOARD_VARIANTS[-1]["width"], BOARD_VARIANTS[-1]["height"], LAST_SQUARE)[1],
+    [token_url(player) for player in range(PLAYER_COUNT)])
+
+# Chances de vitória dos jogadores
+def create_win_chance(chances):
+    """Mostra a chance exata de vitória de cada jogador no estado atual."""
+    return html.Div([
+        html.Small("Chance de vitória: "),
+        html.Strong(f"{chances[0]:.1%}", className="text-danger"),
+        html.Small(" × "),
+        html.Strong(f"{chances[1]:.1%}", className="text-primary"),
+    ], className="text-center")
+
+# Layout para a aplicação Dash (gerado por acesso, com um id de sessão novo)
+def serve_layout():
+    """Monta o layout da página com um id de sessão exclusivo."""
+    return dbc.Container([
+        # Cabeçalho
+        dbc.Row([
+            dbc.Col([
+                html.H1("Cobras e Escadas", className="text-center mb-4"),
+                html.Div(id="game-message", className="alert alert-info text-center"),
+            ], width=12)
+        ], className="mb-4"),
     
-    # Tabuleiro do Jogo e Controles
-    dbc.Row([
-        # Coluna Esquerda - Tabuleiro
-        dbc.Col([
-            html.Div([
-                html.Img(id="board-image", className="img-fluid"),
-                html.Div(id="player-tokens"),
-            ], style={"position": "relative"})
-        ], width=8),
-        
-    # Coluna Direita - Controles
-    dbc.Col([
-        dbc.Card([
-            dbc.CardHeader(html.H3("Status da Partida", className="text-center")),
-            dbc.CardBody([
-                # Indicador de Turno Atual
+        # Tabuleiro do Jogo e Controles
+        dbc.Row([
+            # Coluna Esquerda - Tabuleiro
+            dbc.Col([
                 html.Div([
-                    html.Div(id="current-turn-indicator", className="turn-indicator")
-                ], className="mb-4"),
+                    html.Img(id="board-image", className="img-fluid"),
+                    html.Div(id="player-tokens"),
+                ], style={"position": "relative"})
+            ], width=8),
+        
+        # Coluna Direita - Controles
+        dbc.Col([
+            dbc.Card([
+                dbc.CardHeader(html.H3("Status da Partida", className="text-center")),
+                dbc.CardBody([
+                    # Indicador de Turno Atual
+                    html.Div([
+                        html.Div(id="current-turn-indicator", className="turn-indicator"),
+                        html.Div(id="win-chance")
+                    ], className="mb-4"),
                 
-                # Status dos Jogadores
-                dbc.Row([
-                    # Jogador 1
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Jogador 1", className="text-danger mb-2"),
-                            html.Div(id="player1-progress", className="progress-bar player1"),
-                            html.Div(id="player1-position", className="mt-2")
-                        ])
-                    ], width=6),
+                    # Status dos Jogadores
+                    dbc.Row([
+                        # Jogador 1
+                        dbc.Col([
+                            html.Div([
+                                html.H4("Jogador 1", className="text-danger mb-2"),
+                                html.Div(id="player1-progress", className="progress-bar player1"),
+                                html.Div(id="player1-position", className="mt-2")
+                            ])
+                        ], width=6),
                     
-                    # Jogador 2
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Jogador 2", className="text-primary mb-2"),
-                            html.Div(id="player2-progress", className="progress-bar player2"),
-                            html.Div(id="player2-position", className="mt-2")
-                        ])
-                    ], width=6)
-                ], className="mb-4"),
+                        # Jogador 2
+                        dbc.Col([
+                            html.Div([
+                                html.H4("Jogador 2", className="text-primary mb-2"),
+                                html.Div(id="player2-progress", className="progress-bar player2"),
+                                html.Div(id="player2-position", className="mt-2")
+                            ])
+                        ], width=6)
+                    ], className="mb-4"),
                 
-                # Área dos Dados
-                html.Div([
-                    html.H4("Dados", className="text-center mb-3"),
+                    # Área dos Dados
                     html.Div([
-                        html.Img(id="die1-image", className="dice",
-                                src=create_dice_image(1),
-                                style={"width": "80px", "height": "80px", "margin": "0 10px"}),
-                        html.Img(id="die2-image", className="dice",
-                                src=create_dice_image(1),
-                                style={"width": "80px", "height": "80px", "margin": "0 10px"}),
-                    ], className="d-flex justify-content-center mb-4"),
-                ]),
+                        html.H4("Dados", className="text-center mb-3"),
+                        html.Div([
+                            html.Img(id="die1-image", className="dice",
+                                    src=dice_url(1),
+                                    style={"width": "80px", "height": "80px", "margin": "0 10px"}),
+                            html.Img(id="die2-image", className="dice",
+                                    src=dice_url(1),
+                                    style={"width": "80px", "height": "80px", "margin": "0 10px"}),
+                        ], className="d-flex justify-content-center mb-4"),
+                    ]),
+                
+                    # Botões de Ação
+                    dbc.Button(
+                        html.Span([
+                            "🎲 Rolar Dados ",
+                            html.Small(id="dice-sum", className="ms-2")
+                        ]), 
+                        id="roll-button",
+                        color="primary",
+                        className="mb-3 w-100",
+                        size="lg"
+                    ),
+                    dbc.Button("🔄 Novo Jogo", id="reset-button", 
+                            color="secondary", className="w-100"),
+                
+                    # Auto-play: várias jogadas por tique, sem cliques
+                    dbc.Row([
+                        dbc.Col(dbc.Switch(id="autoplay-switch", label="▶️ Auto-play", value=False), width=6),
+                        dbc.Col(dbc.Button("⏩ Terminar", id="finish-button", color="secondary",
+                                           outline=True, size="sm", className="w-100"), width=6),
+                    ], className="mt-3 align-items-center"),
+                    dcc.Interval(id="autoplay-interval", interval=AUTOPLAY_INTERVAL, disabled=True),
+                    html.Div(html.A("📺 Link para espectadores", id="watch-link", target="_blank"),
+                             className="text-center mt-2"),
                 
-                # Botões de Ação
-                dbc.Button(
-                    html.Span([
-                        "🎲 Rolar Dados ",
-                        html.Small(id="dice-sum", className="ms-2")
-                    ]), 
-                    id="roll-button",
-                    color="primary",
-                    className="mb-3 w-100",
-                    size="lg"
-                ),
-                dbc.Button("🔄 Novo Jogo", id="reset-button", 
-                        color="secondary", className="w-100"),
+                    # Linha do tempo: desfazer, refazer e ir para qualquer jogada
+                    html.Div([
+                        html.H5("⏪ Linha do Tempo", className="text-center mt-4 mb-2"),
+                        dcc.Slider(id="timeline", min=0, max=0, step=1, value=0, marks=None,
+                                   tooltip={"placement": "bottom"}),
+                        dbc.ButtonGroup([
+                            dbc.Button("↩️ Desfazer", id="undo-button", color="secondary", outline=True),
+                            dbc.Button("↪️ Refazer", id="redo-button", color="secondary", outline=True),
+                        ], className="w-100 mt-2"),
+                    ]),
                 
-                # Storage Components
-                html.Div(id="game-state", style={"display": "none"}),
-                dcc.Store(id="dice-values", data={"die1": 1, "die2": 1}),
-                dcc.Store(id="board-dimensions", data={"width": 564, "height": 564}),
+                    # Storage Components
+                    html.Div(id="game-state", style={"display": "none"}),
+                    dcc.Store(id="dice-values", data={"die1": 1, "die2": 1}),
+                    dcc.Store(id="board-width"),
+                    dcc.Store(id="board-dimensions", data=board_dimensions(BOARD_VARIANTS[-1])),
+                    dcc.Store(id="session-id", data=str(uuid.uuid4()), storage_type="session"),
+                    dcc.Store(id="game-store"),
+                    dcc.Store(id="game-delta"),
+                    dcc.Store(id="asset-urls", data={name: asset_url(path) for name, path in ASSET_PATHS.items()}),
+                ])
             ])
-        ])
-    ], width=4)
-    ], className="mb-4"),
+        ], width=4)
+        ], className="mb-4"),
     
-    # Seção de Regras
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader(
-                    html.H4("🎲 Regras do Jogo", className="text-center mb-0")
-                ),
-                dbc.CardBody([
-                    dbc.Row([
-                        # Coluna de Regras Básicas
-                        dbc.Col([
-                            html.H5("📜 Regras Básicas", className="mb-3"),
-                            html.Ul([
-                                html.Li("Dois jogadores começam na posição 0"),
-                                html.Li("Jogador Vermelho (1) começa, alternando com o Azul (2)"),
-                                html.Li("Avance pelos números em ordem até chegar ao 100"),
-                                html.Li("Se tirar números iguais nos dados, jogue novamente!")
-                            ], className="mb-4"),
-                        ], width=4),
-                        
-                        # Coluna de Movimentos Especiais
-                        dbc.Col([
-                            html.H5("🎯 Movimentos Especiais", className="mb-3"),
-                            html.Ul([
-                                html.Li([
-                                    html.Strong("🪜 Escadas: "), 
-                                    "Ao cair exatamente na base, suba direto ao topo!"
-                                ]),
-                                html.Li([
-                                    html.Strong("🐍 Cobras: "), 
-                                    "Se parar na cabeça, escorrega até a cauda!"
-                                ])
-                            ], className="mb-4"),
-                        ], width=4),
+        # Seção de Regras
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(
+                        html.H4("🎲 Regras do Jogo", className="text-center mb-0")
+                    ),
+                    dbc.CardBody([
+                        dbc.Row([
+                            # Coluna de Regras Básicas
+                            dbc.Col([
+                                html.H5("📜 Regras Básicas", className="mb-3"),
+                                html.Ul([
+                                    html.Li("Dois jogadores começam na posição 0"),
+                                    html.Li("Jogador Vermelho (1) começa, alternando com o Azul (2)"),
+                                    html.Li("Avance pelos números em ordem até chegar ao 100"),
+                                    html.Li("Se tirar números iguais nos dados, jogue novamente!")
+                                ], className="mb-4"),
+                            ], width=4),
                         
-                        # Coluna de Condições de Vitória
-                        dbc.Col([
-                            html.H5("🏆 Como Vencer", className="mb-3"),
-                            html.Ul([
-                                html.Li([
-                                    "Chegue exatamente na casa 100",
+                            # Coluna de Movimentos Especiais
+                            dbc.Col([
+                                html.H5("🎯 Movimentos Especiais", className="mb-3"),
+                                html.Ul([
+                                    html.Li([
+                                        html.Strong("🪜 Escadas: "), 
+                                        "Ao cair exatamente na base, suba direto ao topo!"
                                     ]),
                                     html.Li([
-                                    "Se passar, volta! Exemplo: na casa 98, ",
-                                    "tirando 5, vai até 100 e volta para 97"
-                                ]),                              
-                            ]),
-                        ], width=4),
+                                        html.Strong("🐍 Cobras: "), 
+                                        "Se parar na cabeça, escorrega até a cauda!"
+                                    ])
+                                ], className="mb-4"),
+                            ], width=4),
+                        
+                            # Coluna de Condições de Vitória
+                            dbc.Col([
+                                html.H5("🏆 Como Vencer", className="mb-3"),
+                                html.Ul([
+                                    html.Li([
+                                        "Chegue exatamente na casa 100",
+                                        ]),
+                                        html.Li([
+                                        "Se passar, volta! Exemplo: na casa 98, ",
+                                        "tirando 5, vai até 100 e volta para 97"
+                                    ]),                              
+                                ]),
+                            ], width=4),
+                        ])
                     ])
-                ])
-            ], className="shadow")
-        ], width=12)
-    ])
-], fluid=True)
+                ], className="shadow")
+            ], width=12)
+        ])
+    ], fluid=True)
 
-# Callback para rolar os dados e atualizar o estado do jogo
-@app.callback(
-    [Output("dice-values", "data"),
-     Output("die1-image", "src"),
-     Output("die2-image", "src"),
-     Output("game-message", "children"),
-     Output("game-state", "children"),
-     Output("current-turn-indicator", "children"),
-     Output("current-turn-indicator", "className"),
-     Output("player1-progress", "style"),
-     Output("player2-progress", "style"),
-     Output("player1-position", "children"),
-     Output("player2-position", "children"),
-     Output("dice-sum", "children")],
-    [Input("roll-button", "n_clicks"),
-     Input("reset-button", "n_clicks")],
-    [State("dice-values", "data"),
-     State("game-state", "children")]
-)
-def update_game(roll_clicks, reset_clicks, dice_data, game_state):
-    triggered_id = ctx.triggered_id
-    positions = game.get_player_positions()
+app.layout = serve_layout
+
+# Saídas visuais atualizadas a cada jogada (no servidor ou no navegador)
+RENDER_OUTPUTS = [
+    Output("die1-image", "src"),
+    Output("die2-image", "src"),
+    Output("game-message", "children"),
+    Output("game-state", "children"),
+    Output("current-turn-indicator", "children"),
+    Output("current-turn-indicator", "className"),
+    Output("win-chance", "children"),
+    Output("player1-progress", "style"),
+    Output("player2-progress", "style"),
+    Output("player1-position", "children"),
+    Output("player2-position", "children"),
+    Output("dice-sum", "children"),
+]
+
+def spectator_state(game, **extra):
+    """Estado compacto da partida enviado aos espectadores."""
+    return dict(extra, positions=game.get_player_positions().tolist(), current=game.get_current_player(),
+                over=game.is_game_over(), size=game.board.size, turn=len(game.get_move_history()))
+
+def play_move(game, channel=None):
+    """
+    Rola os dados e joga; retorna os dados e o `MoveResult` (None se o jogo já acabou).
+
+    A jogada é gravada no arquivo (se ativo) e publicada no canal dos espectadores
+    (`channel`, se alguém assiste à partida).
+    """
+    history = game.get_move_history()
+    replaced = len(history) < history.recorded
+    dice = game.roll_dice()
+    result = game.play(*dice)
+    if result is not None:
+        if ARCHIVE is not None:
+            ARCHIVE.record(game, replaced)
+        if channel is not None:
+            HUB.publish(channel, "move", spectator_state(
+                game, player=result.player, dice=list(dice), to=result.to_position, event=result.event))
+    return dice, result
+
+def play_turn(game, triggered_id, roll_clicks, dice_data, game_state, timeline_turn=None, channel=None):
+    """
+    Aplica a ação disparada (rolar, auto-play, terminar, reiniciar ou navegar no
+    histórico) à partida da sessão.
+
+    Retorna o delta mínimo do estado: dados, posições, jogador da vez, código do
+    evento da jogada (None quando não houve jogada), chances de vitória, partes da
+    mensagem (com o tipo de cada uma em "kinds", ver `MoveResult.parts`) e a posição
+    na linha do tempo. No auto-play com renderização no
+    navegador, "frames" traz cada jogada do lote ([jogador, casa, evento, *dados]),
+    a partir das posições em "start", para serem animadas a cada "step" ms.
+
+    `channel` é o canal dos espectadores da partida (None se ninguém assiste).
+    """
+    delta = {"dice": None, "event": None, "message": None, "kinds": None}
     
     # Inicializa ou reinicia o jogo
     if triggered_id == "reset-button" or game_state is None:
-        game.__init__()
-        return (
-            {"die1": 1, "die2": 1},  # dice-values
-            create_dice_image(1),     # die1-image
-            create_dice_image(1),     # die2-image
-            "Jogo começou! Turno do jogador 1.",  # game-message
-            "active",                 # game-state
-            html.Div([               # current-turn-indicator children
-                html.Img(src=create_player_token(0), 
-                        style={"width": "30px", "height": "30px"}),
-                html.Strong("Vez do Jogador 1")
-            ]),
-            "turn-indicator player1",  # current-turn-indicator className
-            {"width": "0%"},          # player1-progress style
-            {"width": "0%"},          # player2-progress style
-            "Posição: 0/100",         # player1-position
-            "Posição: 0/100",         # player2-position
-            ""                        # dice-sum
-        )
+        game.reset_game()
+        delta["message"] = ["Jogo começou! Turno do jogador 1."]
+        if channel is not None:
+            HUB.publish(channel, "reset", spectator_state(game))
     
     # Rola os dados
-    if triggered_id == "roll-button" and roll_clicks:
-        die1 = random.randint(1, 6)
-        die2 = random.randint(1, 6)
-        result = game.play(die1, die2)
-        current_player = game.get_current_player() + 1
-        positions = game.get_player_positions()
-        
-        # Divide a mensagem em partes
-        message_parts = result.split(" | ")
-        
-        # Cria mensagem formatada
-        message = html.Div([
-            # Dados e movimento básico
-            html.Div([
-                html.Strong(message_parts[0], style={"color": "#2c3e50"}),
-                html.Span(f" {message_parts[1]}")
-            ], style={"font-size": "1.2em", "margin-bottom": "8px"}),
-            
-            # Eventos especiais
-            *[html.Div(
-                part,
-                style={
-                    "color": "#e74c3c" if "Cobra" in part else
-                            "#27ae60" if "Escadinha" in part else
-                            "#f39c12" if "RICOCHETE" in part else
-                            "#3498db" if "Turno" in part else
-                            "#f1c40f" if "DADOS IGUAIS" in part else
-                            "#e67e22" if "VENCEU" in part else "inherit",
-                    "font-weight": "bold",
-                    "margin": "5px 0",
-                    "font-size": "1.1em"
-                }
-            ) for part in message_parts[2:]]
-        ], className="game-message")
-        
-        return (
-            {"die1": die1, "die2": die2},  # dice-values
-            create_dice_image(die1),        # die1-image
-            create_dice_image(die2),        # die2-image
-            message,                        # game-message
-            "over" if "wins" in result.lower() else "active",  # game-state
-            html.Div([                      # current-turn-indicator children
-                html.Img(src=create_player_token(current_player-1), 
-                        style={"width": "30px", "height": "30px"}),
-                html.Strong(f"Vez do Jogador {current_player}")
-            ]),
-            f"turn-indicator player{current_player}",  # current-turn-indicator className
-            {"width": f"{(positions[0])}%"},  # player1-progress style
-            {"width": f"{(positions[1])}%"},  # player2-progress style
-            f"Posição: {positions[0]}/100",   # player1-position
-            f"Posição: {positions[1]}/100",   # player2-position
-            f"({die1} + {die2} = {die1 + die2})"  # dice-sum
-        )
+    elif triggered_id == "roll-button" and roll_clicks:
+        dice, result = play_move(game, channel)
+        delta["dice"] = list(dice)
+        if result is None:
+            delta["event"] = 0
+            delta["message"] = ["Jogo finalizado!"]
+        else:
+            delta["event"] = result.event
+            delta["kinds"], delta["message"] = map(list, zip(*result.parts()))
+    
+    # Auto-play: até AUTOPLAY_TURNS jogadas em uma única chamada
+    elif triggered_id == "autoplay-interval":
+        if game.is_game_over():
+            raise PreventUpdate
+        start = game.get_player_positions().tolist()
+        frames = []
+        while len(frames) < AUTOPLAY_TURNS and not game.is_game_over():
+            dice, result = play_move(game, channel)
+            frames.append([result.player, result.to_position, result.event, *dice])
+        delta["dice"] = list(dice)
+        delta["event"] = result.event
+        delta["kinds"], delta["message"] = map(list, zip(*result.parts()))
+        if CLIENT_RENDER:
+            delta.update(frames=frames, start=start, step=AUTOPLAY_INTERVAL // AUTOPLAY_TURNS)
+    
+    # Termina a partida de uma vez, mostrando apenas o estado final
+    elif triggered_id == "finish-button":
+        if game.is_game_over():
+            raise PreventUpdate
+        moves = 0
+        while not game.is_game_over():
+            dice, result = play_move(game, channel)
+            moves += 1
+        delta["dice"] = list(dice)
+        kind, text = result.parts()[-1]
+        delta["event"] = result.event
+        delta["kinds"] = ["finish", kind]
+        delta["message"] = [f"⏩ Partida concluída em {moves} jogadas!", text]
+    
+    # Navega pelo histórico (desfazer, refazer ou linha do tempo)
+    elif triggered_id in ("undo-button", "redo-button", "timeline"):
+        if triggered_id == "undo-button":
+            game.undo()
+        elif triggered_id == "redo-button":
+            game.redo()
+        else:
+            game.seek(timeline_turn or 0)
+        history = game.get_move_history()
+        if len(history):
+            delta["dice"] = list(history[-1].dice)
+        delta["message"] = [f"⏪ Linha do tempo: jogada {len(history)} de {history.recorded}."]
     
     # Retorno padrão (estado atual do jogo)
-    current_player = game.get_current_player() + 1
+    else:
+        delta["dice"] = [dice_data.get("die1", 1), dice_data.get("die2", 1)] if dice_data else None
+    
+    delta["positions"] = game.get_player_positions().tolist()
+    delta["size"] = game.board.size
+    delta["current"] = game.get_current_player()
+    delta["over"] = game.is_game_over()
+    delta["chances"] = win_chances(game)
+    delta["turn"] = len(game.get_move_history())
+    delta["turns"] = game.get_move_history().recorded
+    return delta
+
+# Cor de cada tipo de parte da mensagem (ver `MoveResult.parts`)
+MESSAGE_COLORS = {
+    "snake": "#e74c3c",
+    "ladder": "#27ae60",
+    "bounce": "#f39c12",
+    "stay": "#f39c12",
+    "penalty": "#e74c3c",
+    "turn": "#3498db",
+    "double": "#f1c40f",
+    "win": "#e67e22",
+}
+
+def create_message(message_parts, kinds=None):
+    """Formata as partes da mensagem da jogada, coloridas pelo tipo de cada uma (`kinds`)."""
+    if message_parts is None:
+        return "Jogue os dados ou comece um novo jogo."
+    if len(message_parts) == 1:
+        return message_parts[0]
+    kinds = kinds or [None] * len(message_parts)
+    return html.Div([
+        # Dados e movimento básico
+        html.Div([
+            html.Strong(message_parts[0], style={"color": "#2c3e50"}),
+            html.Span(f" {message_parts[1]}")
+        ], style={"font-size": "1.2em", "margin-bottom": "8px"}),
+        
+        # Eventos especiais
+        *[html.Div(
+            part,
+            style={
+                "color": MESSAGE_COLORS.get(kind, "inherit"),
+                "font-weight": "bold",
+                "margin": "5px 0",
+                "font-size": "1.1em"
+            }
+        ) for part, kind in zip(message_parts[2:], kinds[2:])]
+    ], className="game-message")
+
+def render_game(delta):
+    """Converte o delta da jogada nas saídas visuais (modo de renderização no servidor)."""
+    die1, die2 = delta["dice"] or [1, 1]
+    positions = delta["positions"]
+    size = delta["size"]
+    current_player = delta["current"] + 1
     return (
-        dice_data,                    # dice-values
-        create_dice_image(dice_data.get("die1", 1)),  # die1-image
-        create_dice_image(dice_data.get("die2", 1)),  # die2-image
-        "Jogue os dados ou comece um novo jogo.",  # game-message
-        game_state or "active",       # game-state
-        html.Div([                    # current-turn-indicator children
-            html.Img(src=create_player_token(current_player-1), 
+        dice_url(die1),                 # die1-image
+        dice_url(die2),                 # die2-image
+        create_message(delta["message"], delta.get("kinds")),  # game-message
+        "over" if delta["over"] else "active",  # game-state
+        html.Div([                      # current-turn-indicator children
+            html.Img(src=token_url(current_player-1), 
                     style={"width": "30px", "height": "30px"}),
             html.Strong(f"Vez do Jogador {current_player}")
         ]),
         f"turn-indicator player{current_player}",  # current-turn-indicator className
-        {"width": f"{positions[0]}%"},  # player1-progress style
-        {"width": f"{positions[1]}%"},  # player2-progress style
-        f"Posição: {positions[0]}/100", # player1-position
-        f"Posição: {positions[1]}/100", # player2-position
-        ""                             # dice-sum
+        create_win_chance(delta["chances"]),  # win-chance
+        {"width": f"{100 * positions[0] / size}%"},  # player1-progress style
+        {"width": f"{100 * positions[1] / size}%"},  # player2-progress style
+        f"Posição: {positions[0]}/{size}",   # player1-position
+        f"Posição: {positions[1]}/{size}",   # player2-position
+        "" if delta["event"] is None else f"({die1} + {die2} = {die1 + die2})"  # dice-sum
     )
 
-# Callback para atualizar os tokens dos jogadores no tabuleiro
+# Callback para rolar os dados e atualizar o estado do jogo. No modo "client" ele
+# devolve apenas o delta e a renderização acontece em um callback no navegador
+# (assets/clientside.js); no modo "server" devolve também todas as saídas visuais.
 @app.callback(
-    Output("player-tokens", "children"),
-    [Input("game-state", "children"),
-     Input("board-image", "src")],
-    [State("board-dimensions", "data")]
+    [Output("game-delta", "data"),
+     Output("dice-values", "data"),
+     Output("game-store", "data"),
+     Output("timeline", "max"),
+     Output("timeline", "value")] + ([] if CLIENT_RENDER else RENDER_OUTPUTS),
+    [Input("roll-button", "n_clicks"),
+     Input("reset-button", "n_clicks"),
+     Input("undo-button", "n_clicks"),
+     Input("redo-button", "n_clicks"),
+     Input("timeline", "value"),
+     Input("autoplay-interval", "n_intervals"),
+     Input("finish-button", "n_clicks")],
+    [State("dice-values", "data"),
+     State("game-state", "children"),
+     State("session-id", "data"),
+     State("game-store", "data")]
+)
+def update_game(roll_clicks, reset_clicks, undo_clicks, redo_clicks, timeline_turn, autoplay_ticks,
+                finish_clicks, dice_data, game_state, session_id, encoded_state):
+    channel = spectator.watch_id(session_id)
+    with open_game(session_id, encoded_state) as game:
+        delta = play_turn(game, ctx.triggered_id, roll_clicks, dice_data, game_state, timeline_turn,
+                          channel if HUB.watched(channel) else None)
+        # Espectador que chegou sem receber o estado (modo sem estado): vai nesta chamada
+        if HUB.waiting(channel):
+            HUB.publish(channel, "state", spectator_state(game))
+        # O histórico vai junto para manter a sequência de dados e a linha do tempo
+        encoded = encode_game(game, include_log=True) if STATELESS else no_update
+    die1, die2 = delta["dice"] or [1, 1]
+    outputs = (delta, {"die1": die1, "die2": die2}, encoded, delta["turns"], delta["turn"])
+    if CLIENT_RENDER:
+        return outputs
+    return outputs + render_game(delta)
+
+# Link público para assistir à partida da sessão
+@app.callback(
+    Output("watch-link", "href"),
+    Input("session-id", "data")
+)
+def update_watch_link(session_id):
+    """Endereço da página do espectador (não revela o id da sessão)."""
+    channel = spectator.watch_id(session_id)
+    if not STATELESS:
+        with WATCHED_SESSIONS_LOCK:
+            WATCHED_SESSIONS[channel] = session_id
+            WATCHED_SESSIONS.move_to_end(channel)
+            while len(WATCHED_SESSIONS) > games.max_games:
+                WATCHED_SESSIONS.popitem(last=False)
+    return app.get_relative_path(f"/watch/{channel}")
+
+# O auto-play para no fim da partida e volta ao começar outra
+app.clientside_callback(
+    ClientsideFunction(namespace="snakes", function_name="autoplay"),
+    Output("autoplay-interval", "disabled"),
+    [Input("autoplay-switch", "value"),
+     Input("game-delta", "data")]
 )
-def update_player_tokens(game_state, board_src, board_dims):
-    if game_state is None or board_src is None:
+
+# Renderização no navegador a partir do delta: dados, mensagem, turno, barras de
+# progresso e tokens, sem nova requisição ao servidor
+if CLIENT_RENDER:
+    app.clientside_callback(
+        ClientsideFunction(namespace="snakes", function_name="render"),
+        RENDER_OUTPUTS + [Output("player-tokens", "children")],
+        [Input("game-delta", "data"),
+         Input("board-dimensions", "data")],
+        State("asset-urls", "data")
+    )
+
+# Callback para atualizar os tokens dos jogadores no tabuleiro
+def update_player_tokens(game_state, board_dims, delta):
+    if game_state is None or not isinstance(board_dims, dict) or not isinstance(delta, dict):
         return []
+    # Os stores vêm do navegador: a variante é a do servidor com a largura informada,
+    # e só o tabuleiro padrão tem tokens
+    positions = delta.get("positions")
+    if delta.get("size") != LAST_SQUARE or not isinstance(positions, list):
+        return []
+    variant = pick_board_variant(BOARD_VARIANTS, board_dims.get("width"))
     
-    # Dimensões exatas do tabuleiro e configurações
-    BOARD_WIDTH = 564  # largura da imagem do tabuleiro
-    BOARD_HEIGHT = 564  # altura da imagem do tabuleiro
-    GRID_SIZE = 10  # tabuleiro 10x10
-    TOKEN_SIZE = 40  # tamanho reduzido para caber melhor nas células
-    
-    # Calcula o tamanho de cada célula
-    cell_width = BOARD_WIDTH / GRID_SIZE
-    cell_height = BOARD_HEIGHT / GRID_SIZE
+    # Posição (left, top) de cada casa na variante exibida, calculada uma vez por variante
+    token_size, cells = board_geometry(variant["width"], variant["height"], LAST_SQUARE)
     
-    player_positions = game.get_player_positions()
     player_tokens = []
+    # Tokens já desenhados em cada casa, para deslocar os seguintes
+    stacked = {}
     
-    for player_num, position in enumerate(player_positions):
-        if position > 0:  # se o jogador está no tabuleiro
-            # Converte a posição para coordenadas de grid
-            pos = position - 1
+    for player_num, position in enumerate(positions):
+        # Só jogadores no tabuleiro (casas inválidas são ignoradas)
+        if isinstance(position, int) and 0 < position <= LAST_SQUARE:
+            left, top = cells[position]
             
-            # Calcula linha e coluna
-            row = 9 - (pos // 10)  # inverte as linhas pois 100 está no topo
-            col = pos % 10
-            
-            # Ajusta a coluna para linhas que vão da direita para esquerda
-            if (9 - row) % 2 == 1:  # Linhas pares (contando de cima) vão da direita para esquerda
-                col = 9 - col
-            
-            # Calcula as coordenadas em pixels
-            left = col * cell_width + (cell_width - TOKEN_SIZE) / 2
-            top = row * cell_height + (cell_height - TOKEN_SIZE) / 2
-            
-            # Ajusta posição quando dois jogadores estão na mesma casa
-            if player_num == 1 and position == player_positions[0]:
-                left += TOKEN_SIZE / 3
-                top += TOKEN_SIZE / 3
+            # Ajusta posição quando vários jogadores estão na mesma casa
+            offset = stacked.get(position, 0)
+            stacked[position] = offset + 1
+            left += offset * token_size / 3
+            top += offset * token_size / 3
             
             player_tokens.append(
                 html.Img(
-                    src=create_player_token(player_num),
+                    src=token_url(player_num % PLAYER_COUNT),
                     style={
                         "position": "absolute",
                         "left": f"{left}px",
                         "top": f"{top}px",
-                        "width": f"{TOKEN_SIZE}px",
-                        "height": f"{TOKEN_SIZE}px",
-                        "z-index": str(1000 + player_num),  # Player 2 fica sobre Player 1
+                        "width": f"{token_size}px",
+                        "height": f"{token_size}px",
+                        "z-index": str(1000 + player_num),  # Jogadores seguintes ficam por cima
                         "transition": "all 0.5s ease-in-out",  # Animação suave
                         "border-radius": "50%",  # Torna a imagem circular
                         "box-shadow": "2px 2px 5px rgba(0,0,0,0.3)"  # Adiciona sombra
@@ -441,22 +663,31 @@ def update_player_tokens(game_state, board_src, board_dims):
     
     return player_tokens
 
-@app.callback(
-    Output("board-dimensions", "data"),
-    Input("board-image", "src")
+if not CLIENT_RENDER:
+    app.callback(
+        Output("player-tokens", "children"),
+        [Input("game-state", "children"),
+         Input("board-dimensions", "data")],
+        State("game-delta", "data")
+    )(update_player_tokens)
+
+# Largura disponível para o tabuleiro, medida no navegador (assets/clientside.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="snakes", function_name="boardWidth"),
+    Output("board-width", "data"),
+    Input("board-image", "id")
 )
-def update_board_dimensions(_):
-    """Atualiza as dimensões do tabuleiro com valores conhecidos."""
-    return {"width": 564, "height": 564}  # Dimensões fixas de board.jpg
 
-# Adicione um callback para carregar a imagem do tabuleiro
+# Escolhe a variante do tabuleiro que cabe na coluna, sem ser redimensionada pelo navegador
 @app.callback(
-    Output("board-image", "src"),
-    Input("board-image", "id")
+    [Output("board-image", "src"),
+     Output("board-dimensions", "data")],
+    Input("board-width", "data")
 )
-def update_board_image(_):
-    """Carrega a imagem do tabuleiro da pasta assets."""
-    return app.get_asset_url("board.jpg")
+def update_board_image(available_width):
+    """Carrega a variante do tabuleiro adequada à largura disponível."""
+    variant = pick_board_variant(BOARD_VARIANTS, available_width)
+    return asset_url(variant["path"]), board_dimensions(variant)
 
 # Executa a aplicação
 if __name__ == "__main__":
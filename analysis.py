@@ -0,0 +1,172 @@
+"""
+Análise exata de um tabuleiro por cadeia de Markov absorvente.
+
+Modela a trajetória de um jogador com as regras de `SnakesLadders.play()`
+(soma dos dados, ricochete na casa final, cobra e depois escada, nova jogada com
+dados iguais) a partir da tabela compilada do tabuleiro, e calcula de forma exata o
+número esperado de jogadas, a distribuição do turno de chegada e a probabilidade
+de parar em cada casa. Os resultados ficam memorizados por layout.
+
+Com a penalidade de dados iguais seguidos (`Rules.max_doubles`), cada casa vira
+uma camada por número de duplas já tiradas no turno, e a cadeia continua exata.
+"""
+import numpy as np
+
+from board import DICE_COUNT, EVENT_STAY, LAST_SQUARE, compile_board
+
+
+class BoardAnalysis:
+    """Resultados exatos da cadeia de Markov de um tabuleiro compilado."""
+
+    def __init__(self, board):
+        self.board = board
+        last = self.last = board.size
+        max_doubles = board.rules.max_doubles
+        # Estado (duplas seguidas no turno, casa) no índice `camada * last + casa`; o último é a casa final
+        layers = self.layers = max_doubles or 1
+        states = layers * last + 1
+        destinations = np.frombuffer(board.destinations, dtype=board.destinations.typecode)
+        events = np.frombuffer(board.events, dtype=np.uint8)
+        positions = np.arange(last)
+
+        def state(layer, squares):
+            return np.where(squares == last, states - 1, layer * last + squares)
+
+        # Transições de uma jogada, separadas entre as que mantêm o turno (dados
+        # iguais sem chegar à casa final) e as que o encerram
+        repeat = np.zeros((states, states))
+        finish = np.zeros((states, states))
+        for roll, double, probability in board.outcomes():
+            landed = destinations[positions + roll]
+            if board.rules.exact_landing:
+                landed = np.where(events[positions + roll] & EVENT_STAY, positions, landed)
+            for layer in range(layers):
+                rows = layer * last + positions
+                if not double:
+                    np.add.at(finish, (rows, state(0, landed)), probability)
+                elif max_doubles and layer + 1 == max_doubles:
+                    # Penalidade: volta para a casa 0 e passa a vez
+                    finish[rows, 0] += probability
+                else:
+                    columns = state(layer + 1 if max_doubles else 0, landed)
+                    won = columns == states - 1
+                    np.add.at(repeat, (rows[~won], columns[~won]), probability)
+                    np.add.at(finish, (rows[won], columns[won]), probability)
+        # A casa final é absorvente
+        finish[-1, -1] = 1.0
+        self.rolls = repeat + finish
+
+        # Matriz fundamental por jogada: visitas esperadas aos estados transitórios
+        transient = self.rolls[:-1, :-1]
+        self.fundamental = np.linalg.inv(np.eye(states - 1) - transient)
+
+        # Transições de um turno completo (todo turno começa sem duplas, na camada 0)
+        starts = np.append(positions, states - 1)
+        self.turns = np.linalg.solve(np.eye(states) - repeat, finish)[np.ix_(starts, starts)]
+        # Número esperado de jogadas dentro de um turno, a partir de cada casa
+        self.rolls_per_turn = np.linalg.solve(np.eye(states) - repeat, np.ones(states))[starts]
+
+        self._finish_distribution = np.zeros(1)
+        self._distribution_state = np.eye(last + 1)[0]
+
+    @property
+    def expected_rolls(self):
+        """Número esperado de jogadas (lançamentos de dados) para chegar à casa final."""
+        return float(self.fundamental[0].sum())
+
+    @property
+    def expected_turns(self):
+        """Número esperado de turnos (com as jogadas extras de dados iguais) até a casa final."""
+        transient = self.turns[:self.last, :self.last]
+        steps = np.linalg.solve(np.eye(self.last) - transient, np.ones(self.last))
+        return float(steps[0])
+
+    @property
+    def expected_visits(self):
+        """Número esperado de vezes que o jogador termina uma jogada em cada casa."""
+        visits = np.zeros(self.last + 1)
+        visits[:self.last] = self.fundamental[0].reshape(self.layers, self.last).sum(axis=0)
+        visits[self.last] = 1.0
+        return visits
+
+    @property
+    def landing_probabilities(self):
+        """Probabilidade de o jogador parar pelo menos uma vez em cada casa."""
+        last = self.last
+        landing = np.zeros(last + 1)
+        # Estados de cada casa (um por camada) e visitas esperadas a eles a partir do início
+        rows = np.arange(self.layers) * last + np.arange(last)[:, None]
+        visits = self.fundamental[0][rows]
+        # Visitas a partir de cada estado da casa: visits = chegada @ revisits, pela primeira chegada
+        revisits = self.fundamental[rows[:, :, None], rows[:, None, :]]
+        arrival = np.linalg.solve(revisits.transpose(0, 2, 1), visits[:, :, None])[:, :, 0]
+        landing[:last] = arrival.sum(axis=1)
+        landing[last] = 1.0
+        return landing
+
+    def finish_distribution(self, max_turns):
+        """
+        Distribuição do turno de chegada à casa final até `max_turns`.
+
+        O elemento `t` é a probabilidade de o jogador chegar exatamente no turno `t`
+        (o elemento 0 é sempre zero). Turnos já calculados são reaproveitados.
+        """
+        computed = len(self._finish_distribution) - 1
+        if max_turns > computed:
+            extra = np.zeros(max_turns - computed)
+            state = self._distribution_state
+            for turn in range(max_turns - computed):
+                finished = state[self.last]
+                state = state @ self.turns
+                extra[turn] = state[self.last] - finished
+            self._distribution_state = state
+            self._finish_distribution = np.concatenate([self._finish_distribution, extra])
+        distribution = self._finish_distribution[:max_turns + 1]
+        distribution.flags.writeable = False
+        return distribution
+
+    def duel(self, tolerance=1e-12, max_turns=100000):
+        """
+        Resultados exatos de uma partida de dois jogadores neste tabuleiro.
+
+        Os jogadores não interagem, então o Jogador 1 (que começa) vence quando
+        chega à casa final em um turno menor ou igual ao do Jogador 2. Retorna a chance
+        de vitória do Jogador 1 e a duração esperada da partida em turnos e jogadas.
+        """
+        state = np.eye(self.last + 1)[0]
+        finished = 0.0
+        arrivals = []
+        rolls = []
+        while 1.0 - finished > tolerance and len(arrivals) < max_turns:
+            rolls.append(state[:self.last] @ self.rolls_per_turn[:self.last])
+            state = state @ self.turns
+            arrivals.append(state[self.last] - finished)
+            finished = state[self.last]
+        arrivals = np.array(arrivals)
+        rolls = np.array(rolls)
+        # Chance de o jogador ainda não ter chegado antes / depois de cada turno
+        after = 1.0 - np.cumsum(arrivals)
+        before = np.concatenate([[1.0], after[:-1]])
+        return {
+            "vitoria_jogador1": float((arrivals * before).sum()),
+            "turnos_esperados": float((before * before + before * after).sum()),
+            "jogadas_esperadas": float((rolls * before + rolls * after).sum()),
+        }
+
+
+# Cache de análises já calculadas (chave: layout_key do tabuleiro)
+_analyses = {}
+
+
+def analyze_board(board):
+    """Retorna a análise do tabuleiro compilado, calculando apenas na primeira vez."""
+    analysis = _analyses.get(board.key)
+    if analysis is None:
+        analysis = BoardAnalysis(board)
+        _analyses[board.key] = analysis
+    return analysis
+
+
+def analyze(snakes, ladders, size=LAST_SQUARE, dice=DICE_COUNT, rules=None):
+    """Retorna a análise exata do layout de cobras e escadas informado."""
+    return analyze_board(compile_board(snakes, ladders, size, dice, rules))
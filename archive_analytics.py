@@ -0,0 +1,229 @@
+"""
+Estatísticas de todas as partidas do arquivo binário (ver game_archive.py).
+
+Calcula, com operações vetorizadas do NumPy sobre os segmentos mapeados em
+memória: casas de parada, acertos de cada cobra e escada, frequência de dados
+iguais, percentis da duração das partidas e a vantagem do primeiro jogador.
+
+Os histogramas parciais de cada segmento ficam guardados: em um segmento ainda
+aberto só os registros novos são processados, e os de segmentos fechados
+(imutáveis) também são gravados no cache em disco, então uma nova consulta só lê o
+que foi acrescentado desde a anterior.
+
+Uso:
+    python archive_analytics.py arquivo/ --output estatisticas.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from board import EVENT_BOUNCE, EVENT_LADDER, EVENT_SNAKE, EVENT_WIN, LAST_SQUARE
+from game_archive import FLAG_DOUBLE, FLAG_REPLACED, OPEN_SUFFIX, SEGMENT_SUFFIX, list_segments, open_segment
+from SnakesLadders import SnakesLadders
+from solver import CACHE_DIR
+from tournament import TournamentHistograms
+
+# Registros processados de uma vez (limita a memória dos arrays temporários)
+CHUNK_RECORDS = 1 << 22
+
+
+def _add(total, part):
+    """Soma dois histogramas de tamanhos possivelmente diferentes."""
+    if len(part) > len(total):
+        total = np.pad(total, (0, len(part) - len(total)))
+    total[:len(part)] += part
+    return total
+
+
+class ArchiveHistograms(TournamentHistograms):
+    """Histogramas somáveis das jogadas arquivadas, além dos das partidas terminadas."""
+
+    def __init__(self, lengths=None, winners=None, snake_hits=None, ladder_hits=None, landings=None,
+                 moves=0, doubles=0, bounces=0, replaced=0, players=2, size=LAST_SQUARE):
+        super().__init__(lengths, winners, snake_hits, ladder_hits, players, size)
+        self.landings = np.zeros(size + 1, dtype=np.int64) if landings is None else landings
+        self.moves = moves
+        self.doubles = doubles
+        self.bounces = bounces
+        self.replaced = replaced
+
+    def merge(self, other):
+        """Soma os histogramas de outro conjunto de jogadas a este."""
+        self.lengths = _add(self.lengths, other.lengths)
+        self.winners = _add(self.winners, other.winners)
+        self.snake_hits = _add(self.snake_hits, other.snake_hits)
+        self.ladder_hits = _add(self.ladder_hits, other.ladder_hits)
+        self.landings = _add(self.landings, other.landings)
+        self.moves += other.moves
+        self.doubles += other.doubles
+        self.bounces += other.bounces
+        self.replaced += other.replaced
+        return self
+
+    def first_player_advantage(self):
+        """Fração das vitórias do Jogador 1 menos a fração esperada sem vantagem."""
+        games = self.games
+        if not games:
+            return 0.0
+        return float(self.winners[0] / games - 1 / len(self.winners))
+
+    def summary(self):
+        """Resumo em tipos JSON."""
+        summary = super().summary()
+        moves = self.moves or 1
+        summary.update({
+            "jogadas": self.moves,
+            "paradas_por_casa": {str(s): int(n) for s, n in enumerate(self.landings) if n},
+            "taxa_cobras": float(self.snake_hits.sum() / moves),
+            "taxa_escadas": float(self.ladder_hits.sum() / moves),
+            "taxa_ricochetes": self.bounces / moves,
+            "taxa_duplas": self.doubles / moves,
+            "vantagem_primeiro_jogador": self.first_player_advantage(),
+            "jogadas_refeitas": self.replaced,
+        })
+        return summary
+
+    def save(self, path, records):
+        """Grava os histogramas (e quantos registros os geraram) em um arquivo .npz."""
+        temporary = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temporary, lengths=self.lengths, winners=self.winners, snake_hits=self.snake_hits,
+                 ladder_hits=self.ladder_hits, landings=self.landings,
+                 counters=np.array([records, self.moves, self.doubles, self.bounces, self.replaced]))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Lê os histogramas gravados por `save`; retorna (registros, histogramas)."""
+        with np.load(path) as data:
+            records, moves, doubles, bounces, replaced = (int(value) for value in data["counters"])
+            return records, cls(data["lengths"], data["winners"], data["snake_hits"], data["ladder_hits"],
+                                data["landings"], moves, doubles, bounces, replaced)
+
+
+def aggregate(records, board, players=2):
+    """
+    Histogramas de um trecho de registros do arquivo jogados no tabuleiro `board`.
+
+    Cada registro com chegada na casa final conta uma partida terminada (com a
+    duração `turn + 1`); uma vitória desfeita e jogada de novo conta duas vezes.
+    """
+    size = board.size
+    snake_heads = np.frombuffer(board.snake_heads, dtype=board.snake_heads.typecode)
+    ladder_bases = np.frombuffer(board.ladder_bases, dtype=board.ladder_bases.typecode)
+    histograms = ArchiveHistograms(players=players, size=size)
+    for start in range(0, len(records), CHUNK_RECORDS):
+        chunk = records[start:start + CHUNK_RECORDS]
+        events = chunk["event"]
+        flags = chunk["flags"]
+        # Casa alcançada pelos dados (antes de ricochete, cobra e escada), como na tabela compilada
+        target = np.add(chunk["from_position"], chunk["roll"], dtype=np.int32)
+        valid = target < len(snake_heads)
+        won = (events & EVENT_WIN) != 0
+        snake = valid & ((events & EVENT_SNAKE) != 0)
+        ladder = valid & ((events & EVENT_LADDER) != 0)
+        histograms.merge(ArchiveHistograms(
+            np.bincount(chunk["turn"][won] + 1),
+            np.bincount(chunk["player"][won], minlength=players),
+            np.bincount(snake_heads[target[snake]], minlength=size + 1),
+            np.bincount(ladder_bases[target[ladder]], minlength=size + 1),
+            np.bincount(chunk["to_position"], minlength=size + 1),
+            len(chunk),
+            int(np.count_nonzero(flags & FLAG_DOUBLE)),
+            int(np.count_nonzero(events & EVENT_BOUNCE)),
+            int(np.count_nonzero(flags & FLAG_REPLACED)),
+        ))
+    return histograms
+
+
+class ArchiveAnalytics:
+    """
+    Estatísticas do arquivo em `directory`, atualizadas de forma incremental.
+
+    Todas as jogadas devem ser do mesmo tabuleiro (`board`; padrão: o do jogo).
+    """
+
+    def __init__(self, directory, board=None, players=2, cache_dir=CACHE_DIR):
+        self.directory = directory
+        self.board = SnakesLadders().board if board is None else board
+        self.players = players
+        self.cache_dir = cache_dir
+        # Por segmento (nome sem extensão): (registros já processados, histogramas)
+        self._segments = {}
+
+    def _cache_path(self, name):
+        """Arquivo do cache em disco dos histogramas de um segmento fechado."""
+        key = repr((self.board.key, os.path.abspath(self.directory), name))
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, "archive", f"{name}-{digest}.npz")
+
+    def _segment(self, path):
+        """Histogramas de um segmento, processando só os registros que ainda não foram vistos."""
+        sealed = path.endswith(SEGMENT_SUFFIX)
+        name = os.path.basename(path)[:-len(SEGMENT_SUFFIX if sealed else OPEN_SUFFIX)]
+        done, histograms = self._segments.get(name, (0, None))
+        if histograms is None and sealed:
+            try:
+                done, histograms = ArchiveHistograms.load(self._cache_path(name))
+            except (OSError, ValueError, KeyError):
+                pass
+        records = open_segment(path)
+        if histograms is None or len(records) > done:
+            part = aggregate(records[done:], self.board, self.players)
+            histograms = part if histograms is None else histograms.merge(part)
+            done = len(records)
+            if sealed:
+                try:
+                    os.makedirs(os.path.dirname(self._cache_path(name)), exist_ok=True)
+                    histograms.save(self._cache_path(name), done)
+                except OSError:
+                    pass
+        self._segments[name] = (done, histograms)
+        return name, histograms
+
+    def histograms(self):
+        """Histogramas somados de todos os segmentos do arquivo."""
+        total = ArchiveHistograms(players=self.players, size=self.board.size)
+        seen = set()
+        for path in list_segments(self.directory):
+            name, histograms = self._segment(path)
+            seen.add(name)
+            total.merge(histograms)
+        # Esquece segmentos apagados do diretório
+        for name in set(self._segments) - seen:
+            del self._segments[name]
+        return total
+
+    def summary(self):
+        """Resumo em tipos JSON de todas as partidas do arquivo."""
+        return self.histograms().summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estatísticas das partidas do arquivo binário.")
+    parser.add_argument("directory", help="diretório do arquivo (SNAKES_ARCHIVE_DIR)")
+    parser.add_argument("--players", type=int, default=2, help="jogadores por partida (padrão: 2)")
+    parser.add_argument("--output", help="grava o resultado em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summary = ArchiveAnalytics(args.directory, players=args.players).summary()
+    elapsed = time.perf_counter() - start
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle)
+    print(f"{summary['jogadas']} jogadas e {summary['partidas']} partidas em {elapsed:.1f}s", file=sys.stderr)
+    print(f"Duração: p50 {summary['duracao_percentis'].get('50')}, p90 {summary['duracao_percentis'].get('90')}, "
+          f"p99 {summary['duracao_percentis'].get('99')}", file=sys.stderr)
+    print(f"Cobras {summary['taxa_cobras']:.2%}, escadas {summary['taxa_escadas']:.2%}, "
+          f"dados iguais {summary['taxa_duplas']:.2%} das jogadas; "
+          f"vantagem do Jogador 1: {summary['vantagem_primeiro_jogador']:+.2%}", file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
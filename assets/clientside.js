@@ -0,0 +1,137 @@
+// Renderização no navegador (modo SNAKES_RENDER=client): recebe o delta da jogada
+// enviado pelo servidor e atualiza dados, mensagem, turno, barras de progresso e tokens.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    snakes: {
+        // Intervalo do auto-play desligado com a chave desligada ou com a partida terminada
+        autoplay: function (enabled, delta) {
+            return !enabled || Boolean(delta && delta.over);
+        },
+        // Largura (px) da coluna do tabuleiro, para o servidor escolher a variante da imagem
+        boardWidth: function () {
+            const image = document.getElementById("board-image");
+            return image && image.parentElement ? image.parentElement.clientWidth : null;
+        },
+        render: function (delta, dims, assets) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!delta || !assets || !dims) {
+                return Array(13).fill(noUpdate);
+            }
+            const dice = delta.dice || [1, 1];
+            const positions = delta.positions;
+            const size = delta.size || 100;
+            const player = delta.current + 1;
+            const html = function (type, props) {
+                return {type: type, namespace: "dash_html_components", props: props};
+            };
+
+            // Mensagem: primeira parte em destaque e eventos especiais coloridos
+            let message = "Jogue os dados ou comece um novo jogo.";
+            if (delta.message && delta.message.length === 1) {
+                message = delta.message[0];
+            } else if (delta.message) {
+                // Cor pelo tipo de cada parte (as mesmas de MESSAGE_COLORS no servidor)
+                const colors = {
+                    snake: "#e74c3c", ladder: "#27ae60", bounce: "#f39c12", stay: "#f39c12",
+                    penalty: "#e74c3c", turn: "#3498db", double: "#f1c40f", win: "#e67e22"
+                };
+                const kinds = delta.kinds || [];
+                message = html("Div", {className: "game-message", children: [
+                    html("Div", {
+                        style: {"font-size": "1.2em", "margin-bottom": "8px"},
+                        children: [
+                            html("Strong", {children: delta.message[0], style: {color: "#2c3e50"}}),
+                            html("Span", {children: " " + delta.message[1]})
+                        ]
+                    })
+                ].concat(delta.message.slice(2).map(function (part, index) {
+                    return html("Div", {children: part, style: {
+                        color: colors[kinds[index + 2]] || "inherit", "font-weight": "bold", margin: "5px 0", "font-size": "1.1em"
+                    }});
+                }))});
+            }
+
+            const turn = html("Div", {children: [
+                html("Img", {src: assets["token-" + delta.current], style: {width: "30px", height: "30px"}}),
+                html("Strong", {children: "Vez do Jogador " + player})
+            ]});
+            const chances = html("Div", {className: "text-center", children: [
+                html("Small", {children: "Chance de vitória: "}),
+                html("Strong", {children: (100 * delta.chances[0]).toFixed(1) + "%", className: "text-danger"}),
+                html("Small", {children: " × "}),
+                html("Strong", {children: (100 * delta.chances[1]).toFixed(1) + "%", className: "text-primary"})
+            ]});
+
+            // Tokens: posição de cada casa na tabela de board_geometry enviada com a variante exibida
+            const cells = dims.cells || [];
+            const tokenSize = dims.token;
+            const tokensAt = function (positions) {
+                const stacked = {};
+                const tokens = [];
+                if (cells.length !== size + 1) {
+                    return tokens;
+                }
+                positions.forEach(function (position, playerNum) {
+                    if (position <= 0) {
+                        return;
+                    }
+                    const offset = stacked[position] || 0;
+                    stacked[position] = offset + 1;
+                    const left = cells[position][0] + offset * tokenSize / 3;
+                    const top = cells[position][1] + offset * tokenSize / 3;
+                    tokens.push(html("Img", {src: assets["token-" + (playerNum % 2)], style: {
+                        position: "absolute",
+                        left: left + "px",
+                        top: top + "px",
+                        width: tokenSize + "px",
+                        height: tokenSize + "px",
+                        "z-index": String(1000 + playerNum),
+                        transition: "all 0.5s ease-in-out",
+                        "border-radius": "50%",
+                        "box-shadow": "2px 2px 5px rgba(0,0,0,0.3)"
+                    }}));
+                });
+                return tokens;
+            };
+
+            // Auto-play: mostra a primeira jogada do lote e anima as seguintes, uma a cada delta.step ms
+            let tokens = tokensAt(positions);
+            let shownDice = dice;
+            const triggered = window.dash_clientside.callback_context.triggered || [];
+            const resized = triggered.some(function (item) { return item.prop_id === "board-dimensions.data"; });
+            if (delta.frames && delta.frames.length > 1 && !resized) {
+                const current = delta.start.slice();
+                delta.frames.forEach(function (frame, index) {
+                    current[frame[0]] = frame[1];
+                    const framePositions = current.slice();
+                    const frameDice = frame.slice(3);
+                    if (index === 0) {
+                        tokens = tokensAt(framePositions);
+                        shownDice = frameDice;
+                        return;
+                    }
+                    setTimeout(function () {
+                        window.dash_clientside.set_props("player-tokens", {children: tokensAt(framePositions)});
+                        window.dash_clientside.set_props("die1-image", {src: assets["dice-" + frameDice[0]]});
+                        window.dash_clientside.set_props("die2-image", {src: assets["dice-" + frameDice[frameDice.length - 1]]});
+                    }, index * delta.step);
+                });
+            }
+
+            return [
+                assets["dice-" + shownDice[0]],
+                assets["dice-" + shownDice[shownDice.length - 1]],
+                message,
+                delta.over ? "over" : "active",
+                turn,
+                "turn-indicator player" + player,
+                chances,
+                {width: 100 * positions[0] / size + "%"},
+                {width: 100 * positions[1] / size + "%"},
+                "Posição: " + positions[0] + "/" + size,
+                "Posição: " + positions[1] + "/" + size,
+                delta.event === null ? "" : "(" + dice[0] + " + " + dice[1] + " = " + (dice[0] + dice[1]) + ")",
+                tokens
+            ];
+        }
+    }
+});
@@ -0,0 +1,427 @@
+"""
+Benchmarks do jogo: motor, callbacks da interface, imagens e tamanho das respostas.
+
+Mede jogadas por segundo de `SnakesLadders.play()` e da simulação em lote, o
+custo de gravar cada jogada no arquivo binário e a velocidade de lê-lo, a
+memória ocupada por partida e por sessão, o tempo de `update_game` e `update_player_tokens` chamados diretamente, o tempo de
+desenho de cada imagem com PIL e o tamanho em bytes do JSON de cada resposta de
+callback. Os resultados podem ser gravados como linha de base e comparados nas
+execuções seguintes, que apontam as métricas que pioraram além da tolerância.
+
+Uso:
+    python benchmark.py --save            # grava a linha de base
+    python benchmark.py                   # compara com a linha de base
+    python benchmark.py --quick --tolerance 0.3
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+# Linha de base padrão (ao lado deste arquivo)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Piora relativa tolerada antes de apontar uma regressão
+DEFAULT_TOLERANCE = 0.2
+# Diferença absoluta mínima para apontar uma regressão, por unidade: em tempos abaixo
+# de um milissegundo o ruído entre execuções passa facilmente da tolerância relativa
+MIN_DELTA = {"ms": 0.1, "us": 1.0}
+# Semente de todas as partidas medidas
+SEED = 12345
+# Rodadas de cada medição (vale a melhor), no modo normal e no rápido
+REPEAT = 7
+QUICK_REPEAT = 3
+# Duração mínima de uma rodada: rodadas mais curtas são refeitas com mais chamadas
+MIN_ROUND_SECONDS = 0.1
+
+
+def _best_time(function, number, repeat):
+    """
+    Menor tempo médio por chamada entre `repeat` rodadas de `number` chamadas (como timeit).
+
+    Rodadas abaixo de `MIN_ROUND_SECONDS` não contam: `number` cresce até a rodada
+    durar o suficiente para o ruído do sistema não dominar tempos curtos.
+    """
+    best = float("inf")
+    rounds = 0
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while rounds < repeat:
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            elapsed = time.perf_counter() - start
+            if elapsed < MIN_ROUND_SECONDS:
+                number = max(number * 2, math.ceil(number * MIN_ROUND_SECONDS / max(elapsed, 1e-9)))
+                continue
+            best = min(best, elapsed / number)
+            rounds += 1
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def _metric(value, unit, higher_is_better, tolerance=None):
+    """Resultado de uma medição; `tolerance` dá uma tolerância própria às métricas mais ruidosas."""
+    metric = {"valor": value, "unidade": unit, "maior_melhor": higher_is_better}
+    if tolerance is not None:
+        metric["tolerancia"] = tolerance
+    return metric
+
+
+def bench_engine(quick):
+    """
+    Jogadas por segundo de `play()` (com dados fixos e com `roll_dice()`) e da
+    simulação em lote, nas regras clássicas e em cada variante de `board.VARIANTS`.
+    """
+    from board import VARIANTS
+    from SnakesLadders import SnakesLadders
+    from simulation import simulate_batch
+
+    repeat = QUICK_REPEAT if quick else REPEAT
+    moves = 20_000 if quick else 100_000
+    rng = random.Random(SEED)
+    dice = [(rng.randint(1, 6), rng.randint(1, 6)) for _ in range(moves)]
+
+    def play_fixed():
+        game = SnakesLadders(seed=SEED)
+        for die1, die2 in dice:
+            if game.game_over:
+                game.reset_game()
+            game.play(die1, die2)
+
+    def play_rolled(**variant):
+        game = SnakesLadders(seed=SEED, **variant)
+        for _ in range(moves):
+            if game.game_over:
+                game.reset_game()
+            game.play(*game.roll_dice())
+
+    games = 5_000 if quick else 50_000
+    board = SnakesLadders(seed=SEED).board
+    batch = _best_time(lambda: simulate_batch(board, games, SEED), 1, repeat)
+    results = {
+        "motor.play": _metric(moves / _best_time(play_fixed, 1, repeat), "jogadas/s", True),
+        "motor.roll_dice+play": _metric(moves / _best_time(play_rolled, 1, repeat), "jogadas/s", True),
+        "motor.simulate_batch": _metric(games / batch, "partidas/s", True),
+    }
+    for name, variant in VARIANTS.items():
+        if not variant:
+            continue
+        seconds = _best_time(lambda: play_rolled(**variant), 1, repeat)
+        results[f"motor.roll_dice+play.{name}"] = _metric(moves / seconds, "jogadas/s", True)
+        board = SnakesLadders(seed=SEED, **variant).board
+        seconds = _best_time(lambda: simulate_batch(board, games, SEED), 1, repeat)
+        results[f"motor.simulate_batch.{name}"] = _metric(games / seconds, "partidas/s", True)
+    return results
+
+
+def bench_assets(quick):
+    """Tempo de desenho (PIL) e codificação PNG de cada imagem, sem os caches."""
+    from game_assets import PLAYER_COUNT, _png_bytes, render_dice_image, render_player_token
+
+    repeat = QUICK_REPEAT if quick else REPEAT
+    number = 20 if quick else 100
+    results = {}
+    # As imagens são desenhadas uma vez por versão do código: tolerância maior para o ruído
+    for value in range(1, 7):
+        seconds = _best_time(lambda: _png_bytes(render_dice_image(value)), number, repeat)
+        results[f"pil.dice-{value}"] = _metric(seconds * 1000, "ms", False, 0.5)
+    for player in range(PLAYER_COUNT):
+        seconds = _best_time(lambda: _png_bytes(render_player_token(player)), number, repeat)
+        results[f"pil.token-{player}"] = _metric(seconds * 1000, "ms", False, 0.5)
+    return results
+
+
+def bench_archive(quick):
+    """Custo de `ArchiveWriter.record` por jogada e leitura do arquivo mapeado em memória."""
+    import shutil
+    import tempfile
+
+    import numpy as np
+
+    from SnakesLadders import SnakesLadders
+    from game_archive import ArchiveWriter, load_archive
+
+    repeat = QUICK_REPEAT if quick else REPEAT
+    moves = 20_000 if quick else 100_000
+    directory = tempfile.mkdtemp(prefix="snakes-archive-")
+    try:
+        writer = ArchiveWriter(directory)
+        game = SnakesLadders(seed=SEED)
+
+        def record():
+            if game.game_over:
+                game.reset_game()
+            game.play(*game.roll_dice())
+            writer.record(game)
+
+        with_archive = _best_time(record, moves, repeat)
+        writer.close()
+        game = SnakesLadders(seed=SEED)
+
+        def play():
+            if game.game_over:
+                game.reset_game()
+            game.play(*game.roll_dice())
+
+        without_archive = _best_time(play, moves, repeat)
+        records = sum(len(segment) for _, segment in load_archive(directory))
+        scan = _best_time(lambda: [np.bincount(segment["to_position"])
+                                   for _, segment in load_archive(directory)], 1, repeat)
+    finally:
+        shutil.rmtree(directory)
+    return {
+        # Diferença entre dois tempos: o ruído de cada um se soma, só o dobro é regressão
+        "arquivo.record": _metric(max(with_archive - without_archive, 0.0) * 1e6, "us", False, 1.0),
+        "arquivo.leitura": _metric(records / scan, "registros/s", True),
+    }
+
+
+def _allocated_per_item(create, count):
+    """Bytes alocados (tracemalloc) por item criado por `create(índice)`, mantendo todos vivos."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        items = [create(index) for index in range(count)]
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del items
+    return allocated / count
+
+
+def bench_memory(quick):
+    """
+    Memória por partida viva: recém-criada, depois de 40 jogadas e por sessão no
+    `GameStore` (partida, lock, entrada e id da sessão), para dimensionar servidores.
+    """
+    from session_store import GameStore
+    from SnakesLadders import SnakesLadders
+
+    count = 2_000 if quick else 10_000
+    # O tabuleiro compilado é compartilhado e não entra na conta
+    SnakesLadders(seed=SEED)
+
+    def played(index):
+        game = SnakesLadders(seed=SEED + index)
+        for _ in range(40):
+            if game.game_over:
+                break
+            game.play(*game.roll_dice())
+        return game
+
+    store = GameStore(SnakesLadders, max_games=count)
+
+    def session(index):
+        session_id = str(uuid.UUID(int=index))
+        with store.session(session_id):
+            return session_id
+
+    return {
+        "memoria.partida": _metric(_allocated_per_item(lambda index: SnakesLadders(seed=SEED + index), count),
+                                   "bytes", False),
+        "memoria.partida_40_jogadas": _metric(_allocated_per_item(played, count), "bytes", False),
+        "memoria.sessao": _metric(_allocated_per_item(session, count), "bytes", False),
+    }
+
+
+def _with_trigger(prop_id, function, *args):
+    """Chama um callback diretamente, simulando o contexto do Dash com o gatilho `prop_id`."""
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict
+
+    token = context_value.set(AttributeDict(triggered_inputs=[{"prop_id": prop_id, "value": 1}]))
+    try:
+        return function(*args)
+    finally:
+        context_value.reset(token)
+
+
+def callback_payload(dependency, values, triggered):
+    """Corpo da requisição de um callback (como o navegador envia), com os valores `id.propriedade`."""
+    def spec(items):
+        return [dict(item, value=values.get(f"{item['id']}.{item['property']}")) for item in items]
+
+    output = dependency["output"]
+    if output.startswith(".."):
+        outputs = [dict(zip(("id", "property"), part.rsplit(".", 1)))
+                   for part in output.strip(".").split("...")]
+    else:
+        outputs = dict(zip(("id", "property"), output.rsplit(".", 1)))
+    return {
+        "output": output,
+        "outputs": outputs,
+        "inputs": spec(dependency["inputs"]),
+        "state": spec(dependency.get("state", [])),
+        "changedPropIds": [triggered],
+    }
+
+
+def post_callback(client, dependency, values, triggered):
+    """Dispara um callback pelo endpoint do Dash e retorna a resposta."""
+    return client.post("/_dash-update-component", json=callback_payload(dependency, values, triggered))
+
+
+def bench_dash(quick):
+    """Tempo dos callbacks chamados diretamente e bytes do JSON de cada resposta."""
+    random.seed(SEED)
+    import SnakesLadders_dash as dash_app
+
+    repeat = QUICK_REPEAT if quick else REPEAT
+    rolls = 50 if quick else 200
+    results = {}
+
+    # Callbacks chamados diretamente (sem HTTP)
+    state = {"store": None, "delta": None, "clicks": 0}
+    dice_data = {"die1": 1, "die2": 1}
+
+    def roll():
+        state["clicks"] += 1
+        outputs = _with_trigger(
+            "roll-button.n_clicks", dash_app.update_game,
+            state["clicks"], None, None, None, None, None, None, dice_data, "active", "benchmark", state["store"])
+        state["delta"] = outputs[0]
+        if dash_app.STATELESS:
+            state["store"] = outputs[2]
+
+    _with_trigger("reset-button.n_clicks", dash_app.update_game,
+                  None, 1, None, None, None, None, None, dice_data, None, "benchmark", None)
+    seconds = _best_time(roll, rolls, repeat)
+    results["dash.update_game"] = _metric(seconds * 1000, "ms", False)
+    dimensions = dash_app.board_dimensions(dash_app.BOARD_VARIANTS[-1])
+    seconds = _best_time(
+        lambda: dash_app.update_player_tokens("active", dimensions, state["delta"]), rolls, repeat)
+    results["dash.update_player_tokens"] = _metric(seconds * 1000, "ms", False)
+
+    # Respostas reais do servidor (envelope JSON completo)
+    client = dash_app.server.test_client()
+    dependencies = client.get("/_dash-dependencies").get_json()
+    server_side = [item for item in dependencies if not item.get("clientside_function")]
+    update_game = next(item for item in server_side if "game-delta.data" in item["output"])
+    values = {
+        "session-id.data": "benchmark-http",
+        "dice-values.data": dice_data,
+        "game-state.children": "active",
+    }
+    reset = post_callback(client, update_game, dict(values, **{"reset-button.n_clicks": 1}),
+                           "reset-button.n_clicks")
+    results["json.update_game.reset"] = _metric(len(reset.data), "bytes", False)
+    total = 0
+    for clicks in range(1, rolls + 1):
+        response = post_callback(client, update_game, dict(values, **{"roll-button.n_clicks": clicks}),
+                                  "roll-button.n_clicks")
+        body = response.get_json()["response"]
+        total += len(response.data)
+        values["game-delta.data"] = body["game-delta"]["data"]
+        if "game-store" in body:
+            values["game-store.data"] = body["game-store"]["data"]
+    results["json.update_game.roll"] = _metric(total / rolls, "bytes", False)
+    tokens = [item for item in server_side if "player-tokens.children" in item["output"]]
+    if tokens:
+        values["board-dimensions.data"] = dimensions
+        response = post_callback(client, tokens[0], values, "game-state.children")
+        results["json.update_player_tokens"] = _metric(len(response.data), "bytes", False)
+    return results
+
+
+def run_benchmarks(quick=False):
+    """Executa todos os benchmarks e retorna os resultados com a descrição do ambiente."""
+    results = {}
+    for bench in (bench_engine, bench_archive, bench_memory, bench_assets, bench_dash):
+        results.update(bench(quick))
+    return {
+        "ambiente": {
+            "python": platform.python_version(),
+            "maquina": platform.machine(),
+            "render": os.environ.get("SNAKES_RENDER", "server"),
+            "sem_estado": os.environ.get("SNAKES_STATELESS", "0") == "1",
+            "rapido": quick,
+        },
+        "resultados": results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara os resultados com a linha de base.
+
+    Os tempos comparados são sempre o melhor de N rodadas (`_best_time`). Uma
+    métrica só é regressão se piorar além da tolerância (a maior entre `tolerance`
+    e a da própria métrica) e além da diferença mínima da unidade (`MIN_DELTA`).
+
+    Retorna uma lista de (nome, valor na base, valor atual, variação relativa,
+    regressão), em que a variação é positiva quando a métrica melhorou.
+    """
+    rows = []
+    for name, metric in current["resultados"].items():
+        base = baseline["resultados"].get(name)
+        if base is None or not base["valor"]:
+            continue
+        change = (metric["valor"] - base["valor"]) / base["valor"]
+        if not metric["maior_melhor"]:
+            change = -change
+        limit = max(tolerance, metric.get("tolerancia", 0.0))
+        delta = abs(metric["valor"] - base["valor"])
+        regression = change < -limit and delta > MIN_DELTA.get(metric["unidade"], 0.0)
+        rows.append((name, base["valor"], metric["valor"], change, regression))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do jogo e da interface.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="arquivo JSON da linha de base")
+    parser.add_argument("--save", action="store_true", help="grava os resultados como nova linha de base")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="piora relativa tolerada (padrão: 0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="menos repetições (resultados mais ruidosos)")
+    parser.add_argument("--output", help="grava também os resultados desta execução neste arquivo")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.quick)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(current, handle, indent=2)
+
+    baseline = None
+    if not args.save:
+        try:
+            with open(args.baseline, encoding="utf-8") as handle:
+                baseline = json.load(handle)
+        except FileNotFoundError:
+            print(f"Sem linha de base em {args.baseline} (use --save para criar)", file=sys.stderr)
+
+    if baseline is None:
+        for name, metric in current["resultados"].items():
+            print(f"{name:32} {metric['valor']:>14,.3f} {metric['unidade']}")
+    else:
+        if baseline["ambiente"] != current["ambiente"]:
+            print(f"Aviso: ambiente diferente da linha de base {baseline['ambiente']}", file=sys.stderr)
+        rows = compare(current, baseline, args.tolerance)
+        for name, base, value, change, regression in rows:
+            unit = current["resultados"][name]["unidade"]
+            flag = "  REGRESSÃO" if regression else ""
+            print(f"{name:32} {base:>14,.3f} -> {value:>14,.3f} {unit:10} {change:+7.1%}{flag}")
+        regressions = [row[0] for row in rows if row[4]]
+        if regressions:
+            print(f"{len(regressions)} regressões acima de {args.tolerance:.0%}: {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(current, handle, indent=2)
+        print(f"Linha de base gravada em {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
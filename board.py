@@ -0,0 +1,271 @@
+"""
+Compilador de tabuleiros de Cobras e Escadas.
+
+Transforma um layout (dicionários de cobras e escadas, tamanho do tabuleiro,
+número de dados e variante de regras) em uma tabela plana de transições, indexada
+pela posição atual somada aos dados, com a casa final e o código do evento. Cada
+layout distinto é compilado uma única vez e compartilhado por todas as instâncias
+do jogo.
+
+As variantes de regras (`Rules`) entram na própria tabela: chegada exata (passar
+da casa final não move a peça, marcado com EVENT_STAY) e resolução encadeada de
+cobras e escadas (com detecção de ciclos ao compilar). A penalidade de dados
+iguais seguidos depende do turno, não da casa, e fica em `board.rules` para o
+jogo, a simulação, a análise e o solver.
+"""
+from array import array
+from itertools import product
+from types import MappingProxyType
+
+# Casa final do tabuleiro padrão
+LAST_SQUARE = 100
+# Número de dados padrão
+DICE_COUNT = 2
+# Maior soma possível de dois dados
+MAX_ROLL = 12
+
+# Códigos de evento (bits combináveis)
+EVENT_NONE = 0
+EVENT_BOUNCE = 1
+EVENT_SNAKE = 2
+EVENT_LADDER = 4
+EVENT_WIN = 8
+# A peça fica onde está (chegada exata: os dados passaram da casa final)
+EVENT_STAY = 16
+# Penalidade de dados iguais seguidos: a peça volta para a casa 0 e a vez passa
+EVENT_PENALTY = 32
+
+
+def square_typecode(size):
+    """Menor tipo de `array` sem sinal que representa as casas de 0 a `size`."""
+    return "H" if size <= 0xFFFF else "I"
+
+
+# Jogadas com até ROLL_TABLE_DICE dados têm soma e dupla tabeladas (6**4 = 1296 tuplas)
+ROLL_TABLE_DICE = 4
+_roll_tables = {}
+
+
+def roll_table(dice):
+    """
+    Soma e dados iguais de cada jogada válida com `dice` dados, indexados pela tupla dos dados.
+
+    Vazia acima de ROLL_TABLE_DICE dados (ver `CompiledBoard.check_roll`).
+    """
+    table = _roll_tables.get(dice)
+    if table is None:
+        table = _roll_tables[dice] = {} if dice > ROLL_TABLE_DICE else {
+            roll: (sum(roll), dice > 1 and min(roll) == max(roll)) for roll in product(range(1, 7), repeat=dice)
+        }
+    return table
+
+
+def dice_outcomes(dice):
+    """
+    Distribuição da soma dos dados.
+
+    Retorna uma lista de (soma, dados iguais, probabilidade); com um único dado
+    não existem dados iguais.
+    """
+    counts = {0: 1}
+    for _ in range(dice):
+        rolled = {}
+        for total, count in counts.items():
+            for face in range(1, 7):
+                rolled[total + face] = rolled.get(total + face, 0) + count
+        counts = rolled
+    combinations = 6 ** dice
+    outcomes = []
+    for total, count in sorted(counts.items()):
+        doubles = 1 if dice > 1 and total % dice == 0 and 1 <= total // dice <= 6 else 0
+        if count > doubles:
+            outcomes.append((total, False, (count - doubles) / combinations))
+        if doubles:
+            outcomes.append((total, True, doubles / combinations))
+    return outcomes
+
+
+class Rules:
+    """
+    Variante das regras do jogo (imutável).
+
+    `exact_landing`: é preciso chegar exatamente na casa final; passar dela não
+    move a peça (em vez do ricochete).
+    `chained`: cobras e escadas são resolvidas em cadeia até parar em uma casa
+    comum (o padrão resolve uma cobra e depois uma escada).
+    `max_doubles`: com N > 0, a N-ésima jogada seguida com dados iguais no mesmo
+    turno não anda; o jogador volta para a casa 0 e passa a vez.
+
+    Faz parte da chave do tabuleiro compilado, então não deve ser alterada.
+    """
+
+    __slots__ = ("exact_landing", "chained", "max_doubles")
+
+    def __init__(self, exact_landing=False, chained=False, max_doubles=0):
+        if max_doubles < 0:
+            raise ValueError("max_doubles não pode ser negativo")
+        self.exact_landing = bool(exact_landing)
+        self.chained = bool(chained)
+        self.max_doubles = int(max_doubles)
+
+    @property
+    def key(self):
+        """Tupla que identifica a variante."""
+        return (self.exact_landing, self.chained, self.max_doubles)
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return (f"Rules(exact_landing={self.exact_landing}, chained={self.chained}, "
+                f"max_doubles={self.max_doubles})")
+
+
+# Regras clássicas (ricochete, uma cobra e uma escada, sem penalidade)
+CLASSIC_RULES = Rules()
+
+# Variantes prontas: argumentos de `SnakesLadders`/`compile_board` de cada uma
+VARIANTS = {
+    "classica": {},
+    "chegada-exata": {"rules": Rules(exact_landing=True)},
+    "encadeada": {"rules": Rules(chained=True)},
+    "tres-duplas": {"rules": Rules(max_doubles=3)},
+    "um-dado": {"dice": 1},
+}
+
+
+class CompiledBoard:
+    """
+    Tabela de transições de um layout.
+
+    `destinations[posição + dados]` é a casa final do movimento e
+    `events[posição + dados]` os bits de evento (ricochete, cobra, escada, vitória).
+    Com EVENT_STAY a peça fica na casa de origem (e `destinations` não vale).
+    `snake_heads` e `ladder_bases` guardam a casa da cobra ou escada atingida
+    (0 quando não há; na resolução encadeada, a primeira de cada tipo).
+    `rolls` dá a soma e os dados iguais de cada jogada válida (ver `roll_table`).
+    """
+
+    __slots__ = ("key", "snakes", "ladders", "size", "dice", "rules", "max_roll", "rolls",
+                 "destinations", "events", "snake_heads", "ladder_bases")
+
+    def __init__(self, key, snakes, ladders, size=LAST_SQUARE, dice=DICE_COUNT, rules=CLASSIC_RULES):
+        self.key = key
+        # Somente leitura: o tabuleiro é compartilhado por todos os jogos com o mesmo layout
+        self.snakes = MappingProxyType(snakes)
+        self.ladders = MappingProxyType(ladders)
+        self.size = size
+        self.dice = dice
+        self.rules = rules
+        self.max_roll = 6 * dice
+        self.rolls = roll_table(dice)
+        if size <= self.max_roll:
+            raise ValueError(f"O tabuleiro precisa de mais de {self.max_roll} casas para {dice} dados")
+        for square in (*snakes, *snakes.values(), *ladders, *ladders.values()):
+            if not 0 < square < size:
+                raise ValueError(f"Casa {square} fora do tabuleiro de {size} casas")
+        typecode = square_typecode(size)
+        # Casas normais levam a elas mesmas; além do final, o ricochete volta
+        self.destinations = array(typecode, range(size + 1))
+        self.destinations.extend(range(size - 1, size - self.max_roll - 1, -1))
+        overshoot = EVENT_STAY if rules.exact_landing else EVENT_BOUNCE
+        self.events = array("B", bytes(size + 1)) + array("B", [overshoot] * self.max_roll)
+        self.events[size] = EVENT_WIN
+        empty = bytes(len(self.destinations) * self.destinations.itemsize)
+        self.snake_heads = array(typecode, empty)
+        self.ladder_bases = array(typecode, empty)
+        # Só as casas que levam a cobras ou escadas (direto ou no ricochete) são resolvidas
+        for square in set(snakes) | set(ladders):
+            self._resolve(square)
+            if 2 * size - square < len(self.destinations) and not rules.exact_landing:
+                self._resolve(2 * size - square)
+
+    def check_roll(self, dice):
+        """
+        Soma e dados iguais de uma jogada fora de `rolls`.
+
+        Levanta ValueError se o número de dados não é o do tabuleiro ou algum valor
+        está fora de 1 a 6.
+        """
+        if len(dice) != self.dice:
+            raise ValueError(f"Esperava {self.dice} dados, recebeu {len(dice)}")
+        lowest = min(dice)
+        highest = max(dice)
+        if lowest < 1 or highest > 6:
+            raise ValueError(f"Valor de dado fora de 1 a 6: {dice}")
+        return sum(dice), lowest == highest and self.dice > 1
+
+    def _resolve(self, target):
+        """
+        Aplica ricochete, cobra e escada (nessa ordem) a uma casa alvo.
+
+        Na resolução encadeada, segue cobras e escadas até uma casa comum e
+        levanta ValueError se a cadeia voltar a uma casa já visitada.
+        """
+        event = EVENT_NONE
+        snake_head = ladder_base = 0
+        position = target
+        if position > self.size:
+            position = 2 * self.size - position
+            event |= EVENT_BOUNCE
+        if self.rules.chained:
+            visited = set()
+            while position in self.snakes or position in self.ladders:
+                if position in visited:
+                    raise ValueError(f"Ciclo de cobras e escadas passando pela casa {position}")
+                visited.add(position)
+                if position in self.snakes:
+                    snake_head = snake_head or position
+                    position = self.snakes[position]
+                    event |= EVENT_SNAKE
+                else:
+                    ladder_base = ladder_base or position
+                    position = self.ladders[position]
+                    event |= EVENT_LADDER
+        else:
+            if position in self.snakes:
+                snake_head = position
+                position = self.snakes[position]
+                event |= EVENT_SNAKE
+            if position in self.ladders:
+                ladder_base = position
+                position = self.ladders[position]
+                event |= EVENT_LADDER
+        if position == self.size:
+            event |= EVENT_WIN
+        self.destinations[target] = position
+        self.events[target] = event
+        self.snake_heads[target] = snake_head
+        self.ladder_bases[target] = ladder_base
+
+    def outcomes(self):
+        """Distribuição da soma dos dados deste tabuleiro (ver `dice_outcomes`)."""
+        return dice_outcomes(self.dice)
+
+
+def layout_key(snakes, ladders, size=LAST_SQUARE, dice=DICE_COUNT, rules=CLASSIC_RULES):
+    """Chave imutável que identifica um layout de cobras e escadas (e a variante de regras)."""
+    key = (tuple(sorted(snakes.items())), tuple(sorted(ladders.items())))
+    if size != LAST_SQUARE or dice != DICE_COUNT or rules != CLASSIC_RULES:
+        key += (size, dice)
+    if rules != CLASSIC_RULES:
+        key += (rules.key,)
+    return key
+
+
+# Cache de tabuleiros já compilados (chave: layout_key)
+_compiled_boards = {}
+
+
+def compile_board(snakes, ladders, size=LAST_SQUARE, dice=DICE_COUNT, rules=None):
+    """Retorna a tabela compilada do layout, compilando apenas na primeira vez."""
+    rules = CLASSIC_RULES if rules is None else rules
+    key = layout_key(snakes, ladders, size, dice, rules)
+    board = _compiled_boards.get(key)
+    if board is None:
+        board = CompiledBoard(key, dict(snakes), dict(ladders), size, dice, rules)
+        _compiled_boards[key] = board
+    return board
@@ -0,0 +1,207 @@
+"""
+Arquivo binário, só de acréscimo, de todas as jogadas feitas no servidor.
+
+Cada jogada vira um registro de largura fixa (RECORD_SIZE bytes, little-endian):
+
+    game_id  u64  semente da partida (identifica a partida mesmo no modo sem estado)
+    turn     u32  índice da jogada na partida (0 é a primeira)
+    from     u16  casa de origem
+    to       u16  casa de destino
+    player   u8   jogador (índice)
+    roll     u8   soma dos dados
+    event    u8   bits de evento do tabuleiro (ver board.py)
+    flags    u8   FLAG_DOUBLE (dados iguais) e FLAG_REPLACED (jogada feita depois de
+                  desfazer: substitui as jogadas de índice >= turn da mesma partida)
+
+`ArchiveWriter.record` só empacota o registro em um buffer na memória; uma thread
+grava os buffers em lotes no segmento aberto do processo (`*.part`), que é
+renomeado para `*.seg` ao atingir `segment_records` registros. Segmentos
+fechados nunca mais mudam. Os leitores abrem os segmentos com `np.memmap`
+(`open_segment`) ou `mmap` (`iter_records`), sem copiar os dados.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+
+# Formato de um registro (ver docstring do módulo)
+RECORD = struct.Struct("<QIHHBBBB")
+RECORD_SIZE = RECORD.size
+# Bits do campo flags
+FLAG_DOUBLE = 1
+FLAG_REPLACED = 2
+# Maior casa e maior número de jogadores representáveis no registro
+MAX_SQUARE = 0xFFFF
+MAX_PLAYERS = 0x100
+# Extensões dos segmentos fechados e do segmento em escrita
+SEGMENT_SUFFIX = ".seg"
+OPEN_SUFFIX = ".part"
+# Registros por segmento (4 Mi registros = 80 MiB)
+SEGMENT_RECORDS = 1 << 22
+# Registros acumulados antes de acordar a thread de gravação
+FLUSH_RECORDS = 4096
+# Intervalo máximo (segundos) entre gravações
+FLUSH_INTERVAL = 1.0
+
+
+def record_dtype():
+    """Tipo estruturado do NumPy equivalente a RECORD."""
+    import numpy as np
+    return np.dtype([
+        ("game_id", "<u8"), ("turn", "<u4"), ("from_position", "<u2"), ("to_position", "<u2"),
+        ("player", "u1"), ("roll", "u1"), ("event", "u1"), ("flags", "u1"),
+    ])
+
+
+class ArchiveWriter:
+    """
+    Grava as jogadas em segmentos de `directory`, em lotes, por uma thread própria.
+
+    Cada processo escreve nos próprios segmentos (o nome leva o pid), então vários
+    workers podem compartilhar o diretório. Depois de um fork, o processo filho
+    começa um segmento novo na primeira jogada.
+    """
+
+    def __init__(self, directory, segment_records=SEGMENT_RECORDS, flush_records=FLUSH_RECORDS,
+                 flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._buffer = bytearray()
+        self._pid = None
+        self._thread = None
+        self._closed = False
+        self._segment = None
+        self._segment_path = None
+        self._segment_count = 0
+        self._sequence = 0
+
+    def record(self, game, replaced=False):
+        """
+        Acrescenta a última jogada de `game` (uma partida `SnakesLadders`).
+
+        `replaced` indica que a jogada foi feita depois de desfazer jogadas.
+        """
+        history = game.move_history
+        index = len(history) - 1
+        board = game.board
+        if board.size > MAX_SQUARE or game.players > MAX_PLAYERS or board.max_roll > 0xFF:
+            raise ValueError("Partida grande demais para o formato do arquivo")
+        dice = history.rolled(index)
+        flags = FLAG_REPLACED if replaced else 0
+        if len(dice) > 1 and min(dice) == max(dice):
+            flags |= FLAG_DOUBLE
+        data = RECORD.pack(game.seed, index, history.from_positions[index], history.to_positions[index],
+                           history.players[index], sum(dice), history.events[index], flags)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            self._buffer += data
+            full = len(self._buffer) >= self.flush_records * RECORD_SIZE
+        if full:
+            self._wake.set()
+
+    def _start(self):
+        """Prepara o buffer e a thread de gravação deste processo (chamado com o lock)."""
+        self._pid = os.getpid()
+        self._buffer = bytearray()
+        self._segment = None
+        self._segment_count = 0
+        self._closed = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Grava no segmento aberto as jogadas acumuladas até agora."""
+        with self._lock:
+            data, self._buffer = self._buffer, bytearray()
+        if not data:
+            return
+        with self._io_lock:
+            if self._segment is None:
+                self._open_segment()
+            self._segment.write(data)
+            self._segment.flush()
+            self._segment_count += len(data) // RECORD_SIZE
+            if self._segment_count >= self.segment_records:
+                self._seal()
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._sequence += 1
+        name = f"moves-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{self._sequence:04d}"
+        self._segment_path = os.path.join(self.directory, name)
+        self._segment = open(self._segment_path + OPEN_SUFFIX, "ab")
+        self._segment_count = 0
+
+    def _seal(self):
+        """Fecha o segmento aberto e o renomeia para `*.seg` (imutável a partir daqui)."""
+        self._segment.close()
+        os.replace(self._segment_path + OPEN_SUFFIX, self._segment_path + SEGMENT_SUFFIX)
+        self._segment = None
+
+    def close(self):
+        """Grava o que falta, fecha o segmento aberto e para a thread."""
+        if self._pid != os.getpid():
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._io_lock:
+            if self._segment is not None:
+                self._seal()
+
+
+def list_segments(directory, include_open=True):
+    """Caminhos dos segmentos do diretório em ordem (fechados e, opcionalmente, os abertos)."""
+    suffixes = (SEGMENT_SUFFIX, OPEN_SUFFIX) if include_open else (SEGMENT_SUFFIX,)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names) if name.endswith(suffixes)]
+
+
+def open_segment(path):
+    """
+    Registros do segmento como um array estruturado do NumPy mapeado do arquivo.
+
+    Em segmentos abertos, um registro ainda incompleto no fim é ignorado.
+    """
+    import numpy as np
+    dtype = record_dtype()
+    count = os.path.getsize(path) // RECORD_SIZE
+    if count == 0:
+        return np.empty(0, dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+def iter_records(path):
+    """Percorre os registros do segmento como tuplas, via `mmap` (sem NumPy)."""
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size // RECORD_SIZE * RECORD_SIZE
+        if size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, size, RECORD_SIZE):
+                yield RECORD.unpack_from(mapped, offset)
+
+
+def load_archive(directory, include_open=True):
+    """Lista de (caminho, registros) de todos os segmentos do diretório, mapeados sem cópia."""
+    return [(path, open_segment(path)) for path in list_segments(directory, include_open)]
+
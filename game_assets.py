@@ -0,0 +1,327 @@
+"""
+Imagens dos dados, dos tokens dos jogadores e do tabuleiro.
+
+As imagens são desenhadas com PIL uma única vez: `build_assets` grava os PNGs
+em `assets/generated/` para serem servidos como arquivos estáticos (com cache no
+navegador). Um manifesto ao lado dos PNGs permite reaproveitá-los na
+inicialização seguinte sem importar o PIL; ele vale enquanto este arquivo não
+mudar. Se a pasta de assets não puder ser gravada, as imagens ficam em memória
+como data URIs.
+
+`build_board_variants` lê `board.jpg` uma vez e grava cópias em WebP em várias
+larguras; `board_geometry` dá, para cada variante, a posição em pixels do token
+em cada casa, de modo que posicionar um token é uma consulta à tabela.
+
+Para gerar tudo antes do deploy:
+
+    python game_assets.py
+"""
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from base64 import b64encode
+from functools import lru_cache
+from io import BytesIO
+
+from metrics import PIL_SECONDS
+
+# Subpasta de assets com as imagens geradas
+GENERATED_DIR = "generated"
+# Manifesto das imagens geradas (caminhos versionados e a versão do código que as gerou)
+MANIFEST_NAME = "manifest.json"
+# Manifesto das variantes do tabuleiro
+BOARD_MANIFEST_NAME = "board.json"
+# Imagem original do tabuleiro (na pasta de assets)
+BOARD_SOURCE = "board.jpg"
+# Larguras (px) das variantes do tabuleiro, além da largura original
+BOARD_WIDTHS = (240, 360, 480)
+# Qualidade do WebP das variantes
+BOARD_QUALITY = 80
+# Fração da célula ocupada pelo token (40 px nas células de 56,4 px do tabuleiro de 564 px)
+TOKEN_FRACTION = 40 / 56.4
+# Número de jogadores com token
+PLAYER_COUNT = 2
+
+
+@lru_cache(maxsize=None)
+def _token_font():
+    """Fonte dos números dos tokens (carregada uma única vez)."""
+    from PIL import ImageFont
+    try:
+        return ImageFont.truetype("arial.ttf", 25)
+    except IOError:
+        return ImageFont.load_default()
+
+
+def render_dice_image(value):
+    """Desenha a imagem de um dado com o valor fornecido."""
+    from PIL import Image, ImageDraw
+    img = Image.new('RGBA', (100, 100), (255, 255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    
+    # Desenha o contorno do dado
+    draw.rectangle([(5, 5), (95, 95)], outline=(0, 0, 0), width=2)
+    
+    # Desenha os pontos baseados no valor
+    if value in [1, 3, 5]:
+        # Ponto central
+        draw.ellipse([(45, 45), (55, 55)], fill=(0, 0, 0))
+    
+    if value in [2, 3, 4, 5, 6]:
+        # Ponto superior-esquerdo
+        draw.ellipse([(20, 20), (30, 30)], fill=(0, 0, 0))
+        # Ponto inferior-direito
+        draw.ellipse([(70, 70), (80, 80)], fill=(0, 0, 0))
+    
+    if value in [4, 5, 6]:
+        # Ponto superior-direito
+        draw.ellipse([(70, 20), (80, 30)], fill=(0, 0, 0))
+        # Ponto inferior-esquerdo
+        draw.ellipse([(20, 70), (30, 80)], fill=(0, 0, 0))
+    
+    if value == 6:
+        # Ponto meio-esquerdo
+        draw.ellipse([(20, 45), (30, 55)], fill=(0, 0, 0))
+        # Ponto meio-direito
+        draw.ellipse([(70, 45), (80, 55)], fill=(0, 0, 0))
+    
+    return img
+
+
+def render_player_token(player_num):
+    """Desenha a imagem do token do jogador."""
+    from PIL import Image, ImageDraw
+    size = 50  # Tamanho aumentado para melhor visibilidade
+    colors = [(255, 0, 0, 230), (0, 0, 255, 230)]  # Vermelho e Azul com alta opacidade
+    
+    img = Image.new('RGBA', (size, size), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    
+    # Desenha círculo com borda branca
+    draw.ellipse([(0, 0), (size, size)], fill=colors[player_num], 
+                outline=(255, 255, 255), width=2)
+    
+    # Adiciona número do jogador
+    font = _token_font()
+    
+    # Centraliza o texto
+    text = str(player_num + 1)
+    text_bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = text_bbox[2] - text_bbox[0]
+    text_height = text_bbox[3] - text_bbox[1]
+    
+    x = (size - text_width) // 2
+    y = (size - text_height) // 2
+    
+    # Adiciona sombra para melhor legibilidade
+    draw.text((x+1, y+1), text, fill=(0, 0, 0, 128), font=font)
+    draw.text((x, y), text, fill=(255, 255, 255), font=font)
+    
+    return img
+
+
+def _png_bytes(img):
+    """Codifica a imagem em PNG."""
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def dice_png(value):
+    """PNG do dado com o valor fornecido (memorizado)."""
+    start = time.perf_counter()
+    data = _png_bytes(render_dice_image(value))
+    PIL_SECONDS.observe(time.perf_counter() - start, f"dice-{value}")
+    return data
+
+
+@lru_cache(maxsize=None)
+def token_png(player_num):
+    """PNG do token do jogador (memorizado)."""
+    start = time.perf_counter()
+    data = _png_bytes(render_player_token(player_num))
+    PIL_SECONDS.observe(time.perf_counter() - start, f"token-{player_num}")
+    return data
+
+
+def _data_uri(mime, data):
+    """Data URI com o conteúdo em base64 (usado quando não dá para gravar os arquivos)."""
+    return f"data:{mime};base64,{b64encode(data).decode()}"
+
+
+def _write_if_changed(path, data):
+    """Grava o arquivo apenas se o conteúdo mudou, preservando o cache do navegador."""
+    try:
+        with open(path, "rb") as handle:
+            if handle.read() == data:
+                return
+    except OSError:
+        pass
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def _code_version():
+    """Resumo deste arquivo: muda sempre que o desenho das imagens pode ter mudado."""
+    with open(os.path.abspath(__file__), "rb") as handle:
+        return hashlib.sha1(handle.read()).hexdigest()[:16]
+
+
+def _load_manifest(directory, manifest_name, version):
+    """Conteúdo do manifesto, se ele for desta versão e todos os arquivos listados existirem."""
+    try:
+        with open(os.path.join(directory, manifest_name), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != version:
+        return None
+    for path in manifest.get("files", []):
+        if not os.path.exists(os.path.join(directory, path)):
+            return None
+    return manifest
+
+
+def _save_manifest(directory, manifest_name, version, files, **content):
+    """Grava o manifesto com a versão, os arquivos gerados e o conteúdo informado."""
+    manifest = dict(content, version=version, files=files)
+    _write_if_changed(os.path.join(directory, manifest_name), json.dumps(manifest, indent=2).encode())
+
+
+def build_assets(assets_dir, force=False):
+    """
+    Gera os PNGs de dados e tokens em `assets_dir/generated/`.
+
+    Retorna um dicionário com o caminho relativo de cada imagem (com a versão do
+    conteúdo na query string) para uso com `app.get_asset_url`. Se o manifesto
+    estiver atualizado (e `force` for falso), nada é desenhado. Se a pasta não
+    puder ser gravada, devolve data URIs no lugar dos caminhos.
+    """
+    directory = os.path.join(assets_dir, GENERATED_DIR)
+    version = _code_version()
+    manifest = None if force else _load_manifest(directory, MANIFEST_NAME, version)
+    if manifest is not None:
+        return manifest["paths"]
+    images = {f"dice-{value}": dice_png(value) for value in range(1, 7)}
+    images.update({f"token-{player}": token_png(player) for player in range(PLAYER_COUNT)})
+    paths = {}
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for name, data in images.items():
+            _write_if_changed(os.path.join(directory, f"{name}.png"), data)
+            version_hash = hashlib.sha1(data).hexdigest()[:10]
+            paths[name] = f"{GENERATED_DIR}/{name}.png?v={version_hash}"
+        _save_manifest(directory, MANIFEST_NAME, version, [f"{name}.png" for name in images], paths=paths)
+    except OSError:
+        # Pasta somente leitura: as imagens vão embutidas nas páginas
+        return {name: _data_uri("image/png", data) for name, data in images.items()}
+    return paths
+
+
+def build_board_variants(assets_dir, force=False):
+    """
+    Gera as variantes em WebP de `assets_dir/board.jpg` em `assets_dir/generated/`.
+
+    Retorna a lista de variantes em ordem crescente de largura, cada uma com
+    "width", "height" e "path" (relativo, com a versão na query string, ou um data
+    URI se a pasta não puder ser gravada). A imagem original só é aberta quando ela
+    ou este arquivo mudaram desde a última geração.
+    """
+    directory = os.path.join(assets_dir, GENERATED_DIR)
+    source = os.path.join(assets_dir, BOARD_SOURCE)
+    stat = os.stat(source)
+    version = f"{_code_version()}-{stat.st_size}-{stat.st_mtime_ns}"
+    manifest = None if force else _load_manifest(directory, BOARD_MANIFEST_NAME, version)
+    if manifest is not None:
+        return manifest["variants"]
+
+    from PIL import Image
+    variants, images = [], {}
+    with Image.open(source) as image:
+        image.load()
+        source_width, source_height = image.size
+        for width in sorted({width for width in BOARD_WIDTHS if width < source_width} | {source_width}):
+            start = time.perf_counter()
+            height = round(source_height * width / source_width)
+            resized = image if width == source_width else image.resize((width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, format="WEBP", quality=BOARD_QUALITY, method=6)
+            data = buffer.getvalue()
+            PIL_SECONDS.observe(time.perf_counter() - start, f"board-{width}")
+            name = f"board-{width}.webp"
+            images[name] = data
+            version_hash = hashlib.sha1(data).hexdigest()[:10]
+            variants.append({"width": width, "height": height,
+                             "path": f"{GENERATED_DIR}/{name}?v={version_hash}"})
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for name, data in images.items():
+            _write_if_changed(os.path.join(directory, name), data)
+        _save_manifest(directory, BOARD_MANIFEST_NAME, version, list(images), variants=variants)
+    except OSError:
+        # Pasta somente leitura: as variantes vão embutidas nas páginas
+        for variant, data in zip(variants, images.values()):
+            variant["path"] = _data_uri("image/webp", data)
+    return variants
+
+
+def pick_board_variant(variants, available_width):
+    """
+    Maior variante que cabe em `available_width` pixels (a menor, se nenhuma couber).
+
+    Sem largura informada (ou com um valor que não é número), usa a variante original (a maior).
+    """
+    if not isinstance(available_width, (int, float)) or not available_width:
+        return variants[-1]
+    fitting = [variant for variant in variants if variant["width"] <= available_width]
+    return fitting[-1] if fitting else variants[0]
+
+
+def board_grid(size):
+    """
+    Colunas e linhas do tabuleiro em zigue-zague com `size` casas.
+
+    Tabuleiros quadrados (100, 144, ...) usam a raiz; os demais, linhas de 10 casas.
+    """
+    columns = math.isqrt(size)
+    if columns * columns != size:
+        columns = 10
+    return columns, -(-size // columns)
+
+
+# Limitado: as chaves vêm das variantes do servidor, mas um valor inesperado não deve acumular tabelas
+@lru_cache(maxsize=32)
+def board_geometry(width, height, size):
+    """
+    Tabela de posições dos tokens em um tabuleiro de `width` x `height` pixels.
+
+    Retorna (tamanho do token, cells), em que `cells[casa]` é o (left, top) do
+    token centralizado na casa; `cells[0]` é None (jogador fora do tabuleiro).
+    """
+    columns, rows = board_grid(size)
+    cell_width = width / columns
+    cell_height = height / rows
+    token = round(min(cell_width, cell_height) * TOKEN_FRACTION)
+    cells = [None]
+    for pos in range(size):
+        line = pos // columns
+        # Linhas ímpares (de baixo para cima) vão da direita para a esquerda
+        col = columns - 1 - pos % columns if line % 2 else pos % columns
+        # Inverte as linhas, pois a casa final está no topo
+        row = rows - 1 - line
+        cells.append((col * cell_width + (cell_width - token) / 2,
+                      row * cell_height + (cell_height - token) / 2))
+    return token, tuple(cells)
+
+
+if __name__ == "__main__":
+    assets = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "assets")
+    for name, path in build_assets(assets, force=True).items():
+        print(f"{name}: {path}")
+    for variant in build_board_variants(assets, force=True):
+        print(f"board-{variant['width']}: {variant['path']} ({variant['width']}x{variant['height']})")
@@ -0,0 +1,258 @@
+"""
+Teste de carga local da interface: K jogadores simultâneos clicando nos botões.
+
+Sobe o app em um processo separado (só em 127.0.0.1, sem rede externa) e, para
+cada K da lista, simula K sessões por `--duration` segundos. Cada sessão começa
+um jogo, rola os dados com um tempo de reflexão log-normal entre os cliques e
+recomeça quando a partida termina, enviando ao endpoint `_dash-update-component`
+as mesmas requisições do navegador (no modo de renderização no servidor, também
+a dos tokens após cada jogada). Relata vazão, percentis de latência e bytes por
+callback em cada etapa e o maior K em que o p99 da rolagem ficou dentro do limite.
+
+Uso:
+    python loadtest.py --sessions 1,4,16,64 --duration 20 --think 0.5 --output carga.json
+    SNAKES_STATELESS=1 python loadtest.py --server "gunicorn -w 4 -b 127.0.0.1:{port} SnakesLadders_dash:server"
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from benchmark import callback_payload
+
+# Limite padrão (ms) para o p99 da rolagem
+DEFAULT_SLO = 250.0
+# Desvio do logaritmo do tempo de reflexão
+THINK_SIGMA = 0.6
+# Tempo máximo (segundos) para o servidor subir
+STARTUP_TIMEOUT = 60
+# Comando padrão do servidor (porta em {port})
+DEFAULT_SERVER = [sys.executable, "-c",
+                  "import SnakesLadders_dash as app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"]
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(command=None):
+    """Sobe o app e espera ele responder; retorna (processo, porta)."""
+    port = _free_port()
+    args = shlex.split(command.format(port=port)) if command else [arg.format(port=port) for arg in DEFAULT_SERVER]
+    process = subprocess.Popen(args, cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"O servidor terminou ao subir (código {process.returncode})")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/_dash-dependencies")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("O servidor não respondeu a tempo")
+
+
+def _get_json(port, path):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request("GET", path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def layout_value(layout, component_id, prop):
+    """Valor inicial de `component_id.prop` no layout JSON do Dash (None se não existir)."""
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            props = node.get("props", {})
+            if props.get("id") == component_id:
+                return props.get(prop)
+            stack.extend(value for value in props.values() if isinstance(value, (list, dict)))
+    return None
+
+
+def percentile(values, fraction):
+    """Percentil `fraction` (0 a 1) pelo método do posto mais próximo."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Session:
+    """Um jogador simulado, com a própria conexão HTTP (keep-alive) e sessão do Dash."""
+
+    def __init__(self, port, callbacks, think, rng, initial=None):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.callbacks = callbacks
+        self.think = think
+        self.rng = rng
+        self.clicks = {"roll-button": 0, "reset-button": 0}
+        self.values = dict(initial or {}, **{"session-id.data": f"carga-{rng.getrandbits(64):016x}"})
+        # Por callback: lista de (latência em segundos, bytes da resposta, status)
+        self.samples = {}
+
+    def _post(self, name, dependency, triggered):
+        body = json.dumps(callback_payload(dependency, self.values, triggered))
+        start = time.perf_counter()
+        self.connection.request("POST", "/_dash-update-component", body, {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        data = response.read()
+        self.samples.setdefault(name, []).append((time.perf_counter() - start, len(data), response.status))
+        if response.status != 200:
+            return None
+        return json.loads(data)["response"]
+
+    def click(self, button):
+        """Clica no botão e aplica as respostas ao estado da sessão (como o navegador)."""
+        self.clicks[button] += 1
+        self.values[f"{button}.n_clicks"] = self.clicks[button]
+        name = "update_game.roll" if button == "roll-button" else "update_game.reset"
+        response = self._post(name, self.callbacks["update_game"], f"{button}.n_clicks")
+        self.values.pop(f"{button}.n_clicks")
+        if response is None:
+            return None
+        delta = response["game-delta"]["data"]
+        self.values["game-delta.data"] = delta
+        self.values["dice-values.data"] = response["dice-values"]["data"]
+        if "game-store" in response:
+            self.values["game-store.data"] = response["game-store"]["data"]
+        self.values["game-state.children"] = "over" if delta["over"] else "active"
+        if "update_player_tokens" in self.callbacks:
+            self._post("update_player_tokens", self.callbacks["update_player_tokens"], "game-state.children")
+        return delta
+
+    def run(self, stop):
+        """Joga até `stop` ser sinalizado."""
+        delta = self.click("reset-button")
+        while not stop.is_set():
+            if stop.wait(self.rng.lognormvariate(math.log(self.think), THINK_SIGMA)):
+                break
+            delta = self.click("reset-button" if delta is None or delta["over"] else "roll-button")
+        self.connection.close()
+
+
+def run_step(port, callbacks, sessions, duration, think, seed, initial=None):
+    """
+    Simula `sessions` jogadores por `duration` segundos e resume a etapa.
+
+    `initial` traz os valores iniciais (`id.propriedade`) dos componentes da página.
+    """
+    stop = threading.Event()
+    players = [Session(port, callbacks, think, random.Random(seed * 1000003 + index), initial)
+               for index in range(sessions)]
+    threads = [threading.Thread(target=player.run, args=(stop,), daemon=True) for player in players]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    step = {"sessoes": sessions, "duracao": elapsed, "requisicoes": 0, "callbacks": {}}
+    merged = {}
+    for player in players:
+        for name, samples in player.samples.items():
+            merged.setdefault(name, []).extend(samples)
+    for name, samples in sorted(merged.items()):
+        latencies = [sample[0] * 1000 for sample in samples]
+        step["requisicoes"] += len(samples)
+        step["callbacks"][name] = {
+            "requisicoes": len(samples),
+            "por_segundo": len(samples) / elapsed,
+            "erros": sum(sample[2] != 200 for sample in samples),
+            "p50_ms": percentile(latencies, 0.50),
+            "p90_ms": percentile(latencies, 0.90),
+            "p99_ms": percentile(latencies, 0.99),
+            "bytes_medio": sum(sample[1] for sample in samples) / len(samples),
+        }
+    step["por_segundo"] = step["requisicoes"] / elapsed
+    return step
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga local com jogadores simultâneos.")
+    parser.add_argument("--sessions", default="1,2,4,8,16,32,64",
+                        help="jogadores simultâneos em cada etapa, separados por vírgula")
+    parser.add_argument("--duration", type=float, default=15.0, help="segundos por etapa")
+    parser.add_argument("--think", type=float, default=1.0, help="tempo de reflexão mediano (s) entre cliques")
+    parser.add_argument("--slo", type=float, default=DEFAULT_SLO, help="limite (ms) para o p99 da rolagem")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos tempos de reflexão")
+    parser.add_argument("--server", help="comando do servidor, com {port} (padrão: servidor do Flask com threads)")
+    parser.add_argument("--output", help="grava o relatório em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    process, port = start_server(args.server)
+    try:
+        dependencies = _get_json(port, "/_dash-dependencies")
+        # Valores que o navegador envia desde o carregamento da página
+        layout = _get_json(port, "/_dash-layout")
+        initial = {f"{component}.data": layout_value(layout, component, "data")
+                   for component in ("dice-values", "board-dimensions")}
+        server_side = [item for item in dependencies if not item.get("clientside_function")]
+        callbacks = {"update_game": next(item for item in server_side if "game-delta.data" in item["output"])}
+        tokens = [item for item in server_side if "player-tokens.children" in item["output"]]
+        if tokens:
+            callbacks["update_player_tokens"] = tokens[0]
+
+        steps = []
+        sustained = None
+        degraded = False
+        print(f"{'sessões':>8} {'req/s':>8} {'rolar p50':>10} {'p90':>8} {'p99':>8} {'bytes':>7} {'erros':>6}")
+        for sessions in (int(value) for value in args.sessions.split(",")):
+            step = run_step(port, callbacks, sessions, args.duration, args.think, args.seed, initial)
+            steps.append(step)
+            roll = step["callbacks"].get("update_game.roll")
+            if roll is None:
+                continue
+            print(f"{sessions:>8} {step['por_segundo']:>8.1f} {roll['p50_ms']:>9.1f}ms {roll['p90_ms']:>6.1f}ms "
+                  f"{roll['p99_ms']:>6.1f}ms {roll['bytes_medio']:>7.0f} {roll['erros']:>6}")
+            # O primeiro K que estoura o limite encerra a faixa sustentada
+            if roll["p99_ms"] <= args.slo and not roll["erros"] and not degraded:
+                sustained = sessions
+            else:
+                degraded = True
+    finally:
+        process.terminate()
+        process.wait()
+
+    report = {
+        "ambiente": {
+            "render": os.environ.get("SNAKES_RENDER", "server"),
+            "sem_estado": os.environ.get("SNAKES_STATELESS", "0") == "1",
+            "servidor": args.server or "flask",
+            "reflexao_s": args.think,
+            "slo_ms": args.slo,
+        },
+        "etapas": steps,
+        "sessoes_sustentadas": sustained,
+    }
+    print(f"Maior número de sessões com p99 da rolagem <= {args.slo:.0f} ms: {sustained}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Métricas no formato de texto do Prometheus, sem dependências externas.
+
+Contadores, histogramas de buckets fixos e medidores calculados na hora da
+coleta. `install` liga ganchos no servidor Flask do Dash que medem cada chamada
+de callback (contagem, erros, latência e bytes da resposta) e expõe tudo em
+`/metrics`. O custo por requisição é uma busca em dicionário, uma leitura do
+relógio e um incremento sob lock, pequeno o bastante para ficar sempre ligado.
+
+Com vários workers (gunicorn), cada processo expõe apenas as próprias métricas.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Buckets de latência (segundos) e de tamanho de resposta (bytes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 65536, 262144)
+# Rota de callbacks do Dash
+CALLBACK_PATH = "/_dash-update-component"
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador crescente, opcionalmente separado por rótulos."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens acumuladas só na exposição)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        # Por rótulos: [contagem por bucket (+Inf no fim), soma]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for label_values, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bound = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.labels, label_values, f'le="{bound}"'), cumulative)
+            yield f"{self.name}_sum", _format_labels(self.labels, label_values), total
+            yield f"{self.name}_count", _format_labels(self.labels, label_values), cumulative
+
+
+class Gauge:
+    """Medidor cujo valor é calculado por `function` no momento da coleta."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def samples(self):
+        yield self.name, "", self.function()
+
+
+class Registry:
+    """Conjunto de métricas expostas juntas."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        """Registra a métrica (uma vez por nome) e a retorna."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def exposition(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro padrão do processo
+REGISTRY = Registry()
+
+CALLBACK_CALLS = REGISTRY.register(Counter(
+    "snakes_callback_calls_total", "Chamadas de callbacks do Dash.", ("callback",)))
+CALLBACK_ERRORS = REGISTRY.register(Counter(
+    "snakes_callback_errors_total", "Chamadas de callbacks com resposta de erro (4xx/5xx).", ("callback",)))
+CALLBACK_LATENCY = REGISTRY.register(Histogram(
+    "snakes_callback_latency_seconds", "Tempo de resposta dos callbacks do Dash.",
+    LATENCY_BUCKETS, ("callback",)))
+CALLBACK_BYTES = REGISTRY.register(Histogram(
+    "snakes_callback_response_bytes", "Tamanho das respostas dos callbacks do Dash.",
+    BYTES_BUCKETS, ("callback",)))
+PIL_SECONDS = REGISTRY.register(Histogram(
+    "snakes_pil_render_seconds", "Tempo de desenho e codificação das imagens com PIL.",
+    LATENCY_BUCKETS, ("asset",)))
+
+
+def install(app, registry=REGISTRY, path="/metrics"):
+    """
+    Instrumenta os callbacks de `app` (Dash) e expõe as métricas em `path`.
+
+    O callback de cada requisição é identificado pela saída declarada no corpo
+    e nomeado pela função registrada em `app.callback_map`.
+    """
+    from flask import Response, g, request
+
+    server = app.server
+    names = {}
+
+    def callback_name(output):
+        name = names.get(output)
+        if name is None:
+            entry = app.callback_map.get(output)
+            if entry is None:
+                # Saídas desconhecidas não entram no cache (o corpo vem do cliente)
+                return "desconhecido"
+            name = names[output] = getattr(entry.get("callback"), "__name__", "desconhecido")
+        return name
+
+    @server.before_request
+    def _start_timer():
+        if request.path.endswith(CALLBACK_PATH):
+            g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def _record_callback(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            body = request.get_json(silent=True) or {}
+            name = callback_name(body.get("output", ""))
+            CALLBACK_CALLS.inc(name)
+            if response.status_code >= 400:
+                CALLBACK_ERRORS.inc(name)
+            CALLBACK_LATENCY.observe(time.perf_counter() - start, name)
+            size = response.calculate_content_length()
+            if size is not None:
+                CALLBACK_BYTES.observe(size, name)
+        return response
+
+    @server.route(path)
+    def _metrics():
+        return Response(registry.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return registry
@@ -0,0 +1,212 @@
+"""
+Histórico compacto de jogadas.
+
+Guarda cada jogada em colunas paralelas de `array` (jogador, dados, casa de
+origem, casa de destino, código do evento e dados iguais), alguns bytes por
+jogada (o tipo das colunas de casas acompanha o tamanho do tabuleiro), e mantém
+contadores por jogador para que as estatísticas da partida sejam O(1).
+
+O log tem um cursor: jogadas desfeitas continuam gravadas depois do cursor
+(para refazer) até que uma nova jogada as substitua.
+"""
+from array import array
+
+from board import DICE_COUNT, EVENT_LADDER, EVENT_SNAKE, LAST_SQUARE, square_typecode
+
+_SNAKE_OR_LADDER = EVENT_SNAKE | EVENT_LADDER
+
+
+class Move:
+    """Uma jogada do histórico (criada sob demanda ao acessar o log)."""
+
+    __slots__ = ("player", "dice", "from_position", "to_position", "event")
+
+    def __init__(self, player, dice, from_position, to_position, event):
+        self.player = player
+        self.dice = dice
+        self.from_position = from_position
+        self.to_position = to_position
+        self.event = event
+
+    @property
+    def die1(self):
+        """Primeiro dado da jogada."""
+        return self.dice[0]
+
+    @property
+    def die2(self):
+        """Segundo dado da jogada (o primeiro, se a partida usa um único dado)."""
+        return self.dice[-1]
+
+    def __repr__(self):
+        return (
+            f"Move(player={self.player}, dice={self.dice}, "
+            f"from_position={self.from_position}, to_position={self.to_position}, event={self.event})"
+        )
+
+
+class MoveLog:
+    """Colunas paralelas com as jogadas da partida e contadores acumulados."""
+
+    __slots__ = ("players", "dice", "dice_count", "from_positions", "to_positions", "events", "doubles",
+                 "_length", "_counters")
+
+    def __init__(self, player_count=2, dice_count=DICE_COUNT, size=LAST_SQUARE):
+        self.players = array("B" if player_count <= 0x100 else "H")
+        # Dados de todas as jogadas em sequência, `dice_count` por jogada
+        self.dice = array("B")
+        self.dice_count = dice_count
+        self.from_positions = array(square_typecode(size))
+        self.to_positions = array(square_typecode(size))
+        self.events = array("B")
+        # 1 se todos os dados da jogada foram iguais (gravado na jogada, sem recalcular)
+        self.doubles = array("B")
+        # Cursor: jogadas ativas (as seguintes podem ser refeitas)
+        self._length = 0
+        # Contadores por jogador em uma única lista de ints: movimentos, cobras, escadas e
+        # duplas (um bloco de `player_count` posições para cada); somar em uma lista é mais
+        # barato que em um `array`, que converte o valor a cada acesso
+        self._counters = [0] * (4 * player_count)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def recorded(self):
+        """Número de jogadas gravadas, incluindo as desfeitas que podem ser refeitas."""
+        return len(self.events)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("jogada fora do histórico")
+        return Move(
+            self.players[index], self.rolled(index),
+            self.from_positions[index], self.to_positions[index], self.events[index],
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def rolled(self, index):
+        """Dados da jogada `index` (gravada), como tupla."""
+        start = index * self.dice_count
+        return tuple(self.dice[start:start + self.dice_count])
+
+    def is_double(self, index):
+        """Se todos os dados da jogada `index` foram iguais (nunca com um único dado)."""
+        return self.doubles[index] == 1
+
+    def append(self, player, dice, from_position, to_position, event, double):
+        """
+        Registra uma jogada no cursor (descartando as desfeitas) e atualiza os contadores.
+
+        `double` indica se todos os dados foram iguais. Retorna o novo número de jogadas.
+        """
+        length = self._length
+        if length < len(self.events):
+            self._discard_redo()
+        self.players.append(player)
+        self.dice.extend(dice)
+        self.from_positions.append(from_position)
+        self.to_positions.append(to_position)
+        self.events.append(event)
+        self.doubles.append(double)
+        # Contadores somados aqui mesmo (é o caminho de toda jogada; ver `_count`)
+        counters = self._counters
+        counters[player] += 1
+        if event & _SNAKE_OR_LADDER:
+            block = len(counters) >> 2
+            if event & EVENT_SNAKE:
+                counters[block + player] += 1
+            if event & EVENT_LADDER:
+                counters[2 * block + player] += 1
+        if double:
+            counters[3 * (len(counters) >> 2) + player] += 1
+        self._length = length = length + 1
+        return length
+
+    def truncate(self, length):
+        """Descarta as jogadas a partir de `length`, desfazendo seus contadores."""
+        for index in range(length, self._length):
+            self._count(index, -1)
+        self._length = min(self._length, length)
+        self._discard_redo()
+
+    def clear(self):
+        """Apaga todas as jogadas e zera os contadores, reaproveitando as colunas."""
+        self._length = 0
+        self._discard_redo()
+        self._counters[:] = [0] * len(self._counters)
+
+    def _discard_redo(self):
+        """Apaga as jogadas gravadas depois do cursor."""
+        for column in (self.players, self.from_positions, self.to_positions, self.events, self.doubles):
+            del column[self._length:]
+        del self.dice[self._length * self.dice_count:]
+
+    def counters(self):
+        """Cópia dos contadores por jogador, para snapshots."""
+        return self._counters[:]
+
+    def seek(self, length, counters, start):
+        """
+        Move o cursor para `length` sem apagar as jogadas gravadas.
+
+        `counters` são os contadores salvos na jogada `start` (<= `length`); apenas
+        as jogadas entre `start` e `length` são recontadas.
+        """
+        self._counters[:] = counters
+        for index in range(start, length):
+            self._count(index, 1)
+        self._length = length
+
+    def _count(self, index, step):
+        """Soma `step` aos contadores do jogador conforme a jogada `index`."""
+        player = self.players[index]
+        event = self.events[index]
+        counters = self._counters
+        block = len(counters) // 4
+        counters[player] += step
+        if event & EVENT_SNAKE:
+            counters[block + player] += step
+        if event & EVENT_LADDER:
+            counters[2 * block + player] += step
+        if self.doubles[index]:
+            counters[3 * block + player] += step
+
+    def stats(self):
+        """Estatísticas acumuladas no formato de `SnakesLadders.get_game_stats()`."""
+        counters = self._counters
+        block = len(counters) // 4
+        return {
+            "turnos": len(self),
+            "movimentos": dict(enumerate(counters[:block])),  # Contagem de movimentos por jogador
+            "cobras": dict(enumerate(counters[block:2 * block])),  # Contagem de cobras atingidas por jogador
+            "escadas": dict(enumerate(counters[2 * block:3 * block])),  # Contagem de escadas subidas por jogador
+            "duplas": dict(enumerate(counters[3 * block:])),  # Contagem de duplas roladas por jogador
+        }
+
+    def as_arrays(self):
+        """
+        Colunas como arrays NumPy (para análise em lote).
+
+        Os dados são copiados em bloco: uma view direta impediria o `array` de
+        crescer na próxima jogada enquanto o array NumPy existisse. "dice" tem
+        formato (jogadas, dados).
+        """
+        import numpy as np
+        length = self._length
+        columns = {
+            "player": self.players, "from_position": self.from_positions,
+            "to_position": self.to_positions, "event": self.events,
+        }
+        arrays = {
+            name: np.frombuffer(column[:length].tobytes(), dtype=column.typecode)
+            for name, column in columns.items()
+        }
+        dice = np.frombuffer(self.dice[:length * self.dice_count].tobytes(), dtype=np.uint8)
+        arrays["dice"] = dice.reshape(length, self.dice_count)
+        return arrays
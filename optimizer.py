@@ -0,0 +1,194 @@
+"""
+Otimizador de layouts de cobras e escadas.
+
+Busca (algoritmo evolutivo com mutações locais) posições de cobras e escadas
+que atinjam uma duração esperada de partida e uma chance de vitória do
+Jogador 1 desejadas. Cada candidato é avaliado de forma exata pela cadeia de
+Markov (ver `BoardAnalysis.duel`), os candidatos de cada geração são avaliados
+em paralelo em um pool de processos e layouts já vistos nunca são reavaliados
+(cache pela impressão digital do layout).
+
+Uso:
+    python optimizer.py --rolls 40 --win 0.5 --generations 100 --seed 1 --output layout.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis import BoardAnalysis
+from board import LAST_SQUARE, CompiledBoard, layout_key
+from SnakesLadders import SnakesLadders
+
+# Escalas do erro: 1 jogada de duração pesa o mesmo que 0,5 ponto percentual de vantagem
+ROLL_SCALE = 1.0
+WIN_SCALE = 0.005
+# Maior deslocamento de uma ponta de cobra/escada em uma mutação local
+MAX_SHIFT = 10
+
+
+def evaluate_layout(fingerprint):
+    """
+    Avalia um layout (impressão digital de `layout_key`) de forma exata.
+
+    Usa um tabuleiro e uma análise sem cache, para não acumular memória nos
+    processos do pool. Retorna None se o 100 for inalcançável.
+    """
+    snakes, ladders = dict(fingerprint[0]), dict(fingerprint[1])
+    board = CompiledBoard(fingerprint, snakes, ladders)
+    try:
+        return BoardAnalysis(board).duel()
+    except np.linalg.LinAlgError:
+        return None
+
+
+def is_valid_layout(snakes, ladders):
+    """Confere se cobras descem, escadas sobem e nenhuma casa é usada duas vezes."""
+    squares = list(snakes) + list(snakes.values()) + list(ladders) + list(ladders.values())
+    if len(set(squares)) != len(squares):
+        return False
+    if any(not 1 <= square < LAST_SQUARE for square in squares):
+        return False
+    return all(head > tail for head, tail in snakes.items()) and all(
+        base < top for base, top in ladders.items())
+
+
+class LayoutOptimizer:
+    """
+    Busca evolutiva de layouts para uma duração e uma vantagem alvo.
+
+    `target_rolls` é a duração esperada da partida em jogadas e `target_win` a
+    chance de vitória desejada para o Jogador 1 (0.5 é um jogo justo).
+    """
+
+    def __init__(self, target_rolls, target_win=0.5, snakes=None, ladders=None,
+                 population_size=16, children=64, seed=None, workers=None):
+        if snakes is None or ladders is None:
+            game = SnakesLadders()
+            snakes, ladders = game.snakes, game.ladders
+        self.target_rolls = target_rolls
+        self.target_win = target_win
+        self.population_size = population_size
+        self.children = children
+        self.workers = workers or os.cpu_count()
+        self.rng = random.Random(seed)
+        # Cache de avaliações pela impressão digital do layout
+        self.cache = {}
+        self.population = [layout_key(snakes, ladders)]
+
+    def score(self, metrics):
+        """Erro do layout em relação aos alvos (menor é melhor)."""
+        if metrics is None:
+            return float("inf")
+        roll_error = (metrics["jogadas_esperadas"] - self.target_rolls) / ROLL_SCALE
+        win_error = (metrics["vitoria_jogador1"] - self.target_win) / WIN_SCALE
+        return roll_error * roll_error + win_error * win_error
+
+    def mutate(self, fingerprint):
+        """Gera um vizinho válido: desloca uma ponta ou reposiciona uma cobra/escada."""
+        while True:
+            snakes, ladders = dict(fingerprint[0]), dict(fingerprint[1])
+            jumps = self.rng.choice([snakes, ladders])
+            start = self.rng.choice(list(jumps))
+            end = jumps.pop(start)
+            if self.rng.random() < 0.7:
+                # Mutação local: move uma das pontas
+                if self.rng.random() < 0.5:
+                    start += self.rng.randint(-MAX_SHIFT, MAX_SHIFT)
+                else:
+                    end += self.rng.randint(-MAX_SHIFT, MAX_SHIFT)
+            else:
+                # Reposiciona por completo
+                start, end = self.rng.sample(range(1, LAST_SQUARE), 2)
+                if (jumps is snakes) != (start > end):
+                    start, end = end, start
+            jumps[start] = end
+            if is_valid_layout(snakes, ladders):
+                return layout_key(snakes, ladders)
+
+    def _evaluate(self, fingerprints, pool):
+        """Avalia em paralelo apenas os layouts ainda não vistos."""
+        pending = [fingerprint for fingerprint in dict.fromkeys(fingerprints)
+                   if fingerprint not in self.cache]
+        if pool is None:
+            results = map(evaluate_layout, pending)
+        else:
+            chunksize = max(1, len(pending) // (4 * self.workers))
+            results = pool.map(evaluate_layout, pending, chunksize=chunksize)
+        for fingerprint, metrics in zip(pending, results):
+            self.cache[fingerprint] = metrics
+        return len(pending)
+
+    def best(self):
+        """Melhor layout encontrado e suas métricas."""
+        fingerprint = self.population[0]
+        return fingerprint, self.cache.get(fingerprint)
+
+    def run(self, generations=100, tolerance=0.01, callback=None):
+        """Executa a busca e retorna o melhor layout (impressão digital) e suas métricas."""
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            self._evaluate(self.population, pool)
+            for generation in range(generations):
+                # Pais escolhidos por torneio entre dois membros da população
+                parents = [
+                    min(self.rng.sample(self.population, min(2, len(self.population))),
+                        key=lambda fingerprint: self.score(self.cache[fingerprint]))
+                    for _ in range(self.children)
+                ]
+                offspring = [self.mutate(parent) for parent in parents]
+                evaluated = self._evaluate(offspring, pool)
+                candidates = dict.fromkeys(self.population + offspring)
+                self.population = sorted(candidates, key=lambda fingerprint: self.score(self.cache[fingerprint]))
+                self.population = self.population[:self.population_size]
+                best_score = self.score(self.cache[self.population[0]])
+                if callback is not None:
+                    callback(generation, best_score, evaluated)
+                if best_score <= tolerance:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.best()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Otimiza o layout de cobras e escadas.")
+    parser.add_argument("--rolls", type=float, required=True, help="duração esperada alvo (jogadas)")
+    parser.add_argument("--win", type=float, default=0.5, help="chance alvo de vitória do Jogador 1")
+    parser.add_argument("--generations", type=int, default=100, help="número máximo de gerações")
+    parser.add_argument("--children", type=int, default=64, help="candidatos por geração")
+    parser.add_argument("--seed", type=int, default=None, help="semente da busca")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos (padrão: núcleos)")
+    parser.add_argument("--output", help="grava o melhor layout em JSON (formato de tournament.py --layout)")
+    args = parser.parse_args(argv)
+
+    optimizer = LayoutOptimizer(args.rolls, args.win, children=args.children,
+                                seed=args.seed, workers=args.workers)
+    start = time.perf_counter()
+
+    def report(generation, score, evaluated):
+        print(f"Geração {generation + 1}: erro {score:.4f} ({evaluated} novos candidatos)", file=sys.stderr)
+
+    fingerprint, metrics = optimizer.run(args.generations, callback=report)
+    elapsed = time.perf_counter() - start
+    print(f"{len(optimizer.cache)} layouts avaliados em {elapsed:.1f}s "
+          f"({60 * len(optimizer.cache) / elapsed:,.0f} por minuto)", file=sys.stderr)
+    print(f"Duração esperada: {metrics['jogadas_esperadas']:.2f} jogadas, "
+          f"vitória do Jogador 1: {metrics['vitoria_jogador1']:.2%}", file=sys.stderr)
+    layout = {"snakes": dict(fingerprint[0]), "ladders": dict(fingerprint[1])}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(layout, handle, indent=2)
+    else:
+        print(json.dumps(layout))
+    return layout
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Armazenamento de partidas por sessão para a interface Dash.
+
+Cada sessão do navegador tem sua própria instância do jogo, protegida por um
+lock próprio. O número de partidas vivas é limitado e as sessões menos usadas
+(ou ociosas há mais tempo que o TTL) são descartadas.
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _Entry:
+    """Partida de uma sessão com seu lock e o instante do último acesso."""
+
+    __slots__ = ("game", "lock", "last_access")
+
+    def __init__(self, game, now):
+        self.game = game
+        self.lock = threading.Lock()
+        self.last_access = now
+
+
+class GameStore:
+    """
+    Partidas indexadas pelo id da sessão, com despejo LRU e por tempo ocioso.
+
+    `factory` cria uma partida nova para sessões desconhecidas, `max_games` limita
+    as partidas em memória e `ttl` (segundos) descarta sessões ociosas.
+    """
+
+    def __init__(self, factory, max_games=10000, ttl=3600, clock=time.monotonic):
+        self.factory = factory
+        self.max_games = max_games
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, session_id):
+        return session_id in self._entries
+
+    @contextmanager
+    def session(self, session_id):
+        """Entrega a partida da sessão com acesso exclusivo enquanto durar o bloco."""
+        entry = self._checkout(session_id)
+        with entry.lock:
+            yield entry.game
+
+    @contextmanager
+    def existing(self, session_id):
+        """Como `session`, mas entrega None (sem criar partida) se a sessão não existe."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is None:
+            yield None
+            return
+        with entry.lock:
+            yield entry.game
+
+    def games(self):
+        """Cópia da lista de partidas vivas (para métricas)."""
+        with self._lock:
+            return [entry.game for entry in self._entries.values()]
+
+    def discard(self, session_id):
+        """Remove a partida da sessão, se existir."""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def _checkout(self, session_id):
+        """Busca (ou cria) a entrada da sessão e a marca como a mais recente."""
+        now = self.clock()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = _Entry(self.factory(), now)
+                self._entries[session_id] = entry
+                # Abre espaço para a nova partida respeitando o limite
+                while len(self._entries) > self.max_games:
+                    self._entries.popitem(last=False)
+            else:
+                entry.last_access = now
+                self._entries.move_to_end(session_id)
+            return entry
+
+    def _evict(self, now):
+        """Descarta as sessões ociosas; a ordem LRU deixa as mais antigas no início."""
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_access <= self.ttl:
+                break
+            del self._entries[session_id]
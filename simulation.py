@@ -0,0 +1,98 @@
+"""
+Simulação em lote de partidas de Cobras e Escadas com NumPy.
+
+Avança milhares de partidas a cada passo como vetores de posições, consultando
+a mesma tabela de transições compilada usada por `SnakesLadders.play()`
+(ver board.py) e aplicando a nova jogada com dados iguais e as variantes de regras
+do tabuleiro (chegada exata e penalidade de dados iguais seguidos).
+"""
+import numpy as np
+
+from board import EVENT_LADDER, EVENT_PENALTY, EVENT_SNAKE, EVENT_STAY, EVENT_WIN
+
+
+def simulate_batch(board, n_games, seed=None, square_hits=False, players=2):
+    """
+    Simula `n_games` partidas completas de `players` jogadores no tabuleiro compilado `board`.
+
+    Retorna um dicionário de arrays no mesmo formato de `get_game_stats()`:
+    "turnos" (jogadas por partida), "vencedor" (índice do jogador) e contagens por
+    jogador de "movimentos", "cobras", "escadas" e "duplas" com formato (n_games, players).
+    Com `square_hits`, inclui também "cobras_por_casa" e "escadas_por_casa":
+    quantas vezes cada cabeça de cobra e base de escada foi atingida, por casa.
+    `seed` aceita qualquer semente de `np.random.default_rng` (inclusive SeedSequence).
+    """
+    rng = np.random.default_rng(seed)
+    destinations = np.frombuffer(board.destinations, dtype=board.destinations.typecode)
+    events = np.frombuffer(board.events, dtype=np.uint8)
+    snake_heads = np.frombuffer(board.snake_heads, dtype=board.snake_heads.typecode)
+    ladder_bases = np.frombuffer(board.ladder_bases, dtype=board.ladder_bases.typecode)
+    squares = len(board.destinations)
+    snake_squares = np.zeros(squares, dtype=np.int64)
+    ladder_squares = np.zeros(squares, dtype=np.int64)
+
+    positions = np.zeros((n_games, players), dtype=destinations.dtype)
+    current = np.zeros(n_games, dtype=np.int16)
+    streaks = np.zeros(n_games, dtype=np.int16)
+    max_doubles = board.rules.max_doubles
+    turns = np.zeros(n_games, dtype=np.int32)
+    winners = np.full(n_games, -1, dtype=np.int16)
+    moves = np.zeros((n_games, players), dtype=np.int32)
+    snake_hits = np.zeros((n_games, players), dtype=np.int32)
+    ladder_hits = np.zeros((n_games, players), dtype=np.int32)
+    doubles = np.zeros((n_games, players), dtype=np.int32)
+
+    # Índices das partidas ainda em andamento
+    active = np.arange(n_games)
+    while active.size:
+        dice = rng.integers(1, 7, size=(active.size, board.dice), dtype=np.int16)
+        player = current[active]
+        old_position = positions[active, player]
+        target = old_position + dice.sum(axis=1, dtype=np.int64)
+
+        # Uma única consulta à tabela resolve ricochete, cobra e escada
+        new_position = destinations[target]
+        event = events[target]
+        if board.rules.exact_landing:
+            new_position = np.where(event & EVENT_STAY, old_position, new_position)
+        rolled_double = (dice == dice[:, :1]).all(axis=1) & (board.dice > 1)
+        repeat = rolled_double
+        if max_doubles:
+            # A última dupla permitida no turno manda o jogador de volta para a casa 0
+            penalty = rolled_double & (streaks[active] + 1 == max_doubles)
+            new_position = np.where(penalty, 0, new_position)
+            event = np.where(penalty, EVENT_PENALTY, event)
+            repeat = rolled_double & ~penalty
+            streaks[active] = np.where(repeat, streaks[active] + 1, 0)
+        hit_snake = (event & EVENT_SNAKE) != 0
+        hit_ladder = (event & EVENT_LADDER) != 0
+
+        positions[active, player] = new_position
+        turns[active] += 1
+        moves[active, player] += 1
+        snake_hits[active, player] += hit_snake
+        ladder_hits[active, player] += hit_ladder
+        doubles[active, player] += rolled_double
+        if square_hits:
+            snake_squares += np.bincount(snake_heads[target[hit_snake]], minlength=squares)
+            ladder_squares += np.bincount(ladder_bases[target[hit_ladder]], minlength=squares)
+
+        # Dados iguais mantêm o jogador; caso contrário passa a vez
+        current[active] = np.where(repeat, player, (player + 1) % players)
+
+        won = (event & EVENT_WIN) != 0
+        winners[active[won]] = player[won]
+        active = active[~won]
+
+    result = {
+        "turnos": turns,
+        "vencedor": winners,
+        "movimentos": moves,
+        "cobras": snake_hits,
+        "escadas": ladder_hits,
+        "duplas": doubles,
+    }
+    if square_hits:
+        result["cobras_por_casa"] = snake_squares
+        result["escadas_por_casa"] = ladder_squares
+    return result
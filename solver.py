@@ -0,0 +1,143 @@
+"""
+Tabela exata de probabilidade de vitória para partidas de dois jogadores.
+
+Resolve, uma vez por layout, a probabilidade de o Jogador 1 vencer a partir de
+cada estado (posição do Jogador 1, posição do Jogador 2, jogador da vez e, com a
+penalidade de dados iguais seguidos, duplas já tiradas no turno), respeitando a
+nova jogada com dados iguais e a variante de regras do tabuleiro. A tabela fica em memória e em disco,
+de modo que a consulta durante a partida é um simples acesso a um array.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from board import EVENT_STAY
+
+# Diretório do cache em disco (pode ser alterado pela variável de ambiente)
+CACHE_DIR = os.environ.get(
+    "SNAKES_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+# Versão das tabelas em disco: incrementar ao mudar o formato ou o cálculo da tabela
+CACHE_VERSION = 2
+# Critério de convergência da iteração de valores
+TOLERANCE = 1e-12
+
+# Cache em memória de tabelas já resolvidas (chave: layout_key do tabuleiro)
+_win_tables = {}
+
+
+def _outcomes(board):
+    """Agrupa as jogadas de dados em (probabilidade, destinos, dados iguais)."""
+    destinations = np.frombuffer(board.destinations, dtype=board.destinations.typecode)
+    events = np.frombuffer(board.events, dtype=np.uint8)
+    positions = np.arange(board.size)
+    outcomes = []
+    for roll, double, probability in board.outcomes():
+        landed = destinations[positions + roll].astype(np.intp)
+        if board.rules.exact_landing:
+            landed = np.where(events[positions + roll] & EVENT_STAY, positions, landed)
+        outcomes.append((probability, landed, double))
+    return outcomes
+
+
+def solve_win_table(board):
+    """
+    Calcula a tabela de vitória por iteração de valores.
+
+    Retorna um array (2 * camadas, casas + 1, casas + 1) em que
+    `table[vez * camadas + duplas, pos1, pos2]` é a probabilidade de o Jogador 1
+    vencer quando é a vez do jogador `vez`, que já tirou `duplas` dados iguais
+    seguidos no turno. Sem penalidade há uma única camada (`table[vez, pos1, pos2]`).
+    """
+    last = board.size
+    max_doubles = board.rules.max_doubles
+    layers = max_doubles or 1
+    table = np.zeros((2 * layers, last + 1, last + 1))
+    # Estados finais: Jogador 1 na casa final vence, Jogador 2 na casa final vence
+    table[:, last, :] = 1.0
+    table[:, :, last] = 0.0
+    outcomes = _outcomes(board)
+    inner = slice(0, last)
+
+    while True:
+        previous = table.copy()
+        for layer in range(layers):
+            # Camada depois de mais uma dupla (None: penalidade, volta para a casa 0 e passa a vez)
+            repeat = (layer + 1 if layer + 1 < max_doubles else None) if max_doubles else 0
+            # Vez do Jogador 1: ele se move na primeira dimensão
+            first = np.zeros((last, last))
+            for probability, destinations, double in outcomes:
+                if not double:
+                    first += probability * table[layers][destinations, inner]
+                elif repeat is None:
+                    first += probability * table[layers][0, inner]
+                else:
+                    first += probability * table[repeat][destinations, inner]
+            table[layer, inner, inner] = first
+            # Vez do Jogador 2: ele se move na segunda dimensão
+            second = np.zeros((last, last))
+            for probability, destinations, double in outcomes:
+                if not double:
+                    second += probability * table[0][inner, destinations]
+                elif repeat is None:
+                    second += probability * table[0][inner, 0][:, None]
+                else:
+                    second += probability * table[layers + repeat][inner, destinations]
+            table[layers + layer, inner, inner] = second
+        if np.abs(table - previous).max() < TOLERANCE:
+            return table
+
+
+def _cache_path(board):
+    """Arquivo do cache em disco para o layout do tabuleiro e a versão da tabela."""
+    digest = hashlib.sha1(repr((CACHE_VERSION, board.key)).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"win-{digest}.npy")
+
+
+def _table_shape(board):
+    """Formato esperado da tabela de vitória do tabuleiro (ver `solve_win_table`)."""
+    layers = board.rules.max_doubles or 1
+    return (2 * layers, board.size + 1, board.size + 1)
+
+
+def _load_table(path, board):
+    """Tabela gravada em disco, ou None se ela faltar, estiver corrompida ou tiver outro formato."""
+    try:
+        table = np.load(path)
+    except (OSError, ValueError):
+        return None
+    if table.shape != _table_shape(board) or table.dtype != np.float64:
+        return None
+    return table
+
+
+def win_table(board):
+    """Retorna a tabela de vitória do tabuleiro, usando os caches em memória e disco."""
+    table = _win_tables.get(board.key)
+    if table is not None:
+        return table
+    path = _cache_path(board)
+    table = _load_table(path, board)
+    if table is None:
+        table = solve_win_table(board)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            # Grava em arquivo temporário e renomeia, para não expor arquivos parciais
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as handle:
+                np.save(handle, table)
+            os.replace(temporary, path)
+        except OSError:
+            pass
+    table.flags.writeable = False
+    _win_tables[board.key] = table
+    return table
+
+
+def win_probabilities(board, positions, current_player, doubles_streak=0):
+    """Retorna [chance do Jogador 1, chance do Jogador 2] no estado informado."""
+    layers = board.rules.max_doubles or 1
+    layer = current_player * layers + (doubles_streak if layers > 1 else 0)
+    player1 = float(win_table(board)[layer, positions[0], positions[1]])
+    return [player1, 1.0 - player1]
@@ -0,0 +1,288 @@
+"""
+Transmissão das partidas para espectadores, por server-sent events (SSE).
+
+Cada jogada é publicada uma única vez no `SpectatorHub` como um evento compacto,
+já serializado no formato SSE e guardado em um buffer circular do canal da
+partida. Publicar não depende do número de espectadores: só acrescenta o evento
+ao buffer e marca o canal; uma thread do hub acorda os espectadores, e cada um
+envia, na própria conexão, os eventos que ainda não recebeu (vários de uma vez
+quando está atrasado). Um espectador que fica mais de RING_SIZE eventos para
+trás é desconectado, e o número total de espectadores é limitado.
+
+O canal de uma partida é identificado por `watch_id(session_id)`, que não revela
+o id da sessão (que controla a partida). Quem chega a um canal ainda sem eventos
+recebe o estado atual da partida em um evento "state", vindo do `snapshot` do hub
+ou publicado pela partida no próximo callback (ver `SpectatorHub.waiting`). O hub vive no processo: com vários
+workers, o espectador precisa cair no mesmo processo que atende a partida.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+
+import metrics
+
+# Eventos guardados por canal (e atraso máximo de um espectador, em eventos)
+RING_SIZE = 256
+# Intervalo (segundos) entre comentários de keep-alive para conexões sem eventos
+HEARTBEAT = 15.0
+# Limite de espectadores conectados ao processo
+MAX_SPECTATORS = int(os.environ.get("SNAKES_MAX_SPECTATORS", 5000))
+# Tempo (ms) para o navegador reconectar
+RETRY_MS = 2000
+
+SPECTATORS_DROPPED = metrics.REGISTRY.register(metrics.Counter(
+    "snakes_spectators_dropped_total", "Espectadores desconectados por atraso ou por limite de conexões.",
+    ("reason",)))
+
+
+def watch_id(session_id):
+    """Id público do canal da partida de uma sessão."""
+    return hashlib.sha256(f"watch:{session_id}".encode()).hexdigest()[:16]
+
+
+class SpectatorsFull(Exception):
+    """O processo já atende o número máximo de espectadores."""
+
+
+class _Channel:
+    """Buffer circular dos eventos de uma partida e os espectadores dela."""
+
+    __slots__ = ("events", "sequence", "viewers", "lock", "condition")
+
+    def __init__(self):
+        # Pares (número do evento, quadro SSE já codificado)
+        self.events = deque(maxlen=RING_SIZE)
+        self.sequence = 0
+        self.viewers = 0
+        # O buffer tem um lock próprio: quem publica não disputa com os espectadores que esperam
+        self.lock = threading.Lock()
+        self.condition = threading.Condition()
+
+    def pending(self, cursor):
+        """
+        Número do último evento e os quadros depois de `cursor`.
+
+        Os quadros são None se alguns já saíram do buffer.
+        """
+        with self.lock:
+            if self.sequence - cursor > len(self.events):
+                return self.sequence, None
+            return self.sequence, [frame for number, frame in self.events if number > cursor]
+
+
+class SpectatorHub:
+    """Canais de transmissão das partidas assistidas, com a thread que acorda os espectadores."""
+
+    def __init__(self, max_spectators=MAX_SPECTATORS, snapshot=None):
+        self.max_spectators = max_spectators
+        # snapshot(channel_id): estado atual da partida do canal (ou None se o processo não a conhece)
+        self.snapshot = snapshot
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._spectators = 0
+        self._dirty = set()
+        self._wake = threading.Event()
+        self._pid = None
+
+    @property
+    def spectators(self):
+        """Espectadores conectados."""
+        return self._spectators
+
+    def watched(self, channel_id):
+        """Se alguém assiste ao canal (só então vale a pena montar o evento)."""
+        return channel_id in self._channels
+
+    def waiting(self, channel_id):
+        """Se alguém assiste ao canal sem ter recebido nenhum evento (ainda vê o tabuleiro vazio)."""
+        channel = self._channels.get(channel_id)
+        return channel is not None and channel.sequence == 0
+
+    def publish(self, channel_id, kind, payload):
+        """
+        Publica um evento no canal (sem custo se ninguém assiste à partida).
+
+        O evento é serializado uma vez; os espectadores são acordados pela thread do hub.
+        """
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            return
+        data = json.dumps(payload, separators=(",", ":"))
+        with channel.lock:
+            channel.sequence += 1
+            frame = f"id: {channel.sequence}\nevent: {kind}\ndata: {data}\n\n"
+            channel.events.append((channel.sequence, frame.encode()))
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            self._dirty.add(channel)
+        self._wake.set()
+
+    def _start(self):
+        """Inicia a thread que acorda os espectadores deste processo (chamado com o lock)."""
+        self._pid = os.getpid()
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name="spectator-hub", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            for channel in dirty:
+                with channel.condition:
+                    channel.condition.notify_all()
+
+    def _subscribe(self, channel_id):
+        with self._lock:
+            channel = self._channels.get(channel_id)
+            if channel is None:
+                channel = self._channels[channel_id] = _Channel()
+            channel.viewers += 1
+            self._spectators += 1
+            return channel
+
+    def _unsubscribe(self, channel_id, channel):
+        with self._lock:
+            channel.viewers -= 1
+            self._spectators -= 1
+            # Sem espectadores, o canal deixa de existir e a partida para de publicar
+            if channel.viewers == 0 and self._channels.get(channel_id) is channel:
+                del self._channels[channel_id]
+
+    def stream(self, channel_id, last_event_id=None):
+        """
+        Gerador dos quadros SSE de um espectador do canal.
+
+        Começa pelo último evento publicado (ou pelo estado de `snapshot`, em um canal
+        sem eventos; ou continua depois de `last_event_id`, na reconexão) e termina com um evento "dropped" se o espectador atrasar
+        mais de RING_SIZE eventos. Levanta SpectatorsFull acima do limite.
+        """
+        if self._spectators >= self.max_spectators:
+            SPECTATORS_DROPPED.inc("limite")
+            raise SpectatorsFull()
+
+        def frames():
+            # A inscrição fica dentro do gerador: o `finally` só roda se ele chegou a começar
+            channel = self._subscribe(channel_id)
+            try:
+                if channel.sequence == 0 and self.snapshot is not None:
+                    state = self.snapshot(channel_id)
+                    if state is not None:
+                        self.publish(channel_id, "state", state)
+                with channel.lock:
+                    cursor = channel.sequence - 1 if channel.sequence else 0
+                    # Na reconexão, continua de onde parou se os eventos ainda estão no buffer
+                    if last_event_id is not None and 0 <= channel.sequence - last_event_id <= len(channel.events):
+                        cursor = last_event_id
+                yield f"retry: {RETRY_MS}\n\n".encode()
+                while True:
+                    if channel.sequence <= cursor:
+                        with channel.condition:
+                            channel.condition.wait_for(lambda: channel.sequence > cursor, HEARTBEAT)
+                    cursor, pending = channel.pending(cursor)
+                    if pending is None:
+                        SPECTATORS_DROPPED.inc("atraso")
+                        yield b"event: dropped\ndata: {}\n\n"
+                        return
+                    # Conexão lenta: o que acumulou vai em uma única escrita
+                    yield b"".join(pending) if pending else b": ping\n\n"
+            finally:
+                self._unsubscribe(channel_id, channel)
+
+        return frames()
+
+
+# Página mínima do espectador: tabuleiro, tokens e a última jogada
+_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Cobras e Escadas - Espectador</title></head>
+<body style="font-family: sans-serif; text-align: center">
+<h2>📺 Cobras e Escadas</h2>
+<div id="board" style="position: relative; display: inline-block">
+  <img src="{board}" width="{width}" height="{height}">
+</div>
+<p id="message">Aguardando a próxima jogada...</p>
+<script>
+const page = {config};
+const source = new EventSource(page.events);
+const show = function (state) {{
+  const board = document.getElementById("board");
+  board.querySelectorAll(".token").forEach(function (token) {{ token.remove(); }});
+  if (state.size !== page.size) return;
+  const stacked = {{}};
+  state.positions.forEach(function (position, player) {{
+    if (position <= 0) return;
+    const offset = stacked[position] || 0;
+    stacked[position] = offset + 1;
+    const token = document.createElement("img");
+    token.className = "token";
+    token.src = page.tokens[player % page.tokens.length];
+    token.style.cssText = "position: absolute; border-radius: 50%; width: " + page.token + "px; height: " +
+      page.token + "px; left: " + (page.cells[position][0] + offset * page.token / 3) + "px; top: " +
+      (page.cells[position][1] + offset * page.token / 3) + "px";
+    board.appendChild(token);
+  }});
+}};
+source.addEventListener("state", function (event) {{
+  const state = JSON.parse(event.data);
+  show(state);
+  document.getElementById("message").textContent = state.over ? "Partida encerrada 🏆" :
+    "Vez do Jogador " + (state.current + 1);
+}});
+source.addEventListener("reset", function (event) {{
+  show(JSON.parse(event.data));
+  document.getElementById("message").textContent = "Nova partida!";
+}});
+source.addEventListener("move", function (event) {{
+  const state = JSON.parse(event.data);
+  show(state);
+  document.getElementById("message").textContent = "Jogador " + (state.player + 1) + " rolou " +
+    state.dice.join("+") + " e foi para a casa " + state.to + (state.over ? " 🏆" : "");
+}});
+source.addEventListener("dropped", function () {{
+  document.getElementById("message").textContent = "Conexão lenta: reconectando...";
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def install(app, hub, board_url, board_dims, cells, token_urls, path="/watch"):
+    """
+    Expõe a transmissão em `path/<id>` (página do espectador) e `path/<id>/events` (SSE).
+
+    `board_url`, `board_dims` ("width", "height" e "token") e `cells` (posição de
+    cada casa, ver `game_assets.board_geometry`) descrevem o tabuleiro da página.
+    """
+    from flask import Response, request
+
+    server = app.server
+
+    @server.route(f"{path}/<channel_id>")
+    def _watch_page(channel_id):
+        config = {
+            "events": app.get_relative_path(f"{path}/{channel_id}/events"),
+            "size": len(cells) - 1, "cells": cells, "token": board_dims["token"], "tokens": token_urls,
+        }
+        page = _PAGE.format(board=board_url, width=board_dims["width"], height=board_dims["height"],
+                            config=json.dumps(config))
+        return Response(page, content_type="text/html; charset=utf-8")
+
+    @server.route(f"{path}/<channel_id>/events")
+    def _watch_events(channel_id):
+        last_event_id = request.headers.get("Last-Event-ID", "")
+        try:
+            frames = hub.stream(channel_id, int(last_event_id) if last_event_id.isdigit() else None)
+        except SpectatorsFull:
+            return Response("Limite de espectadores atingido", status=503, headers={"Retry-After": "30"})
+        return Response(frames, content_type="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    metrics.REGISTRY.register(metrics.Gauge(
+        "snakes_spectators", "Espectadores conectados neste processo.", lambda: hub.spectators))
+    return hub
@@ -0,0 +1,114 @@
+"""
+Perfil do tempo de inicialização da interface.
+
+Inicia processos Python novos que importam `SnakesLadders_dash` (como um worker
+do gunicorn ao subir) com `-X importtime` e relata o tempo total do processo,
+o tempo de importação do app, o tempo do primeiro callback (que carrega o que
+foi adiado) e os pacotes mais caros de importar, somando o tempo próprio de
+cada módulo por pacote de primeiro nível.
+
+Uso:
+    python startup_profile.py --runs 5 --top 15 --output perfil.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Código executado em cada processo medido
+_CHILD = """
+import json, time
+start = time.perf_counter()
+import SnakesLadders_dash as dash_app
+imported = time.perf_counter()
+import sys
+print(MARKER, file=sys.stderr, flush=True)
+from benchmark import post_callback
+client = dash_app.server.test_client()
+dependency = next(item for item in client.get("/_dash-dependencies").get_json()
+                  if "game-delta.data" in item["output"] and not item.get("clientside_function"))
+first = time.perf_counter()
+post_callback(client, dependency, {"session-id.data": "perfil", "reset-button.n_clicks": 1},
+              "reset-button.n_clicks")
+done = time.perf_counter()
+print(json.dumps({"importacao": imported - start, "primeiro_callback": done - first}))
+""".replace("MARKER", repr("--- primeiro callback ---"))
+# Separa, na saída de -X importtime, as importações do boot das adiadas
+_MARKER = "--- primeiro callback ---"
+
+
+def parse_importtime(output):
+    """
+    Soma o tempo próprio (segundos) por pacote de primeiro nível a partir da saída de -X importtime.
+
+    Retorna dois dicionários: importações do boot e as feitas no primeiro callback.
+    """
+    startup, deferred = {}, {}
+    packages = startup
+    for line in output.splitlines():
+        if line == _MARKER:
+            packages = deferred
+            continue
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        self_time, name = int(fields[0]), fields[2].strip()
+        package = name.split(".", 1)[0]
+        packages[package] = packages.get(package, 0.0) + self_time / 1e6
+    return startup, deferred
+
+
+def profile_once(env=None):
+    """Mede um processo novo; retorna tempos (segundos) e o tempo de importação por pacote (boot e adiado)."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=directory, env=dict(os.environ, **(env or {})),
+        capture_output=True, text=True, check=True,
+    )
+    total = time.perf_counter() - start
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["processo"] = total
+    return timings, parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil do tempo de inicialização da interface.")
+    parser.add_argument("--runs", type=int, default=5, help="processos medidos (vale a mediana)")
+    parser.add_argument("--top", type=int, default=15, help="pacotes listados")
+    parser.add_argument("--output", help="grava o relatório em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    runs = [profile_once() for _ in range(args.runs)]
+    timings = {name: statistics.median(run[0][name] for run in runs) for name in runs[0][0]}
+
+    def ranking(index):
+        """Pacotes mais caros (mediana entre as execuções) de uma das fases."""
+        packages = {}
+        for run in runs:
+            for package, seconds in run[1][index].items():
+                packages.setdefault(package, []).append(seconds)
+        medians = {package: statistics.median(values + [0.0] * (len(runs) - len(values)))
+                   for package, values in packages.items()}
+        return dict(sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top])
+
+    report = {"tempos": timings, "pacotes_boot": ranking(0), "pacotes_adiados": ranking(1)}
+    print(f"Processo completo: {timings['processo'] * 1000:8.1f} ms (mediana de {args.runs})")
+    print(f"Importação do app: {timings['importacao'] * 1000:8.1f} ms")
+    print(f"Primeiro callback: {timings['primeiro_callback'] * 1000:8.1f} ms")
+    for title, key in (("no boot", "pacotes_boot"), ("adiados ao primeiro callback", "pacotes_adiados")):
+        print(f"Pacotes mais caros {title} (tempo próprio dos módulos):")
+        for package, seconds in report[key].items():
+            print(f"  {package:32} {seconds * 1000:8.1f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
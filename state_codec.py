@@ -0,0 +1,184 @@
+"""
+Codificação compacta do estado de uma partida.
+
+Serializa um `SnakesLadders` em poucos bytes (versão, flags, semente, configuração
+e variante de regras quando fora do padrão e posições, com o histórico de dados
+opcional, um byte por jogada com dois dados) e devolve o resultado em
+base64 seguro para URL. Usado pelo modo sem estado da interface Dash, em que o
+estado da partida vive em um `dcc.Store` no navegador.
+"""
+import binascii
+import struct
+from array import array
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from board import CLASSIC_RULES, DICE_COUNT, LAST_SQUARE, Rules
+from SnakesLadders import SnakesLadders
+
+# Versão do formato binário
+FORMAT_VERSION = 3
+# Cabeçalho: versão, flags, semente
+_HEADER = struct.Struct("<BBQ")
+# Configuração de partidas fora do padrão: jogadores, dados, casa final
+_CONFIG = struct.Struct("<HBI")
+# Jogador da vez (apenas com mais de dois jogadores)
+_CURRENT = struct.Struct("<H")
+# Variante de regras: bits (chegada exata, encadeada), max_doubles e duplas seguidas no turno
+_RULES = struct.Struct("<BBB")
+# Cursor do histórico (jogadas ativas), antes dos dados gravados
+_CURSOR = struct.Struct("<I")
+
+# Bits do byte de flags
+FLAG_PLAYER2_TURN = 1
+FLAG_GAME_OVER = 2
+FLAG_HAS_LOG = 4
+FLAG_CUSTOM = 8
+FLAG_RULES = 16
+
+
+def _roll_width(dice):
+    """Bytes por jogada no histórico: os dados formam um número na base 6."""
+    return max(1, ((6 ** dice - 1).bit_length() + 7) // 8)
+
+
+def _pack_dice(dice):
+    """Empacota os dados de uma jogada em um número (0 a 6**dados - 1)."""
+    value = 0
+    for die in dice:
+        value = value * 6 + die - 1
+    return value
+
+
+def _unpack_dice(value, dice):
+    """Desempacota o número de `_pack_dice`."""
+    faces = []
+    for _ in range(dice):
+        value, face = divmod(value, 6)
+        faces.append(face + 1)
+    return faces[::-1]
+
+
+def encode_game(game, include_log=False):
+    """
+    Codifica a partida em uma string base64 curta.
+
+    Sem `include_log` só o estado atual é guardado; a partida decodificada não
+    continua a sequência de dados da semente nem pode desfazer jogadas. Cobras e
+    escadas não são guardadas: a partida decodificada usa o layout padrão do tamanho.
+    """
+    board = game.board
+    custom = game.players != 2 or board.size != LAST_SQUARE or board.dice != DICE_COUNT
+    flags = FLAG_CUSTOM if custom else 0
+    if game.get_current_player() == 1:
+        flags |= FLAG_PLAYER2_TURN
+    if game.is_game_over():
+        flags |= FLAG_GAME_OVER
+    if include_log:
+        flags |= FLAG_HAS_LOG
+    rules = board.rules
+    if rules != CLASSIC_RULES:
+        flags |= FLAG_RULES
+    data = bytearray(_HEADER.pack(FORMAT_VERSION, flags, game.seed))
+    if custom:
+        data += _CONFIG.pack(game.players, board.dice, board.size)
+        data += _CURRENT.pack(game.get_current_player())
+    if rules != CLASSIC_RULES:
+        data += _RULES.pack(rules.exact_landing | rules.chained << 1, rules.max_doubles,
+                            min(game.doubles_streak, 0xFF))
+    # Posições no menor tipo que comporta o tabuleiro (1 byte no tabuleiro padrão)
+    positions = game.get_player_positions()
+    data += bytes(positions.tolist()) if board.size <= 0xFF else positions.tobytes()
+    if include_log:
+        # Todas as jogadas gravadas, inclusive as desfeitas que podem ser refeitas
+        history = game.get_move_history()
+        width = _roll_width(board.dice)
+        data += _CURSOR.pack(len(history))
+        for index in range(history.recorded):
+            data += _pack_dice(history.rolled(index)).to_bytes(width, "little")
+    return urlsafe_b64encode(bytes(data)).rstrip(b"=").decode("ascii")
+
+
+def decode_game(encoded, expected=None, max_moves=None):
+    """
+    Reconstrói a partida a partir da string de `encode_game`.
+
+    Se o histórico de dados estiver presente, a partida é refeita jogada a jogada
+    para reconstruir o histórico e os snapshots, e depois levada ao cursor.
+    Estados malformados ou incoerentes (base64 inválido, dados truncados, casas
+    além do fim, jogador da vez inexistente) levantam ValueError.
+
+    Para estados vindos do cliente: com `expected` (uma partida modelo), estados de
+    outra configuração (jogadores, casa final, dados, regras) levantam ValueError antes de
+    montar qualquer tabuleiro; com `max_moves`, históricos mais longos também.
+    """
+    try:
+        return _decode(encoded, expected, max_moves)
+    except (binascii.Error, struct.error, TypeError) as error:
+        raise ValueError(f"Estado malformado: {error}") from error
+
+
+def _decode(encoded, expected, max_moves):
+    """Corpo de `decode_game`; erros de base64, de struct e de tipo sobem como estão."""
+    data = urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    version = data[0] if data else None
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versão de estado não suportada: {version}")
+    _, flags, seed = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    players, dice, size, current_player = 2, DICE_COUNT, LAST_SQUARE, 0
+    if flags & FLAG_CUSTOM:
+        players, dice, size = _CONFIG.unpack_from(data, offset)
+        (current_player,) = _CURRENT.unpack_from(data, offset + _CONFIG.size)
+        offset += _CONFIG.size + _CURRENT.size
+    elif flags & FLAG_PLAYER2_TURN:
+        current_player = 1
+    if current_player >= players:
+        raise ValueError(f"Jogador da vez inexistente: {current_player}")
+    if expected is not None and (players, size, dice) != (
+            expected.players, expected.board.size, expected.board.dice):
+        raise ValueError("Configuração de partida diferente da esperada")
+    rules, doubles_streak = None, 0
+    if flags & FLAG_RULES:
+        rule_bits, max_doubles, doubles_streak = _RULES.unpack_from(data, offset)
+        rules = Rules(rule_bits & 1, rule_bits & 2, max_doubles)
+        offset += _RULES.size
+        if rules.max_doubles and doubles_streak >= rules.max_doubles:
+            raise ValueError(f"Duplas seguidas fora da regra: {doubles_streak}")
+    if expected is not None and (rules or CLASSIC_RULES) != expected.board.rules:
+        raise ValueError("Regras diferentes das esperadas")
+    game = SnakesLadders(seed=seed, players=players, size=size, dice=dice, rules=rules)
+    positions = game.get_player_positions()
+    itemsize = 1 if size <= 0xFF else positions.itemsize
+    stored = data[offset:offset + players * itemsize]
+    offset += players * itemsize
+    if flags & FLAG_HAS_LOG:
+        (cursor,) = _CURSOR.unpack_from(data, offset)
+        offset += _CURSOR.size
+        width = _roll_width(dice)
+        if (len(data) - offset) % width:
+            raise ValueError("Histórico de dados truncado")
+        if max_moves is not None and (len(data) - offset) // width > max_moves:
+            raise ValueError(f"Histórico com mais de {max_moves} jogadas")
+        combinations = 6 ** dice
+        for start in range(offset, len(data), width):
+            value = int.from_bytes(data[start:start + width], "little")
+            if value >= combinations:
+                raise ValueError(f"Jogada inválida no histórico: {value}")
+            if game.play(*_unpack_dice(value, dice)) is None:
+                raise ValueError("Jogada depois do fim da partida")
+        if cursor > len(game.get_move_history()):
+            raise ValueError(f"Cursor além do histórico: {cursor}")
+        game.seek(cursor)
+        return game
+    if len(stored) != players * itemsize:
+        raise ValueError("Posições truncadas")
+    if itemsize == 1:
+        stored = list(stored)
+    stored = array(positions.typecode, stored)
+    if max(stored) > size:
+        raise ValueError(f"Casa além do fim do tabuleiro: {max(stored)}")
+    positions[:] = stored
+    game.current_player = current_player
+    game.doubles_streak = doubles_streak
+    game.game_over = bool(flags & FLAG_GAME_OVER)
+    return game
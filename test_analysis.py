@@ -0,0 +1,32 @@
+"""
+Testes da análise exata (analysis.py) conferida com a simulação em lote.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import numpy as np
+import pytest
+
+from analysis import analyze_board
+from board import VARIANTS
+from SnakesLadders import SnakesLadders
+from simulation import simulate_batch
+
+GAMES = 20000
+
+
+@pytest.mark.parametrize("name", sorted(VARIANTS))
+def test_analysis_matches_simulation(name):
+    board = SnakesLadders(**VARIANTS[name]).board
+    duel = analyze_board(board).duel()
+    stats = simulate_batch(board, GAMES, seed=3)
+    turns = stats["turnos"]
+    # Cinco erros-padrão da média simulada
+    assert abs(turns.mean() - duel["jogadas_esperadas"]) < 5 * turns.std() / np.sqrt(GAMES)
+    wins = (stats["vencedor"] == 0).mean()
+    assert abs(wins - duel["vitoria_jogador1"]) < 5 * 0.5 / np.sqrt(GAMES)
+
+
+def test_finish_distribution_sums_to_one():
+    analysis = analyze_board(SnakesLadders().board)
+    distribution = analysis.finish_distribution(2000)
+    assert distribution.sum() == pytest.approx(1.0, abs=1e-9)
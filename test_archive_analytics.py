@@ -0,0 +1,92 @@
+"""
+Testes das estatísticas do arquivo (archive_analytics.py): a agregação incremental
+confere com contagens feitas jogada a jogada.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+from collections import Counter
+
+from archive_analytics import ArchiveAnalytics
+from board import EVENT_BOUNCE, EVENT_LADDER, EVENT_SNAKE
+from game_archive import ArchiveWriter
+from SnakesLadders import SnakesLadders
+
+
+class DirectCounts:
+    """Contagens das jogadas gravadas, feitas diretamente a partir dos `MoveResult`."""
+
+    def __init__(self):
+        self.moves = self.doubles = self.bounces = self.replaced = 0
+        self.lengths = Counter()
+        self.winners = Counter()
+        self.snakes = Counter()
+        self.ladders = Counter()
+        self.landings = Counter()
+
+    def add(self, game, result, replaced):
+        board = game.board
+        self.moves += 1
+        self.doubles += result.double
+        self.bounces += bool(result.event & EVENT_BOUNCE)
+        self.replaced += replaced
+        self.landings[result.to_position] += 1
+        if result.event & EVENT_SNAKE:
+            self.snakes[board.snake_heads[result.target]] += 1
+        if result.event & EVENT_LADDER:
+            self.ladders[board.ladder_bases[result.target]] += 1
+        if result.winner is not None:
+            self.winners[result.winner] += 1
+            self.lengths[len(game.get_move_history())] += 1
+
+    def check(self, histograms):
+        assert histograms.moves == self.moves
+        assert histograms.doubles == self.doubles
+        assert histograms.bounces == self.bounces
+        assert histograms.replaced == self.replaced
+        assert nonzero(histograms.landings) == dict(self.landings)
+        assert nonzero(histograms.snake_hits) == dict(self.snakes)
+        assert nonzero(histograms.ladder_hits) == dict(self.ladders)
+        assert nonzero(histograms.winners) == dict(self.winners)
+        assert nonzero(histograms.lengths) == dict(self.lengths)
+
+
+def nonzero(histogram):
+    return {index: int(count) for index, count in enumerate(histogram) if count}
+
+
+def play_games(writer, counts, seeds, undo_every=0):
+    """Joga partidas completas gravando e contando cada jogada."""
+    for seed in seeds:
+        game = SnakesLadders(seed=seed)
+        history = game.get_move_history()
+        undone = set()
+        while True:
+            # Desfaz duas jogadas a cada `undo_every`: as seguintes substituem as desfeitas
+            if undo_every and len(history) % undo_every == 0 and len(history) not in undone:
+                undone.add(len(history))
+                game.seek(len(history) - 2)
+            replaced = len(history) < history.recorded
+            result = game.play(*game.roll_dice())
+            if result is None:
+                break
+            writer.record(game, replaced)
+            counts.add(game, result, replaced)
+        writer.flush()
+
+
+def test_incremental_analytics_match_direct_counts(tmp_path):
+    archive = str(tmp_path / "arquivo")
+    cache = str(tmp_path / "cache")
+    writer = ArchiveWriter(archive, segment_records=300)
+    analytics = ArchiveAnalytics(archive, cache_dir=cache)
+    counts = DirectCounts()
+    # Lotes de partidas: a cada consulta, só os registros novos são agregados
+    for batch in range(4):
+        play_games(writer, counts, range(batch * 10, batch * 10 + 10), undo_every=7 if batch % 2 else 0)
+        counts.check(analytics.histograms())
+    writer.close()
+    counts.check(analytics.histograms())
+    # Uma instância nova lê os segmentos fechados do cache em disco
+    counts.check(ArchiveAnalytics(archive, cache_dir=cache).histograms())
+    # E sem cache, agregando tudo de novo
+    counts.check(ArchiveAnalytics(archive, cache_dir=str(tmp_path / "outro")).histograms())
@@ -0,0 +1,35 @@
+"""
+Testes da comparação com a linha de base (benchmark.py): tolerância relativa,
+tolerância por métrica e diferença mínima em tempos curtos.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+from benchmark import _metric, compare
+
+
+def results(**metrics):
+    return {"resultados": {name.replace("_", "."): metric for name, metric in metrics.items()}}
+
+
+def regressions(current, baseline, **options):
+    return [row[0] for row in compare(current, baseline, **options) if row[4]]
+
+
+def test_relative_tolerance():
+    baseline = results(motor_play=_metric(100_000, "jogadas/s", True), pil_dice=_metric(2.0, "ms", False))
+    current = results(motor_play=_metric(85_000, "jogadas/s", True), pil_dice=_metric(2.6, "ms", False))
+    assert regressions(current, baseline) == ["pil.dice"]
+    assert regressions(current, baseline, tolerance=0.1) == ["motor.play", "pil.dice"]
+    assert regressions(current, baseline, tolerance=0.5) == []
+
+
+def test_sub_millisecond_noise_is_not_a_regression():
+    baseline = results(dash_tokens=_metric(0.010, "ms", False), dash_game=_metric(0.5, "ms", False))
+    current = results(dash_tokens=_metric(0.030, "ms", False), dash_game=_metric(0.8, "ms", False))
+    assert regressions(current, baseline) == ["dash.game"]
+
+
+def test_metric_tolerance():
+    baseline = results(arquivo_record=_metric(2.0, "us", False, 1.0))
+    assert regressions(results(arquivo_record=_metric(3.8, "us", False, 1.0)), baseline) == []
+    assert regressions(results(arquivo_record=_metric(4.2, "us", False, 1.0)), baseline) == ["arquivo.record"]
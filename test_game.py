@@ -0,0 +1,75 @@
+"""
+Testes do motor: jogadas e o resultado de `play()`.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import pytest
+
+from board import Rules
+from SnakesLadders import SnakesLadders
+
+
+@pytest.mark.parametrize("dice", [(3, 4), (), (0,), (7,)])
+def test_play_rejects_invalid_dice(dice):
+    game = SnakesLadders(seed=1, dice=1)
+    with pytest.raises(ValueError):
+        game.play(*dice)
+    history = game.get_move_history()
+    assert (len(history), history.recorded, len(history.dice)) == (0, 0, 0)
+    game.play(3)
+    assert history.rolled(0) == (3,)
+
+
+def play_from(position, *dice, **config):
+    """Jogada do Jogador 1 a partir de `position`."""
+    game = SnakesLadders(seed=1, **config)
+    game.player_positions[0] = position
+    return game.play(*dice)
+
+
+@pytest.mark.parametrize("position, dice, config, kinds, to_position", [
+    (0, (1, 4), {}, ["roll", "move", "turn"], 5),
+    (10, (2, 4), {}, ["roll", "move", "snake", "turn"], 6),
+    (0, (1, 1), {}, ["roll", "move", "ladder", "double"], 38),
+    (96, (2, 5), {}, ["roll", "move", "bounce", "turn"], 97),
+    (90, (4, 6), {}, ["roll", "move", "win"], 100),
+    (97, (3, 4), {"rules": Rules(exact_landing=True)}, ["roll", "move", "stay", "turn"], 97),
+], ids=["simples", "cobra", "escada-dupla", "ricochete", "vitoria", "chegada-exata"])
+def test_move_result_parts(position, dice, config, kinds, to_position):
+    result = play_from(position, *dice, **config)
+    assert [kind for kind, _ in result.parts()] == kinds
+    assert result.to_position == to_position
+    assert str(result) == " | ".join(text for _, text in result.parts())
+    assert str(result).startswith(f"Jogador 1 rolou {dice[0]}+{dice[1]}={sum(dice)}")
+
+
+def test_move_result_fields():
+    result = play_from(90, 4, 6)
+    assert (result.player, result.dice, result.from_position, result.to_position) == (0, (4, 6), 90, 100)
+    assert (result.winner, result.double, result.target) == (0, False, 100)
+    assert "casa 100" in result.parts()[-1][1]
+    result = play_from(0, 1, 1)
+    assert (result.winner, result.double, result.next_player) == (None, True, 0)
+
+
+def test_penalty_message():
+    game = SnakesLadders(seed=1, rules=Rules(max_doubles=2))
+    game.play(1, 1)
+    result = game.play(2, 2)
+    assert [kind for kind, _ in result.parts()] == ["roll", "move", "penalty", "turn"]
+    assert "2ª DUPLA SEGUIDA" in str(result)
+    assert game.get_player_positions()[0] == 0
+
+
+def test_chained_message_follows_the_whole_chain():
+    result = play_from(45, 2, 3, snakes={50: 30, 60: 20}, ladders={30: 60}, rules=Rules(chained=True))
+    parts = result.parts()
+    assert [kind for kind, _ in parts] == ["roll", "move", "snake", "ladder", "snake", "turn"]
+    assert "casa 20" in parts[-2][1] and result.to_position == 20
+
+
+def test_game_over_returns_none():
+    game = SnakesLadders(seed=1)
+    game.player_positions[0] = 90
+    game.play(4, 6)
+    assert game.play(1, 2) is None
@@ -0,0 +1,62 @@
+"""
+Testes do arquivo de jogadas (game_archive.py): o que é gravado volta igual.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import numpy as np
+
+from game_archive import (FLAG_DOUBLE, FLAG_REPLACED, OPEN_SUFFIX, SEGMENT_SUFFIX, ArchiveWriter, iter_records,
+                          list_segments, load_archive)
+from SnakesLadders import SnakesLadders
+
+
+def play_recorded(writer, game, moves):
+    """Joga até `moves` jogadas gravando cada uma; retorna os registros esperados."""
+    expected = []
+    history = game.get_move_history()
+    for _ in range(moves):
+        replaced = len(history) < history.recorded
+        result = game.play(*game.roll_dice())
+        if result is None:
+            break
+        writer.record(game, replaced)
+        flags = (FLAG_DOUBLE if result.double else 0) | (FLAG_REPLACED if replaced else 0)
+        expected.append((game.seed, len(history) - 1, result.from_position, result.to_position, result.player,
+                         sum(result.dice), result.event, flags))
+    return expected
+
+
+def test_round_trip_across_segments(tmp_path):
+    writer = ArchiveWriter(str(tmp_path), segment_records=50, flush_records=16, flush_interval=0.05)
+    expected = []
+    for seed in range(6):
+        expected += play_recorded(writer, SnakesLadders(seed=seed), 40)
+        # Grava a cada partida: o segmento fecha na gravação que passa de 50 registros
+        writer.flush()
+    writer.close()
+    segments = list_segments(str(tmp_path))
+    assert len(segments) > 1
+    assert all(path.endswith(SEGMENT_SUFFIX) for path in segments)
+    stored = [record for path in segments for record in iter_records(path)]
+    assert stored == expected
+    # A leitura via np.memmap vê os mesmos registros
+    arrays = np.concatenate([records for _, records in load_archive(str(tmp_path))])
+    assert arrays["game_id"].tolist() == [record[0] for record in expected]
+    assert arrays["to_position"].tolist() == [record[3] for record in expected]
+    assert arrays["flags"].tolist() == [record[7] for record in expected]
+
+
+def test_replaced_moves_are_flagged(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    game = SnakesLadders(seed=3)
+    expected = play_recorded(writer, game, 10)
+    for _ in range(4):
+        game.undo()
+    expected += play_recorded(writer, game, 1)
+    writer.flush()
+    segments = list_segments(str(tmp_path))
+    assert [path.endswith(OPEN_SUFFIX) for path in segments] == [True]
+    stored = list(iter_records(segments[0]))
+    assert stored == expected
+    assert stored[-1][1] == 6 and stored[-1][7] & FLAG_REPLACED
+    writer.close()
@@ -0,0 +1,41 @@
+"""
+Testes das imagens geradas (game_assets.py): arquivos estáticos com manifesto e
+data URIs quando a pasta de assets não pode ser gravada.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import os
+import shutil
+
+from game_assets import BOARD_SOURCE, GENERATED_DIR, build_assets, build_board_variants
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+def copy_board(tmp_path):
+    """Pasta de assets temporária só com a imagem original do tabuleiro."""
+    shutil.copy(os.path.join(ASSETS_DIR, BOARD_SOURCE), tmp_path / BOARD_SOURCE)
+    return str(tmp_path)
+
+
+def test_assets_are_written_and_reused(tmp_path):
+    assets_dir = copy_board(tmp_path)
+    paths = build_assets(assets_dir)
+    assert paths["dice-1"].startswith(f"{GENERATED_DIR}/dice-1.png?v=")
+    assert build_assets(assets_dir) == paths
+    variants = build_board_variants(assets_dir)
+    assert [variant["width"] for variant in variants] == sorted(variant["width"] for variant in variants)
+    assert all(variant["path"].startswith(f"{GENERATED_DIR}/board-") for variant in variants)
+    assert build_board_variants(assets_dir) == variants
+
+
+def test_unwritable_assets_fall_back_to_data_uris(tmp_path):
+    assets_dir = copy_board(tmp_path)
+    # Um arquivo no lugar da subpasta impede a gravação (mesmo rodando como root)
+    (tmp_path / GENERATED_DIR).write_bytes(b"")
+    paths = build_assets(assets_dir)
+    assert set(paths) == {f"dice-{value}" for value in range(1, 7)} | {"token-0", "token-1"}
+    assert all(path.startswith("data:image/png;base64,") for path in paths.values())
+    variants = build_board_variants(assets_dir)
+    assert all(variant["path"].startswith("data:image/webp;base64,") for variant in variants)
+    assert variants[-1]["width"] > variants[0]["width"]
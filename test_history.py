@@ -0,0 +1,68 @@
+"""
+Testes de desfazer/refazer e da navegação no histórico (seek e snapshots).
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import pytest
+
+from board import VARIANTS
+from SnakesLadders import SNAPSHOT_INTERVAL, SnakesLadders
+
+
+def state_of(game):
+    """Estado observável da partida, para comparar."""
+    return (game.get_player_positions().tolist(), game.get_current_player(), game.doubles_streak,
+            game.is_game_over(), list(game.get_move_history().counters()))
+
+
+def played_game(min_moves, **config):
+    """Partida terminada com pelo menos `min_moves` jogadas e o estado após cada jogada."""
+    for seed in range(1000):
+        game = SnakesLadders(seed=seed, **config)
+        states = [state_of(game)]
+        while game.play(*game.roll_dice()) is not None:
+            states.append(state_of(game))
+        if len(states) > min_moves:
+            return game, states
+    raise AssertionError("Nenhuma partida longa o bastante")
+
+
+@pytest.mark.parametrize("name", ["classica", "tres-duplas"])
+def test_seek_matches_recorded_states(name):
+    game, states = played_game(2 * SNAPSHOT_INTERVAL, **VARIANTS[name])
+    last = len(states) - 1
+    for turn in [0, SNAPSHOT_INTERVAL - 1, SNAPSHOT_INTERVAL, SNAPSHOT_INTERVAL + 1, last]:
+        assert game.seek(turn) == turn
+        assert state_of(game) == states[turn]
+    # Voltar e avançar de novo não altera o estado
+    game.seek(SNAPSHOT_INTERVAL + 1)
+    game.seek(last)
+    assert state_of(game) == states[last]
+
+
+def test_move_after_undo_drops_redo_history():
+    game = SnakesLadders(seed=7)
+    for _ in range(10):
+        game.play(*game.roll_dice())
+    for _ in range(3):
+        assert game.undo()
+    history = game.get_move_history()
+    assert (len(history), history.recorded) == (7, 10)
+    game.play(*game.roll_dice())
+    assert (len(history), history.recorded) == (8, 8)
+    assert not game.redo()
+
+
+def test_snapshots_replaced_after_undo():
+    game, _ = played_game(2 * SNAPSHOT_INTERVAL)
+    game.seek(SNAPSHOT_INTERVAL - 3)
+    # Novas jogadas (outros dados) substituem as desfeitas e seus snapshots
+    states = {len(game.get_move_history()): state_of(game)}
+    for _ in range(SNAPSHOT_INTERVAL + 5):
+        if game.play(1, 2) is None:
+            break
+        states[len(game.get_move_history())] = state_of(game)
+    assert len(game.snapshots) == max(states) // SNAPSHOT_INTERVAL + 1
+    for turn, state in sorted(states.items(), reverse=True):
+        game.seek(turn)
+        assert state_of(game) == state
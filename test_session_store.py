@@ -0,0 +1,92 @@
+"""
+Testes do armazenamento de partidas por sessão (session_store.py).
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import threading
+import time
+
+from session_store import GameStore
+
+
+class Clock:
+    """Relógio manual para testar o TTL."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_same_session_gets_same_game():
+    store = GameStore(object)
+    with store.session("a") as first:
+        pass
+    with store.session("a") as again:
+        assert again is first
+    with store.session("b") as other:
+        assert other is not first
+    assert len(store) == 2
+
+
+def test_lru_eviction_keeps_recently_used():
+    store = GameStore(object, max_games=2)
+    for session_id in ("a", "b"):
+        with store.session(session_id):
+            pass
+    # "a" passa a ser a mais recente; "b" sai quando "c" chega
+    with store.session("a"):
+        pass
+    with store.session("c"):
+        pass
+    assert "a" in store and "c" in store and "b" not in store
+    assert len(store) == 2
+
+
+def test_ttl_evicts_idle_sessions():
+    clock = Clock()
+    store = GameStore(object, ttl=10, clock=clock)
+    with store.session("a"):
+        pass
+    clock.now = 5
+    with store.session("b"):
+        pass
+    clock.now = 12
+    with store.session("b"):
+        pass
+    assert "a" not in store and "b" in store
+
+
+def test_existing_does_not_create():
+    store = GameStore(object)
+    with store.existing("a") as game:
+        assert game is None
+    assert "a" not in store
+
+
+def test_session_access_is_exclusive():
+    store = GameStore(lambda: [0])
+    inside = []
+    overlaps = []
+
+    def worker():
+        for _ in range(200):
+            with store.session("a") as game:
+                inside.append(1)
+                if len(inside) > 1:
+                    overlaps.append(1)
+                value = game[0]
+                # Cede a vez no meio da atualização: sem o lock, outra thread entraria aqui
+                time.sleep(0)
+                game[0] = value + 1
+                inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with store.session("a") as game:
+        assert game[0] == 8 * 200
+    assert not overlaps
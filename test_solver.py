@@ -0,0 +1,41 @@
+"""
+Testes do cache em disco da tabela de vitória (solver.py).
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import numpy as np
+import pytest
+
+import solver
+from SnakesLadders import SnakesLadders
+
+
+@pytest.fixture
+def board(tmp_path, monkeypatch):
+    """Tabuleiro pequeno com os caches de tabelas isolados em `tmp_path`."""
+    monkeypatch.setattr(solver, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(solver, "_win_tables", {})
+    return SnakesLadders(seed=1, size=30).board
+
+
+def test_table_is_saved_and_reloaded(board):
+    table = solver.win_table(board)
+    assert table.shape == (2, 31, 31)
+    solver._win_tables.clear()
+    assert np.array_equal(solver.win_table(board), table)
+
+
+@pytest.mark.parametrize("stored", [np.zeros((2, 101, 101)), np.zeros((2, 31, 31), dtype=np.float32)],
+                         ids=["outro-formato", "outro-tipo"])
+def test_mismatched_cache_is_recomputed(board, stored):
+    expected = solver.solve_win_table(board)
+    np.save(solver._cache_path(board), stored)
+    table = solver.win_table(board)
+    assert np.array_equal(table, expected)
+    assert np.array_equal(np.load(solver._cache_path(board)), expected)
+
+
+def test_cache_key_includes_the_version(board, monkeypatch):
+    path = solver._cache_path(board)
+    monkeypatch.setattr(solver, "CACHE_VERSION", solver.CACHE_VERSION + 1)
+    assert solver._cache_path(board) != path
@@ -0,0 +1,99 @@
+"""
+Testes da transmissão para espectadores (spectator.py): buffer circular por canal,
+espectadores atrasados e limite de conexões.
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import json
+
+import pytest
+
+from spectator import RING_SIZE, SpectatorHub, SpectatorsFull
+
+
+def events(chunk):
+    """(id, tipo, dados) de cada evento de um pedaço da resposta SSE."""
+    parsed = []
+    for frame in chunk.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if ": " in line)
+        if "event" in fields:
+            parsed.append((int(fields.get("id", 0)), fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def connect(hub, channel_id, last_event_id=None):
+    """Abre um espectador; o primeiro quadro é o `retry`."""
+    stream = hub.stream(channel_id, last_event_id)
+    assert next(stream).startswith(b"retry:")
+    return stream
+
+
+def test_publish_without_viewers_is_dropped():
+    hub = SpectatorHub()
+    hub.publish("c", "move", {"to": 1})
+    assert not hub.watched("c")
+
+
+def test_viewer_receives_events_in_order_batched():
+    hub = SpectatorHub()
+    stream = connect(hub, "c")
+    assert hub.watched("c") and hub.spectators == 1
+    for turn in range(3):
+        hub.publish("c", "move", {"turn": turn})
+    # O que acumulou vai em uma única escrita
+    assert events(next(stream)) == [(turn + 1, "move", {"turn": turn}) for turn in range(3)]
+    stream.close()
+    assert not hub.watched("c") and hub.spectators == 0
+
+
+def test_slow_viewer_is_dropped():
+    hub = SpectatorHub()
+    slow = connect(hub, "c")
+    fast = connect(hub, "c")
+    for turn in range(RING_SIZE):
+        hub.publish("c", "move", {"turn": turn})
+    # Ainda dentro do buffer
+    assert len(events(next(fast))) == RING_SIZE
+    for turn in range(RING_SIZE, RING_SIZE + 5):
+        hub.publish("c", "move", {"turn": turn})
+    assert [kind for _, kind, _ in events(next(slow))] == ["dropped"]
+    with pytest.raises(StopIteration):
+        next(slow)
+    # O espectador em dia continua recebendo
+    assert [data["turn"] for _, _, data in events(next(fast))] == list(range(RING_SIZE, RING_SIZE + 5))
+    fast.close()
+    assert hub.spectators == 0
+
+
+def test_reconnect_resumes_after_last_event_id():
+    hub = SpectatorHub()
+    keep = connect(hub, "c")
+    for turn in range(5):
+        hub.publish("c", "move", {"turn": turn})
+    again = connect(hub, "c", last_event_id=2)
+    assert [number for number, _, _ in events(next(again))] == [3, 4, 5]
+    # Sem Last-Event-ID, começa pelo último evento publicado
+    late = connect(hub, "c")
+    assert [number for number, _, _ in events(next(late))] == [5]
+    for stream in (keep, again, late):
+        stream.close()
+
+
+def test_snapshot_sent_to_first_viewer_of_idle_channel():
+    hub = SpectatorHub(snapshot=lambda channel_id: {"positions": [4, 9]} if channel_id == "c" else None)
+    stream = connect(hub, "c")
+    assert events(next(stream)) == [(1, "state", {"positions": [4, 9]})]
+    stream.close()
+    assert not hub.waiting("c")
+    unknown = connect(hub, "x")
+    assert hub.waiting("x")
+    unknown.close()
+
+
+def test_spectator_limit():
+    hub = SpectatorHub(max_spectators=1)
+    stream = connect(hub, "c")
+    with pytest.raises(SpectatorsFull):
+        hub.stream("c")
+    stream.close()
+    connect(hub, "c").close()
@@ -0,0 +1,80 @@
+"""
+Testes da codificação compacta do estado (state_codec.py).
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+import pytest
+
+from board import Rules
+from SnakesLadders import SnakesLadders
+from state_codec import decode_game, encode_game
+
+
+def state_of(game):
+    """Estado observável da partida, para comparar."""
+    return (game.get_player_positions().tolist(), game.get_current_player(), game.doubles_streak,
+            game.is_game_over(), list(game.get_move_history().counters()))
+
+
+@pytest.mark.parametrize("config", [
+    {},
+    {"rules": Rules(exact_landing=True, chained=True, max_doubles=2)},
+    {"players": 3, "size": 400, "dice": 3},
+], ids=["classica", "regras", "personalizada"])
+@pytest.mark.parametrize("undone", [0, 5])
+def test_encode_decode_round_trip(config, undone):
+    game = SnakesLadders(seed=11, **config)
+    for _ in range(40):
+        if game.play(*game.roll_dice()) is None:
+            break
+    for _ in range(undone):
+        game.undo()
+    decoded = decode_game(encode_game(game, include_log=True))
+    assert decoded.board.rules == game.board.rules
+    assert state_of(decoded) == state_of(game)
+    history, decoded_history = game.get_move_history(), decoded.get_move_history()
+    assert decoded_history.recorded == history.recorded
+    assert [decoded_history.rolled(i) for i in range(history.recorded)] == \
+        [history.rolled(i) for i in range(history.recorded)]
+    # A partida decodificada continua com os mesmos dados
+    assert decoded.roll_dice() == game.roll_dice()
+
+
+def test_encode_decode_without_log():
+    game = SnakesLadders(seed=4, players=3, size=400, dice=3)
+    for _ in range(10):
+        game.play(*game.roll_dice())
+    decoded = decode_game(encode_game(game))
+    assert decoded.get_player_positions() == game.get_player_positions()
+    assert decoded.get_current_player() == game.get_current_player()
+    assert len(decoded.get_move_history()) == 0
+
+
+@pytest.mark.parametrize("config", [{"size": 1000}, {"players": 3}, {"rules": Rules(max_doubles=20)}])
+def test_decode_rejects_foreign_configuration(config):
+    encoded = encode_game(SnakesLadders(seed=1, **config), include_log=True)
+    with pytest.raises(ValueError):
+        decode_game(encoded, SnakesLadders())
+
+
+def test_decode_limits_replayed_moves():
+    game = SnakesLadders(seed=1)
+    for _ in range(20):
+        game.play(1, 2)
+    encoded = encode_game(game, include_log=True)
+    with pytest.raises(ValueError):
+        decode_game(encoded, SnakesLadders(), max_moves=10)
+    assert len(decode_game(encoded, SnakesLadders(), max_moves=20).get_move_history()) == 20
+
+
+def test_decode_rejects_malformed_state():
+    encoded = encode_game(SnakesLadders(seed=1))
+    data = bytearray(urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+    # Posição além da casa final
+    data[-1] = 250
+    past_end = urlsafe_b64encode(bytes(data)).rstrip(b"=").decode("ascii")
+    for bad in ["!!!", "Aw", encoded[:-2], 123, past_end]:
+        with pytest.raises(ValueError):
+            decode_game(bad)
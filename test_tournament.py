@@ -0,0 +1,42 @@
+"""
+Testes do torneio em vários processos (tournament.py).
+
+Rodar com `python -m pytest -q` na raiz do projeto.
+"""
+import numpy as np
+
+from board import Rules
+from tournament import TournamentHistograms, load_layout, run_chunk, run_tournament
+
+GAMES = 5000
+CHUNK = 1000
+
+
+def test_results_identical_across_worker_counts():
+    snakes, ladders = load_layout(None)
+    results = [run_tournament(snakes, ladders, GAMES, seed=42, chunk_size=CHUNK, workers=workers).summary()
+               for workers in (1, 2, 3)]
+    assert results[0] == results[1] == results[2]
+    assert results[0]["partidas"] == GAMES
+
+
+def test_results_identical_across_worker_counts_with_variant():
+    snakes, ladders = load_layout(None)
+    rules = Rules(max_doubles=3)
+    one = run_tournament(snakes, ladders, GAMES, seed=7, chunk_size=CHUNK, workers=1, rules=rules)
+    many = run_tournament(snakes, ladders, GAMES, seed=7, chunk_size=CHUNK, workers=4, rules=rules)
+    assert one.summary() == many.summary()
+
+
+def test_merge_matches_single_pass():
+    snakes, ladders = load_layout(None)
+    seeds = np.random.SeedSequence(5).spawn(3)
+    merged = TournamentHistograms()
+    for seed in seeds:
+        merged.merge(run_chunk(snakes, ladders, CHUNK, seed))
+    again = TournamentHistograms()
+    for seed in reversed(seeds):
+        again.merge(run_chunk(snakes, ladders, CHUNK, seed))
+    assert merged.summary() == again.summary()
+    assert merged.games == 3 * CHUNK
+    assert merged.lengths.sum() == 3 * CHUNK
@@ -0,0 +1,160 @@
+"""
+Torneio de Cobras e Escadas em todos os núcleos da máquina.
+
+Divide N partidas em lotes de tamanho fixo, cada um com uma semente derivada
+da semente mestre (faixas disjuntas via `SeedSequence.spawn`), simula os lotes
+em um pool de processos e soma os histogramas compactos no processo principal.
+O resultado depende apenas da semente mestre e do tamanho do lote, não do
+número de processos.
+
+Uso:
+    python tournament.py 100000000 --seed 42 --layout layout.json --output resultado.json
+    python tournament.py 1000000 --variant tres-duplas
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from board import DICE_COUNT, LAST_SQUARE, VARIANTS, compile_board
+from SnakesLadders import SnakesLadders
+from simulation import simulate_batch
+
+# Partidas por lote (cada lote é uma tarefa do pool)
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+class TournamentHistograms:
+    """Histogramas somáveis de um conjunto de partidas."""
+
+    def __init__(self, lengths=None, winners=None, snake_hits=None, ladder_hits=None,
+                 players=2, size=LAST_SQUARE):
+        self.lengths = np.zeros(1, dtype=np.int64) if lengths is None else lengths
+        self.winners = np.zeros(players, dtype=np.int64) if winners is None else winners
+        self.snake_hits = np.zeros(size + 1, dtype=np.int64) if snake_hits is None else snake_hits
+        self.ladder_hits = np.zeros(size + 1, dtype=np.int64) if ladder_hits is None else ladder_hits
+
+    @property
+    def games(self):
+        """Número de partidas somadas."""
+        return int(self.winners.sum())
+
+    def merge(self, other):
+        """Soma os histogramas de outro conjunto de partidas a este."""
+        if len(other.lengths) > len(self.lengths):
+            self.lengths = np.pad(self.lengths, (0, len(other.lengths) - len(self.lengths)))
+        self.lengths[:len(other.lengths)] += other.lengths
+        self.winners += other.winners
+        self.snake_hits += other.snake_hits
+        self.ladder_hits += other.ladder_hits
+        return self
+
+    def percentile(self, fraction):
+        """Duração (em jogadas) no percentil `fraction` (0 a 1)."""
+        cumulative = np.cumsum(self.lengths)
+        return int(np.searchsorted(cumulative, fraction * cumulative[-1]))
+
+    def summary(self):
+        """Resumo em tipos JSON."""
+        games = self.games
+        turns = np.arange(len(self.lengths))
+        return {
+            "partidas": games,
+            "duracao_media": float((turns * self.lengths).sum() / games) if games else 0.0,
+            "duracao_percentis": {str(p): self.percentile(p / 100) for p in (50, 90, 99)} if games else {},
+            "vitorias": {f"jogador{player + 1}": int(wins) for player, wins in enumerate(self.winners)},
+            "cobras_por_casa": {str(s): int(n) for s, n in enumerate(self.snake_hits) if n},
+            "escadas_por_casa": {str(s): int(n) for s, n in enumerate(self.ladder_hits) if n},
+            "histograma_duracao": self.lengths.tolist(),
+        }
+
+
+def run_chunk(snakes, ladders, n_games, seed, players=2, size=LAST_SQUARE, dice=DICE_COUNT, rules=None):
+    """Simula um lote de partidas e devolve apenas seus histogramas."""
+    board = compile_board(snakes, ladders, size, dice, rules)
+    result = simulate_batch(board, n_games, seed, square_hits=True, players=players)
+    return TournamentHistograms(
+        np.bincount(result["turnos"]),
+        np.bincount(result["vencedor"], minlength=players).astype(np.int64),
+        result["cobras_por_casa"][:size + 1],
+        result["escadas_por_casa"][:size + 1],
+    )
+
+
+def run_tournament(snakes, ladders, n_games, seed, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                   players=2, size=LAST_SQUARE, dice=DICE_COUNT, rules=None):
+    """Simula `n_games` partidas em paralelo e retorna os histogramas somados."""
+    chunks = [chunk_size] * (n_games // chunk_size)
+    if n_games % chunk_size:
+        chunks.append(n_games % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    total = TournamentHistograms(players=players, size=size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_chunk, snakes, ladders, games, chunk_seed, players, size, dice, rules)
+            for games, chunk_seed in zip(chunks, seeds)
+        ]
+        # Soma na ordem dos lotes para o resultado não depender do escalonamento
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def load_layout(path, size=LAST_SQUARE):
+    """Lê um layout JSON ({"snakes": {...}, "ladders": {...}}) ou usa o padrão do jogo."""
+    if path is None:
+        game = SnakesLadders(size=size)
+        return dict(game.snakes), dict(game.ladders)
+    with open(path, encoding="utf-8") as handle:
+        layout = json.load(handle)
+    snakes = {int(head): int(tail) for head, tail in layout["snakes"].items()}
+    ladders = {int(base): int(top) for base, top in layout["ladders"].items()}
+    return snakes, ladders
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneio de Cobras e Escadas em todos os núcleos.")
+    parser.add_argument("games", type=int, help="número de partidas")
+    parser.add_argument("--seed", type=int, default=0, help="semente mestre (padrão: 0)")
+    parser.add_argument("--layout", help="arquivo JSON com cobras e escadas (padrão: tabuleiro do jogo)")
+    parser.add_argument("--players", type=int, default=2, help="jogadores por partida (padrão: 2)")
+    parser.add_argument("--size", type=int, default=LAST_SQUARE, help="casa final do tabuleiro (padrão: 100)")
+    parser.add_argument("--dice", type=int, help="dados por jogada (padrão: 2, ou o da variante)")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="classica",
+                        help="variante de regras (padrão: classica)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="partidas por lote")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos (padrão: núcleos)")
+    parser.add_argument("--output", help="grava o resultado em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    variant = VARIANTS[args.variant]
+    dice = args.dice or variant.get("dice", DICE_COUNT)
+    snakes, ladders = load_layout(args.layout, args.size)
+    start = time.perf_counter()
+    histograms = run_tournament(snakes, ladders, args.games, args.seed, args.chunk_size, args.workers,
+                                args.players, args.size, dice, variant.get("rules"))
+    elapsed = time.perf_counter() - start
+
+    summary = histograms.summary()
+    summary["semente"] = args.seed
+    summary["tamanho_lote"] = args.chunk_size
+    summary["variante"] = args.variant
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle)
+    print(f"{summary['partidas']} partidas em {elapsed:.1f}s "
+          f"({summary['partidas'] / elapsed:,.0f} partidas/s, {args.workers} processos)", file=sys.stderr)
+    print(f"Duração média: {summary['duracao_media']:.3f} jogadas "
+          f"(p50 {summary['duracao_percentis'].get('50')}, p99 {summary['duracao_percentis'].get('99')})",
+          file=sys.stderr)
+    print("Vitórias: " + " × ".join(
+        f"Jogador {player + 1} {wins}" for player, wins in enumerate(histograms.winners)), file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    main()